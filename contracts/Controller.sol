@@ -10,12 +10,13 @@ import "./Unitroller.sol";
 import "./Governance/Neb.sol";
 
 import "@openzeppelin/contracts/token/ERC20/extensions/IERC20Metadata.sol";
+import "@openzeppelin/contracts/utils/Multicall.sol";
 
 /**
  * @title Nebula Lending Controller Contract
  * @author Blaize.tech
  */
-contract Controller is ControllerV7Storage, IController, IControllerEvents {
+contract Controller is ControllerV10Storage, IController, IControllerEvents, Multicall {
     /// @notice Indicator that this is a Controller contract (for inspection)
     bool public constant isController = true;
     /// @notice The initial NEB index for a market
@@ -26,12 +27,19 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
     uint256 internal constant closeFactorMaxMantissa = 0.9e18; // 0.9
     // No collateralFactorMantissa may exceed this value
     uint256 internal constant collateralFactorMaxMantissa = 0.9e18; // 0.9
+    // Number of markets an account membership bitmap can hold
+    uint256 internal constant maxMarkets = 256;
 
     modifier onlyAdmin(address _caller) {
         require(_caller == admin, "Caller is not an admin");
         _;
     }
 
+    modifier onlyAdminOrMarketFactory(address _caller) {
+        require(_caller == admin || _caller == marketFactory, "Caller is not an admin or the market factory");
+        _;
+    }
+
     constructor() {
         admin = msg.sender;
     }
@@ -44,9 +52,73 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      * @return A dynamic list with the assets the account has entered
      */
     function getAssetsIn(address account) external view returns (IMToken[] memory) {
-        IMToken[] memory assetsIn = accountAssets[account];
+        return accountAssetsIn(account);
+    }
+
+    /**
+     * @notice Returns the assets an account has entered, in the order of allMarkets
+     * @dev Walks the set bits of the account's membership bitmap
+     */
+    function accountAssetsIn(address account) internal view returns (IMToken[] memory assetsIn) {
+        uint256 membership = membershipOf(account);
+
+        uint256 count;
+        for (uint256 bits = membership; bits != 0; bits &= bits - 1) {
+            count++;
+        }
 
-        return assetsIn;
+        assetsIn = new IMToken[](count);
+        count = 0;
+        for (uint256 i = 0; membership != 0; i++) {
+            if (membership & 1 != 0) {
+                assetsIn[count++] = allMarkets[i];
+            }
+            membership >>= 1;
+        }
+    }
+
+    /**
+     * @notice Returns the bit of the market in the account membership bitmaps, 0 for a market without index
+     */
+    function marketBit(address mToken) internal view returns (uint256) {
+        uint256 index = marketIndexes[mToken];
+        return index == 0 ? 0 : 1 << (index - 1);
+    }
+
+    function isMember(address mToken, address account) internal view returns (bool) {
+        return membershipOf(account) & marketBit(mToken) != 0;
+    }
+
+    /**
+     * @notice Returns the membership bitmap of the account, including the markets it entered before the bitmaps
+     * @dev Legacy memberships (accountAssets) count until the account is migrated, so upgraded accounts keep
+     *  their collateral and borrows in every liquidity check. Reverts if a legacy market is not indexed yet.
+     */
+    function membershipOf(address account) internal view returns (uint256 membership) {
+        membership = accountMembershipBitmaps[account];
+        IMToken[] storage assets = accountAssets[account];
+        for (uint256 i = 0; i < assets.length; i++) {
+            uint256 bit = marketBit(address(assets[i]));
+            require(bit != 0, "Market is not indexed");
+            membership |= bit;
+        }
+    }
+
+    /**
+     * @notice Moves the legacy memberships of the account to its bitmap
+     * @return membership The membership bitmap of the account
+     */
+    function migrateMembershipInternal(address account) internal returns (uint256 membership) {
+        membership = membershipOf(account);
+        IMToken[] storage assets = accountAssets[account];
+        if (assets.length == 0) {
+            return membership;
+        }
+        for (uint256 i = 0; i < assets.length; i++) {
+            delete accountMembership[address(assets[i])][account];
+        }
+        delete accountAssets[account];
+        accountMembershipBitmaps[account] = membership;
     }
 
     /**
@@ -56,7 +128,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      * @return True if the account is in the asset, otherwise false.
      */
     function checkMembership(address account, IMToken mToken) external view returns (bool) {
-        return accountMembership[address(mToken)][account];
+        return isMember(address(mToken), account);
     }
 
     /**
@@ -81,18 +153,16 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
 
         require(marketToJoin.isListed, "Market is not listed");
 
-        if (accountMembership[address(mToken)][borrower]) {
+        uint256 bit = marketBit(address(mToken));
+        require(bit != 0, "Market is not indexed");
+        uint256 membership = migrateMembershipInternal(borrower);
+        if (membership & bit != 0) {
             // already joined
             return;
         }
 
-        // survived the gauntlet, add to list
-        // NOTE: we store these somewhat redundantly as a significant optimization
-        //  this avoids having to iterate through the list for the most common use cases
-        //  that is, only when we need to perform liquidity checks
-        //  and not whenever we want to check if an account is in a particular market
-        accountMembership[address(mToken)][borrower] = true;
-        accountAssets[borrower].push(mToken);
+        // survived the gauntlet, set the market's bit
+        accountMembershipBitmaps[borrower] = membership | bit;
 
         emit MarketEntered(mToken, borrower);
     }
@@ -105,44 +175,58 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      */
     function exitMarket(address mTokenAddress) external {
         IMToken mToken = IMToken(mTokenAddress);
+
+        /* Fail if the sender is not already in the market */
+        uint256 membership = migrateMembershipInternal(msg.sender);
+        uint256 bit = marketBit(mTokenAddress);
+        require(membership & bit != 0, "User is not in market");
+
         /* Get sender tokensHeld and amountOwed underlying from the mToken */
         (uint256 tokensHeld, uint256 amountOwed, , ) = mToken.getAccountSnapshot(msg.sender);
 
         /* Fail if the sender has a borrow balance */
         require(amountOwed == 0, "User has a borrow balance");
 
-        /* Fail if the sender is not permitted to redeem all of their tokens */
-        require(redeemAllowedInternal(mTokenAddress, msg.sender, tokensHeld), "User is not allowed to redeem");
+        /* Fail if the sender is not permitted to redeem all of their tokens, an empty position backs no borrow */
+        if (tokensHeld != 0) {
+            require(redeemAllowedInternal(mTokenAddress, msg.sender, tokensHeld), "User is not allowed to redeem");
+        }
 
-        Market storage marketToExit = markets[address(mToken)];
+        /* Clear the market's bit */
+        accountMembershipBitmaps[msg.sender] = membership & ~bit;
 
-        /* Return true if the sender is not already in  the market */
-        require(accountMembership[address(mToken)][msg.sender], "User is not in market");
+        emit MarketExited(mToken, msg.sender);
+    }
 
-        /* Set mToken account membership to false */
-        accountMembership[address(mToken)][msg.sender] = false;
+    /**
+     * @notice Moves the market memberships of accounts entered before the membership bitmaps to their bitmap
+     * @dev Anyone can call this, accounts without legacy memberships are left unchanged.
+     *  Legacy memberships are honoured until then, and accounts are migrated when they enter or exit a market
+     * @param accounts The accounts to migrate
+     */
+    function migrateMemberships(address[] calldata accounts) external {
+        for (uint256 i = 0; i < accounts.length; i++) {
+            migrateMembershipInternal(accounts[i]);
+        }
+    }
 
-        /* Delete mToken from the account s list of assets */
-        // load into memory for faster iteration
-        IMToken[] memory userAssetList = accountAssets[msg.sender];
-        uint256 len = userAssetList.length;
-        uint256 assetIndex = len;
-        for (uint256 i = 0; i < len; i++) {
-            if (userAssetList[i] == mToken) {
-                assetIndex = i;
-                break;
+    /**
+     * @notice Adds the markets accounts received mTokens in before the supply market lists to their list
+     * @dev Anyone can call this, markets the account holds no mTokens in or already has in its list are skipped.
+     *  Until then claimNeb(holder) does not visit these markets, claimNeb(holder, mTokens) still does
+     * @param accounts The accounts to migrate
+     * @param mTokens The markets to look the accounts' balances up in
+     */
+    function migrateSupplyMarkets(address[] calldata accounts, IMToken[] calldata mTokens) external {
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            IMToken mToken = mTokens[i];
+            require(markets[address(mToken)].isListed, "Market is not listed");
+            for (uint256 j = 0; j < accounts.length; j++) {
+                if (mToken.balanceOf(accounts[j]) != 0) {
+                    addToSupplyMarketsInternal(address(mToken), accounts[j]);
+                }
             }
         }
-
-        // We *must* have found the asset in the list or our redundant data structure is broken
-        assert(assetIndex < len);
-
-        // copy last item in list to location of item to be removed, reduce length by 1
-        IMToken[] storage storedList = accountAssets[msg.sender];
-        storedList[assetIndex] = storedList[storedList.length - 1];
-        storedList.pop();
-
-        emit MarketExited(mToken, msg.sender);
     }
 
     /*** Policy Hooks ***/
@@ -170,6 +254,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         // Keep the flywheel moving
         updateNebSupplyIndex(mToken);
         distributeSupplierNeb(mToken, minter);
+        addToSupplyMarketsInternal(mToken, minter);
 
         return true;
     }
@@ -229,7 +314,12 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         }
 
         /* If the redeemer is not in the market, then we can bypass the liquidity check */
-        if (!accountMembership[address(mToken)][redeemer]) {
+        if (!isMember(mToken, redeemer)) {
+            return true;
+        }
+
+        /* The market checks liquidity itself at the end of the redeemer's multicall */
+        if (liquidityCheckDeferred(mToken, redeemer)) {
             return true;
         }
 
@@ -248,6 +338,16 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         return true;
     }
 
+    /**
+     * @notice Returns whether the market defers the account's liquidity check to the end of its multicall
+     * @dev Only the market itself may defer the check, and only for the account running the multicall
+     * @param mToken The market calling the hook
+     * @param account The account to check liquidity for
+     */
+    function liquidityCheckDeferred(address mToken, address account) internal view returns (bool) {
+        return msg.sender == mToken && IMToken(mToken).deferredLiquidityAccount() == account;
+    }
+
     /**
      * @notice Validates redeem and reverts on rejection. May emit logs.
      * @param mToken Asset being redeemed
@@ -286,7 +386,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         require(!borrowGuardianPaused[mToken], "borrow is paused");
         require(markets[mToken].isListed, "Market is not listed");
 
-        if (!accountMembership[address(mToken)][borrower]) {
+        if (!isMember(mToken, borrower)) {
             // only mTokens may call borrowAllowed if borrower not in market
             require(msg.sender == mToken, "sender must be mToken");
 
@@ -294,11 +394,9 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
             addToMarketInternal(IMToken(msg.sender), borrower);
 
             // it should be impossible to break the important invariant
-            assert(accountMembership[address(mToken)][borrower]);
+            assert(isMember(mToken, borrower));
         }
 
-        require(oracle.getUnderlyingPrice(IMToken(mToken)) != 0, "Failed to get underlying price");
-
         uint256 borrowCap = borrowCaps[mToken];
         // Borrow cap of 0 corresponds to unlimited borrowing
         if (borrowCap != 0) {
@@ -307,14 +405,20 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
             require(nextTotalBorrows < borrowCap, "market borrow cap reached");
         }
 
-        (, uint256 shortfall) = getHypotheticalAccountLiquidityInternal(
-            borrower,
-            IMToken(mToken),
-            0,
-            borrowAmount,
-            true
-        );
-        require(shortfall == 0, "Insufficient liquidity");
+        /* The market checks liquidity itself at the end of the borrower's multicall */
+        if (liquidityCheckDeferred(mToken, borrower)) {
+            require(oracle.getUnderlyingPrice(IMToken(mToken)) != 0, "Failed to get underlying price");
+        } else {
+            // The borrowed market is entered above, so the liquidity check also requires its price
+            (, uint256 shortfall) = getHypotheticalAccountLiquidityInternal(
+                borrower,
+                IMToken(mToken),
+                0,
+                borrowAmount,
+                true
+            );
+            require(shortfall == 0, "Insufficient liquidity");
+        }
 
         // Keep the flywheel moving
         uint256 borrowIndex = IMToken(mToken).borrowIndex();
@@ -497,6 +601,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         updateNebSupplyIndex(mTokenCollateral);
         distributeSupplierNeb(mTokenCollateral, borrower);
         distributeSupplierNeb(mTokenCollateral, liquidator);
+        addToSupplyMarketsInternal(mTokenCollateral, liquidator);
 
         return true;
     }
@@ -554,6 +659,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
             updateNebSupplyIndex(mToken);
             distributeSupplierNeb(mToken, src);
             distributeSupplierNeb(mToken, dst);
+            addToSupplyMarketsInternal(mToken, dst);
         }
 
         return allowed;
@@ -604,6 +710,31 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         return (liquidity, shortfall);
     }
 
+    /**
+     * @notice Determine the current liquidity of many accounts wrt collateral requirements
+     * @dev Batched version of getAccountLiquidity for off-chain monitoring
+     * @param accounts The accounts to determine liquidity for
+     * @return liquidities Account liquidity in excess of collateral requirements, for each account
+     * @return shortfalls Account shortfall below collateral requirements, for each account
+     */
+    function getAccountsLiquidity(address[] calldata accounts)
+        external
+        view
+        returns (uint256[] memory liquidities, uint256[] memory shortfalls)
+    {
+        liquidities = new uint256[](accounts.length);
+        shortfalls = new uint256[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            (liquidities[i], shortfalls[i]) = getHypotheticalAccountLiquidityInternal(
+                accounts[i],
+                IMToken(address(0)),
+                0,
+                0,
+                true
+            );
+        }
+    }
+
     /**
      * @notice Determine the current account liquidity wrt collateral requirements
      * @return (
@@ -644,6 +775,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         uint256 mTokenBalance;
         uint256 exchangeRateMantissa;
         uint256 borrowBalance;
+        uint256 oraclePrice;
     }
 
     /**
@@ -670,10 +802,13 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         uint256 sumBorrowPlusEffects;
 
         // For each asset the account is in
-        IMToken[] memory assets = accountAssets[account];
+        IMToken[] memory assets = accountAssetsIn(account);
+        // Price every asset with a single oracle call
+        uint256[] memory prices = oracle.getUnderlyingPrices(assets);
         AccountLiquidityInfo memory accountInfo;
         for (uint256 i = 0; i < assets.length; i++) {
             IMToken asset = assets[i];
+            Market storage market = markets[address(asset)];
 
             // Read the balances and exchange rate from the mToken
             if (withFixed) {
@@ -685,35 +820,29 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
             }
 
             // Get the normalized price of the asset
-            uint256 oraclePrice = oracle.getUnderlyingPrice(asset);
-            require(oraclePrice != 0, "Failed to get price");
+            accountInfo.oraclePrice = prices[i];
+            require(accountInfo.oraclePrice != 0, "Failed to get price");
+
+            uint256 underlyingScale = _getUnderlyingScale(market, address(asset));
 
             // Pre-Compute a conversion factor from tokens -> ether (normalized price value)
-            uint256 tokensToDenom = (((markets[address(asset)].collateralFactorMantissa *
-                accountInfo.exchangeRateMantissa) / 1e18) * oraclePrice) / 1e18;
+            uint256 tokensToDenom = (((market.collateralFactorMantissa * accountInfo.exchangeRateMantissa) / 1e18) *
+                accountInfo.oraclePrice) / 1e18;
 
             // sumCollateral += tokensToDenom * mTokenBalance
-            sumCollateral +=
-                (tokensToDenom * accountInfo.mTokenBalance) /
-                10**(IERC20Metadata(IMErc20(address(asset)).underlying()).decimals());
+            sumCollateral += (tokensToDenom * accountInfo.mTokenBalance) / underlyingScale;
             // sumBorrowPlusEffects += oraclePrice * borrowBalance
-            sumBorrowPlusEffects +=
-                (oraclePrice * accountInfo.borrowBalance) /
-                10**(IERC20Metadata(IMErc20(address(asset)).underlying()).decimals());
+            sumBorrowPlusEffects += (accountInfo.oraclePrice * accountInfo.borrowBalance) / underlyingScale;
 
             // Calculate effects of interacting with mTokenModify
             if (asset == mTokenModify) {
                 // redeem effect
                 // sumBorrowPlusEffects += tokensToDenom * redeemTokens
-                sumBorrowPlusEffects +=
-                    (tokensToDenom * redeemTokens) /
-                    10**(IERC20Metadata(IMErc20(address(asset)).underlying()).decimals());
+                sumBorrowPlusEffects += (tokensToDenom * redeemTokens) / underlyingScale;
 
                 // borrow effect
                 // sumBorrowPlusEffects += oraclePrice * borrowAmount
-                sumBorrowPlusEffects +=
-                    (oraclePrice * borrowAmount) /
-                    10**(IERC20Metadata(IMErc20(address(asset)).underlying()).decimals());
+                sumBorrowPlusEffects += (accountInfo.oraclePrice * borrowAmount) / underlyingScale;
             }
         }
 
@@ -739,31 +868,102 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         uint256 actualRepayAmount
     ) external view returns (uint256) {
         /* Read oracle prices for borrowed and collateral markets */
-        uint256 priceBorrowedMantissa = oracle.getUnderlyingPrice(IMToken(mTokenBorrowed));
-        uint256 priceCollateralMantissa = oracle.getUnderlyingPrice(IMToken(mTokenCollateral));
-        require(priceBorrowedMantissa != 0 && priceCollateralMantissa != 0, "Failed to get price");
+        IMToken[] memory mTokens = new IMToken[](2);
+        mTokens[0] = IMToken(mTokenBorrowed);
+        mTokens[1] = IMToken(mTokenCollateral);
+        uint256[] memory prices = oracle.getUnderlyingPrices(mTokens);
+        require(prices[0] != 0 && prices[1] != 0, "Failed to get price");
+
+        uint256 underlyingScale = _getUnderlyingScale(markets[mTokenBorrowed], mTokenBorrowed);
+        return
+            _calculateSeizeTokens(prices[0], prices[1], IMToken(mTokenCollateral), actualRepayAmount, underlyingScale);
+    }
+
+    /**
+     * @notice Calculate numbers of tokens of collateral assets to seize given underlying amounts
+     * @dev Used in fixed rate liquidation (called in mToken.liquidateBorrowFixedRate), all the prices are read
+     *  with a single oracle call and each collateral is priced once, whatever the number of repayments against it
+     * @param mTokenBorrowed The address of the borrowed mToken
+     * @param mTokenCollaterals The addresses of the distinct collateral mTokens
+     * @param collateralIndexes The index in mTokenCollaterals of the collateral of each repayment
+     * @param actualRepayAmounts The amount of mTokenBorrowed underlying of each repayment
+     * @return seizeTokens Number of tokens of its collateral to be seized for each repayment
+     */
+    function liquidateCalculateSeizeTokensBatch(
+        address mTokenBorrowed,
+        IMToken[] calldata mTokenCollaterals,
+        uint256[] calldata collateralIndexes,
+        uint256[] calldata actualRepayAmounts
+    ) external view returns (uint256[] memory seizeTokens) {
+        require(collateralIndexes.length == actualRepayAmounts.length, "Wrong arrays length");
+
+        /* Read oracle prices for the borrowed market, followed by the collateral markets */
+        IMToken[] memory mTokens = new IMToken[](mTokenCollaterals.length + 1);
+        mTokens[0] = IMToken(mTokenBorrowed);
+        for (uint256 i = 0; i < mTokenCollaterals.length; i++) {
+            mTokens[i + 1] = mTokenCollaterals[i];
+        }
+        uint256[] memory prices = oracle.getUnderlyingPrices(mTokens);
 
+        /* Calculate the seize ratio of each collateral once */
+        uint256[] memory ratios = new uint256[](mTokenCollaterals.length);
+        for (uint256 i = 0; i < mTokenCollaterals.length; i++) {
+            require(prices[0] != 0 && prices[i + 1] != 0, "Failed to get price");
+            ratios[i] = _calculateSeizeRatio(prices[0], prices[i + 1], mTokenCollaterals[i]);
+        }
+
+        uint256 underlyingScale = _getUnderlyingScale(markets[mTokenBorrowed], mTokenBorrowed);
+        seizeTokens = new uint256[](actualRepayAmounts.length);
+        for (uint256 i = 0; i < actualRepayAmounts.length; i++) {
+            seizeTokens[i] = (ratios[collateralIndexes[i]] * ((actualRepayAmounts[i] * 1e18) / underlyingScale)) / 1e18;
+        }
+    }
+
+    function _calculateSeizeTokens(
+        uint256 priceBorrowedMantissa,
+        uint256 priceCollateralMantissa,
+        IMToken mTokenCollateral,
+        uint256 actualRepayAmount,
+        uint256 underlyingScale
+    ) internal view returns (uint256) {
+        uint256 ratio = _calculateSeizeRatio(priceBorrowedMantissa, priceCollateralMantissa, mTokenCollateral);
+        return (ratio * ((actualRepayAmount * 1e18) / underlyingScale)) / 1e18;
+    }
+
+    /**
+     * @return The number of collateral tokens seized per unit of repaid underlying, scaled by 1e18
+     */
+    function _calculateSeizeRatio(
+        uint256 priceBorrowedMantissa,
+        uint256 priceCollateralMantissa,
+        IMToken mTokenCollateral
+    ) internal view returns (uint256) {
         /*
          * Get the exchange rate and calculate the number of collateral tokens to seize:
          *  seizeAmount = actualRepayAmount * liquidationIncentive * priceBorrowed / priceCollateral
          *  seizeTokens = seizeAmount / exchangeRate
          *   = actualRepayAmount * (liquidationIncentive * priceBorrowed) / (priceCollateral * exchangeRate)
          */
-        uint256 exchangeRateMantissa = IMToken(mTokenCollateral).exchangeRateStored(); // Note: reverts on error
-        uint256 seizeTokens;
-        uint256 numerator;
-        uint256 denominator;
-        uint256 ratio;
-
-        numerator = (liquidationIncentiveMantissa * priceBorrowedMantissa) / 1e18;
-        denominator = (priceCollateralMantissa * exchangeRateMantissa) / 1e18;
-        ratio = (numerator * 1e18) / denominator;
-
-        seizeTokens =
-            (ratio * (actualRepayAmount * 10**(18 - IERC20Metadata(IMErc20(mTokenBorrowed).underlying()).decimals()))) /
-            1e18;
+        // Note: reverts on error, interest pending in a collateral market that skipped its accrual is priced in
+        uint256 exchangeRateMantissa = mTokenCollateral.exchangeRateCurrent();
+        uint256 numerator = (liquidationIncentiveMantissa * priceBorrowedMantissa) / 1e18;
+        uint256 denominator = (priceCollateralMantissa * exchangeRateMantissa) / 1e18;
+        return (numerator * 1e18) / denominator;
+    }
 
-        return seizeTokens;
+    /**
+     * @notice Returns the scale (10 ** decimals) of the market's underlying asset
+     * @dev Markets listed before the scale was cached fall back to reading the underlying decimals
+     * @param market The market metadata
+     * @param mToken The address of the market
+     * @return The scale of the underlying asset
+     */
+    function _getUnderlyingScale(Market storage market, address mToken) internal view returns (uint256) {
+        uint256 underlyingScale = market.underlyingScale;
+        if (underlyingScale == 0) {
+            underlyingScale = 10**IERC20Metadata(IMErc20(mToken).underlying()).decimals();
+        }
+        return underlyingScale;
     }
 
     /*** Admin Functions ***/
@@ -778,6 +978,75 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         emit NewPriceOracle(oldOracle, newOracle);
     }
 
+    /**
+     * @notice Accrues interest of many markets in one transaction, so their stored state stays fresh
+     * @dev Keeper entry point, callable by anyone. A market is skipped when its last accrual is less than
+     *  maxAge seconds old, or while its accrual is fresh as accrueInterest would skip it (see MToken.accrualFresh)
+     * @param mTokens The markets to accrue
+     * @param maxAge Age in seconds of the last accrual from which a market is accrued, 0 to accrue every market
+     * @return accrued The number of markets whose interest was accrued
+     */
+    function accrueAll(IMToken[] calldata mTokens, uint256 maxAge) external returns (uint256 accrued) {
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            IMToken mToken = mTokens[i];
+            require(markets[address(mToken)].isListed, "Market is not listed");
+            if (block.timestamp - mToken.accrualBlockTimestamp() < maxAge || mToken.accrualFresh()) {
+                continue;
+            }
+            mToken.accrueInterest();
+            accrued++;
+        }
+    }
+
+    /**
+     * @notice Adds reserves to many markets, transferring the underlying from the admin
+     * @dev Admin function, the admin must have approved every market. Markets with a zero amount are skipped
+     * @param mTokens The markets to add reserves to
+     * @param addAmounts The amount of underlying to add to the reserves of each market
+     */
+    function addReservesMany(IMToken[] calldata mTokens, uint256[] calldata addAmounts)
+        external
+        onlyAdmin(msg.sender)
+    {
+        require(mTokens.length == addAmounts.length, "Wrong arrays length");
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            if (addAmounts[i] != 0) {
+                require(markets[address(mTokens[i])].isListed, "Market is not listed");
+                mTokens[i].addReservesFrom(msg.sender, addAmounts[i]);
+            }
+        }
+    }
+
+    /**
+     * @notice Reduces the reserves of many markets, each market transfers the underlying to its admin
+     * @dev Admin function, markets with a zero amount are skipped
+     * @param mTokens The markets to reduce reserves of
+     * @param reduceAmounts The amount of underlying to remove from the reserves of each market
+     */
+    function reduceReservesMany(IMToken[] calldata mTokens, uint256[] calldata reduceAmounts)
+        external
+        onlyAdmin(msg.sender)
+    {
+        require(mTokens.length == reduceAmounts.length, "Wrong arrays length");
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            if (reduceAmounts[i] != 0) {
+                require(markets[address(mTokens[i])].isListed, "Market is not listed");
+                mTokens[i].reduceReservesFromController(reduceAmounts[i]);
+            }
+        }
+    }
+
+    /**
+     * @notice Sets the MarketFactory allowed to list markets
+     * @dev Admin function, the zero address disables the factory
+     * @param newMarketFactory The new market factory
+     */
+    function setMarketFactory(address newMarketFactory) external onlyAdmin(msg.sender) {
+        address oldMarketFactory = marketFactory;
+        marketFactory = newMarketFactory;
+        emit NewMarketFactory(oldMarketFactory, newMarketFactory);
+    }
+
     /**
      * @notice Sets the closeFactor used when liquidating borrows
      * @dev Admin function to set closeFactor
@@ -791,11 +1060,14 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
 
     /**
      * @notice Sets the collateralFactor for a market
-     * @dev Admin function to set per-market collateralFactor
+     * @dev Admin and market factory function to set per-market collateralFactor
      * @param mToken The market to set the factor on
      * @param newCollateralFactorMantissa The new collateral factor, scaled by 1e18
      */
-    function setCollateralFactor(IMToken mToken, uint256 newCollateralFactorMantissa) external onlyAdmin(msg.sender) {
+    function setCollateralFactor(IMToken mToken, uint256 newCollateralFactorMantissa)
+        external
+        onlyAdminOrMarketFactory(msg.sender)
+    {
         // Verify market is listed
         Market storage market = markets[address(mToken)];
         require(market.isListed, "Market is not listed");
@@ -827,16 +1099,21 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
 
     /**
      * @notice Add the market to the markets mapping and set it as listed
-     * @dev Admin function to set isListed and add support for the market
+     * @dev Admin and market factory function to set isListed and add support for the market
      * @param mToken The address of the market (token) to list
      */
-    function supportMarket(IMToken mToken) external onlyAdmin(msg.sender) {
+    function supportMarket(IMToken mToken) external onlyAdminOrMarketFactory(msg.sender) {
         require(!markets[address(mToken)].isListed, "Market is already listed");
 
         mToken.isMToken(); // Sanity check to make sure its really a IMToken
 
         // Note that isNebed is not in active use anymore
-        markets[address(mToken)] = Market({isListed: true, isComped: false, collateralFactorMantissa: 0});
+        markets[address(mToken)] = Market({
+            isListed: true,
+            isComped: false,
+            collateralFactorMantissa: 0,
+            underlyingScale: 10**IERC20Metadata(IMErc20(address(mToken)).underlying()).decimals()
+        });
 
         _addMarketInternal(address(mToken));
         _initializeMarket(address(mToken));
@@ -845,10 +1122,21 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
     }
 
     function _addMarketInternal(address mToken) internal {
+        require(marketIndexes[mToken] == 0, "market already added");
+        require(allMarkets.length < maxMarkets, "Too many markets");
+        allMarkets.push(IMToken(mToken));
+        marketIndexes[mToken] = allMarkets.length;
+    }
+
+    /**
+     * @notice Indexes the markets listed before the membership bitmaps, so accounts can enter them
+     * @dev Admin function, markets which already have an index are skipped
+     */
+    function indexMarkets() external onlyAdmin(msg.sender) {
+        require(allMarkets.length <= maxMarkets, "Too many markets");
         for (uint256 i = 0; i < allMarkets.length; i++) {
-            require(allMarkets[i] != IMToken(mToken), "market already added");
+            marketIndexes[address(allMarkets[i])] = i + 1;
         }
-        allMarkets.push(IMToken(mToken));
     }
 
     function _initializeMarket(address mToken) internal {
@@ -1013,18 +1301,29 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      */
     function updateNebSupplyIndex(address mToken) internal {
         NebMarketState storage supplyState = nebSupplyState[mToken];
-        uint256 supplySpeed = nebSupplySpeeds[mToken];
         uint256 blockNumber = getBlockNumber();
-        uint256 deltaBlocks = blockNumber - supplyState.block;
+        if (blockNumber > supplyState.block) {
+            supplyState.index = nebSupplyIndexCurrent(mToken);
+            supplyState.block = blockNumber;
+        }
+    }
+
+    /**
+     * @notice Calculate the market supply index with NEB accrued up to the current block
+     * @param mToken The market whose supply index to calculate
+     * @return The supply index, without writing it to storage
+     */
+    function nebSupplyIndexCurrent(address mToken) internal view returns (uint256) {
+        NebMarketState storage supplyState = nebSupplyState[mToken];
+        uint256 supplySpeed = nebSupplySpeeds[mToken];
+        uint256 deltaBlocks = getBlockNumber() - supplyState.block;
         if (deltaBlocks > 0 && supplySpeed > 0) {
             uint256 supplyTokens = IMToken(mToken).totalSupply();
             uint256 nebAccrued = deltaBlocks * supplySpeed;
             uint256 ratio = supplyTokens > 0 ? (nebAccrued * 1e18) / supplyTokens : 0;
-            supplyState.index += ratio;
-            supplyState.block = blockNumber;
-        } else if (deltaBlocks > 0) {
-            supplyState.block = blockNumber;
+            return supplyState.index + ratio;
         }
+        return supplyState.index;
     }
 
     /**
@@ -1034,26 +1333,39 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      */
     function updateNebBorrowIndex(address mToken, uint256 marketBorrowIndex) internal {
         NebMarketState storage borrowState = nebBorrowState[mToken];
-        uint256 borrowSpeed = nebBorrowSpeeds[mToken];
         uint256 blockNumber = getBlockNumber();
-        uint256 deltaBlocks = blockNumber - borrowState.block;
+        if (blockNumber > borrowState.block) {
+            borrowState.index = nebBorrowIndexCurrent(mToken, marketBorrowIndex);
+            borrowState.block = blockNumber;
+        }
+    }
+
+    /**
+     * @notice Calculate the market borrow index with NEB accrued up to the current block
+     * @param mToken The market whose borrow index to calculate
+     * @param marketBorrowIndex The interest borrow index of the market
+     * @return The borrow index, without writing it to storage
+     */
+    function nebBorrowIndexCurrent(address mToken, uint256 marketBorrowIndex) internal view returns (uint256) {
+        NebMarketState storage borrowState = nebBorrowState[mToken];
+        uint256 borrowSpeed = nebBorrowSpeeds[mToken];
+        uint256 deltaBlocks = getBlockNumber() - borrowState.block;
         if (deltaBlocks > 0 && borrowSpeed > 0) {
             uint256 borrowAmount = IMToken(mToken).getTotalBorrows() / marketBorrowIndex;
             uint256 nebAccrued = deltaBlocks * borrowSpeed;
             uint256 ratio = borrowAmount > 0 ? (nebAccrued * 1e18) / borrowAmount : 0;
-            borrowState.index += ratio;
-            borrowState.block = blockNumber;
-        } else if (deltaBlocks > 0) {
-            borrowState.block = blockNumber;
+            return borrowState.index + ratio;
         }
+        return borrowState.index;
     }
 
     /**
      * @notice Calculate NEB accrued by a supplier and possibly transfer it to them
      * @param mToken The market in which the supplier is interacting
      * @param supplier The address of the supplier to distribute NEB to
+     * @return The supplier's balance of mTokens
      */
-    function distributeSupplierNeb(address mToken, address supplier) internal {
+    function distributeSupplierNeb(address mToken, address supplier) internal returns (uint256) {
         // TODO: Dont distribute supplier NEB if the user is not in the supplier market.
         // This check should be as gas efficient as possible as distributeSupplierNeb is called in many places.
         // - We really dont want to call an external contract as thats quite expensive.
@@ -1082,6 +1394,23 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
         nebAccrued[supplier] += supplierDelta;
 
         emit DistributedSupplierNeb(IMToken(mToken), supplier, supplierDelta, supplyIndex);
+
+        return supplierTokens;
+    }
+
+    /**
+     * @notice Add the market to the supplier's list of supply markets, used to claim NEB
+     * @param mToken The market the supplier receives mTokens in
+     * @param supplier The address of the account to modify
+     */
+    function addToSupplyMarketsInternal(address mToken, address supplier) internal {
+        if (supplyMembership[mToken][supplier]) {
+            // already joined
+            return;
+        }
+
+        supplyMembership[mToken][supplier] = true;
+        accountSupplyMarkets[supplier].push(IMToken(mToken));
     }
 
     /**
@@ -1142,10 +1471,67 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
 
     /**
      * @notice Claim all the neb accrued by holder in all markets
+     * @dev Only the markets the holder has a position in are visited: borrow side NEB is claimed in the
+     *  markets the holder has entered, supply side NEB in the markets the holder has received mTokens in.
+     *  Supply markets, where the holder's balance became zero, are removed from the holder's list.
      * @param holder The address to claim NEB for
      */
     function claimNeb(address holder) public {
-        claimNeb(holder, allMarkets);
+        IMToken[] memory assets = accountAssetsIn(holder);
+        for (uint256 i = 0; i < assets.length; i++) {
+            address mToken = address(assets[i]);
+            uint256 borrowIndex = IMToken(mToken).borrowIndex();
+            updateNebBorrowIndex(mToken, borrowIndex);
+            distributeBorrowerNeb(mToken, holder, borrowIndex);
+        }
+
+        IMToken[] storage supplyMarkets = accountSupplyMarkets[holder];
+        for (uint256 i = supplyMarkets.length; i > 0; i--) {
+            address mToken = address(supplyMarkets[i - 1]);
+            updateNebSupplyIndex(mToken);
+            if (distributeSupplierNeb(mToken, holder) == 0) {
+                // copy last item in list to location of item to be removed, reduce length by 1
+                supplyMembership[mToken][holder] = false;
+                supplyMarkets[i - 1] = supplyMarkets[supplyMarkets.length - 1];
+                supplyMarkets.pop();
+            }
+        }
+
+        nebAccrued[holder] = grantNebInternal(holder, nebAccrued[holder]);
+    }
+
+    /**
+     * @notice Calculate the NEB accrued by holder in the markets the holder has a position in
+     * @dev Includes NEB not yet distributed to the holder, without writing anything to storage
+     * @param holder The address to calculate NEB for
+     * @return accrued The amount of NEB claimable by the holder
+     */
+    function nebAccruedCurrent(address holder) external view returns (uint256 accrued) {
+        accrued = nebAccrued[holder];
+
+        IMToken[] memory assets = accountAssetsIn(holder);
+        for (uint256 i = 0; i < assets.length; i++) {
+            IMToken mToken = assets[i];
+            uint256 marketBorrowIndex = mToken.borrowIndex();
+            uint256 borrowIndex = nebBorrowIndexCurrent(address(mToken), marketBorrowIndex);
+            uint256 borrowerIndex = nebBorrowerIndex[address(mToken)][holder];
+            if (borrowerIndex == 0 && borrowIndex >= nebInitialIndex) {
+                borrowerIndex = nebInitialIndex;
+            }
+            uint256 borrowerAmount = mToken.borrowBalanceStored(holder) / marketBorrowIndex;
+            accrued += borrowerAmount * (borrowIndex - borrowerIndex);
+        }
+
+        IMToken[] memory supplyMarkets = accountSupplyMarkets[holder];
+        for (uint256 i = 0; i < supplyMarkets.length; i++) {
+            IMToken mToken = supplyMarkets[i];
+            uint256 supplyIndex = nebSupplyIndexCurrent(address(mToken));
+            uint256 supplierIndex = nebSupplierIndex[address(mToken)][holder];
+            if (supplierIndex == 0 && supplyIndex >= nebInitialIndex) {
+                supplierIndex = nebInitialIndex;
+            }
+            accrued += mToken.balanceOf(holder) * (supplyIndex - supplierIndex);
+        }
     }
 
     /**
@@ -1202,9 +1588,13 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      * @return The amount of NEB which was NOT transferred to the user
      */
     function grantNebInternal(address user, uint256 amount) internal returns (uint256) {
+        if (amount == 0) {
+            return 0;
+        }
+
         Neb neb = Neb(getNebAddress());
         uint256 nebRemaining = neb.balanceOf(address(this));
-        if (amount > 0 && amount <= nebRemaining) {
+        if (amount <= nebRemaining) {
             neb.transfer(user, amount);
             return 0;
         }
@@ -1292,7 +1682,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
             mToken.reserveFactorMantissa() == 1e18;
     }
 
-    function getBlockNumber() public view returns (uint256) {
+    function getBlockNumber() public view virtual returns (uint256) {
         return block.number;
     }
 
@@ -1300,7 +1690,7 @@ contract Controller is ControllerV7Storage, IController, IControllerEvents {
      * @notice Return the address of the NEB token
      * @return The address of NEB
      */
-    function getNebAddress() public view returns (address) {
+    function getNebAddress() public view virtual returns (address) {
         return 0xc00e94Cb662C3520282E6f5717214004A7f26888;
     }
 }
@@ -65,6 +65,8 @@ contract ControllerV2Storage is ControllerV1Storage {
         uint256 collateralFactorMantissa;
         /// @notice Whether or not this market receives NEB
         bool isComped;
+        /// @notice Scale of the market's underlying asset (10 ** underlying decimals), cached at listing
+        uint256 underlyingScale;
     }
 
     /// @notice Per-market mapping of "accounts in this asset"
@@ -152,3 +154,27 @@ contract ControllerV7Storage is ControllerV6Storage {
     /// @notice Accounting storage mapping account addresses to how much NEB they owe the protocol.
     mapping(address => uint256) public nebReceivable;
 }
+
+contract ControllerV8Storage is ControllerV7Storage {
+    /// @notice Per-account list of markets the account has received mTokens in, used to claim supplier NEB
+    mapping(address => IMToken[]) public accountSupplyMarkets;
+
+    /// @notice Per-market mapping of "accounts supplying this asset"
+    /// Token => user => indicator
+    mapping(address => mapping(address => bool)) public supplyMembership;
+}
+
+contract ControllerV9Storage is ControllerV8Storage {
+    /// @notice Position of each market in allMarkets plus one, assigned when the market is listed (0 = not indexed)
+    mapping(address => uint256) public marketIndexes;
+
+    /// @notice Per-account bitmap of the markets the account has entered, bit i stands for allMarkets[i]
+    /// Replaces accountAssets and accountMembership, which still count for the accounts entered before the bitmaps
+    /// until they are migrated
+    mapping(address => uint256) public accountMembershipBitmaps;
+}
+
+contract ControllerV10Storage is ControllerV9Storage {
+    /// @notice The MarketFactory allowed to list markets and set their collateral factor alongside the admin
+    address public marketFactory;
+}
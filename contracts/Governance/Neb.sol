@@ -207,15 +207,39 @@ contract Neb {
      */
     function getPriorVotes(address account, uint256 blockNumber) public view returns (uint96) {
         require(blockNumber < block.number, "Comp::getPriorVotes: not yet determined");
+        return _getPriorVotes(account, blockNumber);
+    }
+
+    /**
+     * @notice Determine the prior number of votes for many accounts as of a block number
+     * @dev Block number must be a finalized block or else this function will revert to prevent misinformation.
+     * @param accounts The addresses of the accounts to check
+     * @param blockNumber The block number to get the vote balances at
+     * @return votes The number of votes every account had as of the given block
+     */
+    function getPriorVotesMany(address[] calldata accounts, uint256 blockNumber)
+        external
+        view
+        returns (uint96[] memory votes)
+    {
+        require(blockNumber < block.number, "Comp::getPriorVotes: not yet determined");
+
+        votes = new uint96[](accounts.length);
+        for (uint256 i = 0; i < accounts.length; i++) {
+            votes[i] = _getPriorVotes(accounts[i], blockNumber);
+        }
+    }
 
+    function _getPriorVotes(address account, uint256 blockNumber) internal view returns (uint96) {
         uint32 nCheckpoints = numCheckpoints[account];
         if (nCheckpoints == 0) {
             return 0;
         }
 
         // First check most recent balance
-        if (checkpoints[account][nCheckpoints - 1].fromBlock <= blockNumber) {
-            return checkpoints[account][nCheckpoints - 1].votes;
+        Checkpoint memory latest = checkpoints[account][nCheckpoints - 1];
+        if (latest.fromBlock <= blockNumber) {
+            return latest.votes;
         }
 
         // Next check implicit zero balance
@@ -9,6 +9,7 @@ import "./interfaces/IMErc20.sol";
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/utils/Address.sol";
 
 /**
  * @title Market ERC20 Contract
@@ -22,6 +23,21 @@ contract MErc20 is MToken, IMErc20 {
      */
     address public underlying;
 
+    /**
+     * @notice Internal balance of the underlying, used as the market cash when internalCash is set
+     */
+    uint256 public totalCash;
+
+    /**
+     * @notice Whether the market cash is read from totalCash instead of the underlying balance of the market
+     */
+    bool public internalCash;
+
+    /**
+     * @notice Whether the underlying is known to transfer the full amount, so transfers in are not measured
+     */
+    bool public noTransferFee;
+
     /**
      * @notice Initialize the new money market
      * @param underlying_ The address of the underlying asset
@@ -97,18 +113,18 @@ contract MErc20 is MToken, IMErc20 {
 
     /**
      * @notice Sender repays borrows, taken for fixed rate
-     * @param borrowsIndexes Indexes of borrows, which sender wants to repay
+     * @param borrowIds IDs of borrows, which sender wants to repay
      */
-    function repayBorrowFixedRate(uint256[] memory borrowsIndexes) external {
-        repayBorrowFixedRateInternal(borrowsIndexes);
+    function repayBorrowFixedRate(uint256[] memory borrowIds) external {
+        repayBorrowFixedRateInternal(borrowIds);
     }
 
     /**
      * @notice Sender repays borrows, taken for fixed rate, belonging to borrower
-     * @param borrowsIndexes Indexes of borrows, which sender wants to repay
+     * @param borrowIds IDs of borrows, which sender wants to repay
      */
-    function repayBorrowFixedRateOnBehalf(address borrower, uint256[] memory borrowsIndexes) external {
-        repayBorrowFixedRateOnBehalfInternal(borrower, borrowsIndexes);
+    function repayBorrowFixedRateOnBehalf(address borrower, uint256[] memory borrowIds) external {
+        repayBorrowFixedRateOnBehalfInternal(borrower, borrowIds);
     }
 
     /**
@@ -131,15 +147,29 @@ contract MErc20 is MToken, IMErc20 {
     /**
      * The sender liquidates the borrowers loans, taken for fixed rate.
      * @param borrower The borrower, which fixed rate borrows to be liquidated
-     * @param borrowsIndexes Indexes of borrows, which sender wants to liquidate
+     * @param borrowIds IDs of borrows, which sender wants to liquidate
      * @param mTokenCollaterals The market in which to seize collateral from the borrower for each borrow
      */
     function liquidateBorrowFixedRate(
         address borrower,
-        uint256[] memory borrowsIndexes,
+        uint256[] memory borrowIds,
         IMToken[] memory mTokenCollaterals
     ) external {
-        liquidateBorrowFixedRateInternal(borrower, borrowsIndexes, mTokenCollaterals);
+        liquidateBorrowFixedRateInternal(borrower, borrowIds, mTokenCollaterals);
+    }
+
+    /**
+     * The sender liquidates fixed rate borrows of many borrowers in one transaction.
+     * @param borrowers The borrowers, which fixed rate borrows to be liquidated
+     * @param borrowIds IDs of borrows, which sender wants to liquidate, for each borrower
+     * @param mTokenCollaterals The market in which to seize collateral for each borrow of each borrower
+     */
+    function liquidateBorrowFixedRateBatch(
+        address[] memory borrowers,
+        uint256[][] memory borrowIds,
+        IMToken[][] memory mTokenCollaterals
+    ) external {
+        liquidateBorrowFixedRateBatchInternal(borrowers, borrowIds, mTokenCollaterals);
     }
 
     /**
@@ -157,16 +187,68 @@ contract MErc20 is MToken, IMErc20 {
         liquidateBorrowInternal(borrower, repayAmount, mTokenCollateral);
     }
 
+    /**
+     * @notice Sender runs several actions on this market atomically, e.g. mint and borrow, or repay and redeem
+     * @dev Calls are delegated to this contract, so msg.sender is preserved for every action.
+     *  Interest is accrued by the first action only, and the sender's liquidity check is run once,
+     *  after all actions are done, instead of in every borrow/redeem/transfer hook
+     * @param data Encoded calls of this contract's functions
+     * @return results Return data of each call
+     */
+    function multicall(bytes[] calldata data) external returns (bytes[] memory results) {
+        require(deferredLiquidityAccount == address(0), "Multicall is already in progress");
+        deferredLiquidityAccount = msg.sender;
+
+        results = new bytes[](data.length);
+        for (uint256 i = 0; i < data.length; i++) {
+            results[i] = Address.functionDelegateCall(address(this), data[i]);
+        }
+
+        deferredLiquidityAccount = address(0);
+
+        (, uint256 shortfall) = controller.getAccountLiquidity(msg.sender);
+        require(shortfall == 0, "Insufficient liquidity");
+    }
+
     /**
      * @notice A public function to sweep accidental ERC-20 transfers to this contract. Tokens are sent to admin (timelock)
+     * @dev With internal cash accounting the underlying can be swept too: the balance above totalCash is sent to admin,
+     *  and a balance below totalCash (e.g. a negative rebase) lowers totalCash to the balance
      * @param token The address of the ERC-20 token to sweep
      */
     function sweepToken(IERC20 token) external onlyAdmin(msg.sender) {
-        require(address(token) != underlying, "CErc20::sweepToken: can not sweep underlying token");
         uint256 balance = token.balanceOf(address(this));
+        if (address(token) == underlying) {
+            require(internalCash, "CErc20::sweepToken: can not sweep underlying token");
+            uint256 oldTotalCash = totalCash;
+            if (balance > oldTotalCash) {
+                token.safeTransfer(admin, balance - oldTotalCash);
+            } else {
+                totalCash = balance;
+            }
+            emit CashReconciled(oldTotalCash, totalCash);
+            return;
+        }
         token.safeTransfer(admin, balance);
     }
 
+    /**
+     * @notice Sets how the market accounts for its cash (*requires fresh interest accrual)
+     * @dev Admin function. Enabling internal cash starts totalCash at the current underlying balance,
+     *  noTransferFee must only be set for underlyings that can't charge a fee on transfer
+     * @param internalCash_ Whether the cash is read from totalCash instead of the underlying balance
+     * @param noTransferFee_ Whether transfers in are trusted to deliver the full amount
+     */
+    function setCashAccounting(bool internalCash_, bool noTransferFee_) external nonReentrant onlyAdmin(msg.sender) {
+        accrueInterestInternal();
+        if (internalCash_ && !internalCash) {
+            totalCash = IERC20(underlying).balanceOf(address(this));
+        }
+        internalCash = internalCash_;
+        noTransferFee = noTransferFee_;
+        emit NewCashAccounting(internalCash_, noTransferFee_, totalCash);
+    }
+
     /**
      * @notice The sender adds to reserves.
      * @param addAmount The amount fo underlying token to add as reserves
@@ -179,10 +261,14 @@ contract MErc20 is MToken, IMErc20 {
 
     /**
      * @notice Gets balance of this contract in terms of the underlying
-     * @dev This excludes the value of the current message, if any
+     * @dev This excludes the value of the current message, if any. With internal cash accounting
+     *  this is totalCash, so direct transfers to the market don't change its cash
      * @return The quantity of underlying tokens owned by this contract
      */
     function getCashPrior() internal view override returns (uint256) {
+        if (internalCash) {
+            return totalCash;
+        }
         IERC20 token = IERC20(underlying);
         return token.balanceOf(address(this));
     }
@@ -192,15 +278,28 @@ contract MErc20 is MToken, IMErc20 {
      *      This will revert due to insufficient balance or insufficient allowance.
      *      This function returns the actual amount received,
      *      which may be less than amount if there is a fee attached to the transfer.
+     *      The balance isn't measured for underlyings known to charge no fee.
      */
     function doTransferIn(address from, uint256 amount) internal override returns (uint256) {
         IERC20 token = IERC20(underlying);
+        if (noTransferFee) {
+            token.safeTransferFrom(from, address(this), amount);
+            if (internalCash) {
+                totalCash += amount;
+            }
+            return amount;
+        }
+
         uint256 balanceBefore = token.balanceOf(address(this));
         token.safeTransferFrom(from, address(this), amount);
 
         // Calculate the amount that was *actually* transferred
         uint256 balanceAfter = token.balanceOf(address(this));
-        return balanceAfter - balanceBefore; // underflow already checked above, just subtract
+        uint256 received = balanceAfter - balanceBefore; // underflow already checked above, just subtract
+        if (internalCash) {
+            totalCash += received;
+        }
+        return received;
     }
 
     /**
@@ -211,6 +310,9 @@ contract MErc20 is MToken, IMErc20 {
      *
      */
     function doTransferOut(address payable to, uint256 amount) internal override {
+        if (internalCash) {
+            totalCash -= amount;
+        }
         IERC20 token = IERC20(underlying);
         token.safeTransfer(to, amount);
     }
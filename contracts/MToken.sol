@@ -7,12 +7,17 @@ import "./interfaces/IInterestRateModel.sol";
 import "./MTokenStorage.sol";
 import "./interfaces/IMTokenEvents.sol";
 
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
+
 /**
  * @title Market Token Contract
  * @notice Abstract base for CTokens
  * @author Blaize.tech
  */
 abstract contract MToken is MTokenStorage, IMTokenEvents {
+    using EnumerableSet for EnumerableSet.UintSet;
+
     /**
      * @notice Check that user is an admin
      * @param _caller Address of user to check
@@ -22,12 +27,28 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         _;
     }
 
+    /**
+     * @notice Check that caller is the controller
+     */
+    modifier onlyController() {
+        require(msg.sender == address(controller), "Caller is not the controller");
+        _;
+    }
+
     /**
      * @notice Check that market is fresh
      */
     modifier marketFresh() {
-        /* Verify market's block number equals current block number */
-        require(accrualBlockNumber == getBlockNumber(), "Market is not fresh");
+        /* Verify market's interest was accrued in this block */
+        require(accrualBlockTimestamp == getBlockTimestamp(), "Market is not fresh");
+        _;
+    }
+
+    /**
+     * @notice Check that market's interest was accrued recently enough (see accrualFresh)
+     */
+    modifier marketAccrualFresh() {
+        require(accrualFresh(), "Market is not fresh");
         _;
     }
 
@@ -49,7 +70,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         uint8 decimals_
     ) public {
         admin = payable(msg.sender);
-        require(accrualBlockNumber == 0 && borrowIndex == 0, "market may only be initialized once");
+        require(accrualBlockTimestamp == 0 && borrowIndex == 0, "market may only be initialized once");
 
         // Set initial exchange rate
         initialExchangeRateMantissa = initialExchangeRateMantissa_;
@@ -58,8 +79,8 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         // Set the controller
         setController(controller_);
 
-        // Initialize block number and borrow index (block number mocks depend on controller being set)
-        accrualBlockNumber = getBlockNumber();
+        // Initialize block timestamp and borrow index (block timestamp mocks depend on controller being set)
+        accrualBlockTimestamp = getBlockTimestamp();
         borrowIndex = 1e18;
         restPeriod = 4 hours;
 
@@ -193,7 +214,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param owner The address of the account to query
      * @return The amount of underlying owned by owner
      */
-    function balanceOfUnderlying(address owner) external returns (uint256) {
+    function balanceOfUnderlying(address owner) external view returns (uint256) {
         uint256 exchangeRate = exchangeRateCurrent();
         uint256 balance = (exchangeRate * accountTokens[owner]) / 1e18;
         return balance;
@@ -224,11 +245,43 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
     }
 
     /**
-     * @dev Function to simply retrieve block number
+     * @notice Get snapshots of the balances of many accounts, and the cached exchange rate
+     * @dev Batched version of getAccountSnapshot for off-chain monitoring, the exchange rate is computed once
+     * @param accounts Addresses of the accounts to snapshot
+     * @return tokenBalances Token balance of each account
+     * @return borrowBalances Borrow balance of each account
+     * @return exchangeRateMantissa Exchange rate mantissa shared by all snapshots
+     * @return borrowBalancesTotal Borrow balance + fixed rate borrow balance of each account
+     */
+    function getAccountSnapshots(address[] calldata accounts)
+        external
+        view
+        returns (
+            uint256[] memory tokenBalances,
+            uint256[] memory borrowBalances,
+            uint256 exchangeRateMantissa,
+            uint256[] memory borrowBalancesTotal
+        )
+    {
+        tokenBalances = new uint256[](accounts.length);
+        borrowBalances = new uint256[](accounts.length);
+        borrowBalancesTotal = new uint256[](accounts.length);
+        exchangeRateMantissa = exchangeRateStoredInternal();
+
+        for (uint256 i = 0; i < accounts.length; i++) {
+            address account = accounts[i];
+            tokenBalances[i] = accountTokens[account];
+            borrowBalances[i] = borrowBalanceStoredInternal(account);
+            borrowBalancesTotal[i] = borrowBalances[i] + borrowBalanceFixedStored(account);
+        }
+    }
+
+    /**
+     * @dev Function to simply retrieve block timestamp
      *  This exists mainly for inheriting test contracts to stub this result.
      */
-    function getBlockNumber() internal view returns (uint256) {
-        return block.number;
+    function getBlockTimestamp() internal view returns (uint256) {
+        return block.timestamp;
     }
 
     /**
@@ -239,10 +292,12 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
     }
 
     /**
-     * @dev Function to simply retrieve accrual block number.
+     * @notice Returns whether interest of the market is accrued recently enough to act on stored values
+     * @dev True if interest was accrued in this block or less than minAccrualInterval seconds ago
      */
-    function getAccrualBlockNumber() external view returns (uint256) {
-        return accrualBlockNumber;
+    function accrualFresh() public view returns (bool) {
+        uint256 timeDelta = getBlockTimestamp() - accrualBlockTimestamp;
+        return timeDelta == 0 || timeDelta < minAccrualInterval;
     }
 
     /**
@@ -284,64 +339,225 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
 
     /**
      * @notice Returns the current total borrows plus accrued interest
+     * @dev Interest is computed up to the current block without being written to storage
      * @return The total borrows with interest
      */
-    function totalBorrowsCurrent() external nonReentrant returns (uint256) {
-        accrueInterest();
-        return totalBorrows;
+    function totalBorrowsCurrent() external view returns (uint256) {
+        return accruedInterestState().totalBorrows;
     }
 
     /**
      * @notice Returns the amount of account's borrows, taken for a fixed rate
      */
     function fixedBorrowsAmount(address account) external view returns (uint256) {
-        return accountFixedRateBorrows[account].length;
+        return accountFixedRateBorrowIds[account].length();
+    }
+
+    /**
+     * @notice Returns the IDs of account's borrows, taken for a fixed rate
+     * @dev The order of the IDs changes when a borrow is repaid, the IDs themselves don't
+     */
+    function fixedBorrowIds(address account) external view returns (uint256[] memory) {
+        return accountFixedRateBorrowIds[account].values();
     }
 
     /**
-     * @notice Accrue interest to updated borrowIndex and then calculate account's borrow balance using the updated borrowIndex
-     * @param account The address whose balance should be calculated after updating borrowIndex
+     * @notice Calculate account's borrow balance using the borrowIndex with interest accrued up to the current block
+     * @param account The address whose balance should be calculated
      * @return The calculated balance
      */
-    function borrowBalanceCurrent(address account) external nonReentrant returns (uint256) {
-        accrueInterest();
-        return borrowBalanceStored(account);
+    function borrowBalanceCurrent(address account) external view returns (uint256) {
+        return borrowBalanceInternal(account, accruedInterestState().borrowIndex);
     }
 
     /**
      * @notice Returns an account's fixed rate borrows which can be luqidated
-     * @dev returns (uint256[] memory indexes, uint256[] memory repayAmounts) indexes of borrows, borrow amount plus interest to repay for each borrow
+     * @return borrowIds IDs of the liquidatable borrows
+     * @return repayAmounts Borrow amount plus interest to repay for each borrow
      */
     function expiredBorrows(address account)
         external
         view
-        returns (uint256[] memory indexes, uint256[] memory repayAmounts)
+        returns (uint256[] memory borrowIds, uint256[] memory repayAmounts)
     {
-        FixedRateBorrow[] memory borrows = accountFixedRateBorrows[account];
-        if (borrows.length == 0) {
-            return (indexes, repayAmounts);
+        uint256[] memory ids = accountFixedRateBorrowIds[account].values();
+        if (ids.length == 0) {
+            return (borrowIds, repayAmounts);
         }
 
-        uint256[] memory tmpIndexes = new uint256[](borrows.length);
-        uint256[] memory tmpRepayAmounts = new uint256[](borrows.length);
+        mapping(uint256 => FixedRateBorrow) storage borrows = accountFixedRateBorrows[account];
+        uint256[] memory tmpRepayAmounts = new uint256[](ids.length);
         uint256 count;
-        for (uint256 i = 0; i < borrows.length; i++) {
-            if (block.timestamp > borrows[i].openedAt + borrows[i].duration + restPeriod) {
-                tmpIndexes[count] = i;
-                tmpRepayAmounts[count] = borrows[i].amount + ((borrows[i].amount * borrows[i].rate) / 1e18);
+        uint256 restPeriod_ = restPeriod;
+        for (uint256 i = 0; i < ids.length; i++) {
+            FixedRateBorrow memory fixedBorrow = borrows[ids[i]];
+            if (block.timestamp > uint256(fixedBorrow.openedAt) + fixedBorrow.duration + restPeriod_) {
+                ids[count] = ids[i];
+                tmpRepayAmounts[count] = fixedBorrow.amount + ((uint256(fixedBorrow.amount) * fixedBorrow.rate) / 1e18);
                 count++;
             }
         }
 
-        indexes = new uint256[](count);
+        borrowIds = new uint256[](count);
         repayAmounts = new uint256[](count);
 
         for (uint256 i = 0; i < count; i++) {
-            indexes[i] = tmpIndexes[i];
+            borrowIds[i] = ids[i];
             repayAmounts[i] = tmpRepayAmounts[i];
         }
     }
 
+    /**
+     * @notice Page of the expiry index entries, visited during a single call
+     */
+    struct ExpiryIndexPage {
+        address[] borrowers;
+        uint256[] buckets;
+        uint256 count;
+        uint256 capacity;
+        uint256 nextCursor;
+    }
+
+    /**
+     * @notice Liquidatable borrows, collected from a page of the expiry index
+     */
+    struct ExpiredBorrowsPage {
+        address[] borrowers;
+        uint256[] borrowIds;
+        uint256[] repayAmounts;
+        uint256 count;
+    }
+
+    /**
+     * @notice Returns liquidatable fixed rate borrows of every account, which reached maturity in the given period
+     * @dev Walks the expiry index bucket by bucket, so only borrowers with a maturity inside the period are visited.
+     *  Pass 0 as cursor to get the first page and the returned nextCursor to get the following ones.
+     *  nextCursor equal to 0 means that the whole period has been visited.
+     * @param fromTs Start of the maturity period (inclusive)
+     * @param toTs End of the maturity period (inclusive)
+     * @param cursor Pagination cursor, returned by the previous call
+     * @param limit Maximum number of index entries (borrowers or empty buckets) to visit during the call
+     * @return borrowers Owner of each liquidatable borrow
+     * @return borrowIds ID of each borrow in the owner's fixed rate borrows
+     * @return repayAmounts Borrow amount plus interest to repay for each borrow
+     * @return nextCursor Cursor for the next page, 0 if there are no more entries
+     */
+    function expiredBorrowsBetween(
+        uint256 fromTs,
+        uint256 toTs,
+        uint256 cursor,
+        uint256 limit
+    )
+        external
+        view
+        returns (
+            address[] memory borrowers,
+            uint256[] memory borrowIds,
+            uint256[] memory repayAmounts,
+            uint256 nextCursor
+        )
+    {
+        require(fromTs <= toTs && limit != 0, "Invalid period or limit");
+
+        ExpiryIndexPage memory page = _readExpiryIndexPage(fromTs, toTs, cursor, limit);
+        ExpiredBorrowsPage memory expired = _collectExpiredBorrows(page, fromTs, toTs);
+
+        borrowers = new address[](expired.count);
+        borrowIds = new uint256[](expired.count);
+        repayAmounts = new uint256[](expired.count);
+
+        for (uint256 i = 0; i < expired.count; i++) {
+            borrowers[i] = expired.borrowers[i];
+            borrowIds[i] = expired.borrowIds[i];
+            repayAmounts[i] = expired.repayAmounts[i];
+        }
+        nextCursor = page.nextCursor;
+    }
+
+    /**
+     * @notice Reads the next page of the expiry index entries
+     * @dev The cursor packs the bucket (upper 128 bits) and the position inside the bucket (lower 128 bits)
+     */
+    function _readExpiryIndexPage(
+        uint256 fromTs,
+        uint256 toTs,
+        uint256 cursor,
+        uint256 limit
+    ) internal view returns (ExpiryIndexPage memory page) {
+        uint256 bucket = fromTs / maturityBucketSize;
+        uint256 lastBucket = toTs / maturityBucketSize;
+        uint256 position;
+        if (cursor != 0) {
+            bucket = cursor >> 128;
+            position = uint128(cursor);
+        }
+
+        page.borrowers = new address[](limit);
+        page.buckets = new uint256[](limit);
+        uint256 visited;
+        while (bucket <= lastBucket && visited < limit) {
+            address[] storage entries = maturityBuckets[bucket];
+            uint256 entriesLength = entries.length;
+            if (position >= entriesLength) {
+                // Empty buckets count towards the limit as well, so the amount of work per call stays bounded
+                if (entriesLength == 0) {
+                    visited++;
+                }
+                bucket++;
+                position = 0;
+                continue;
+            }
+
+            address borrower = entries[position];
+            page.borrowers[page.count] = borrower;
+            page.buckets[page.count] = bucket;
+            page.capacity += accountFixedRateBorrowIds[borrower].length();
+            page.count++;
+            position++;
+            visited++;
+        }
+
+        if (bucket <= lastBucket) {
+            page.nextCursor = (bucket << 128) | position;
+        }
+    }
+
+    /**
+     * @notice Collects liquidatable borrows of the page borrowers, maturing in the bucket they were indexed under
+     */
+    function _collectExpiredBorrows(
+        ExpiryIndexPage memory page,
+        uint256 fromTs,
+        uint256 toTs
+    ) internal view returns (ExpiredBorrowsPage memory expired) {
+        expired.borrowers = new address[](page.capacity);
+        expired.borrowIds = new uint256[](page.capacity);
+        expired.repayAmounts = new uint256[](page.capacity);
+        uint256 restPeriod_ = restPeriod;
+
+        for (uint256 k = 0; k < page.count; k++) {
+            mapping(uint256 => FixedRateBorrow) storage borrows = accountFixedRateBorrows[page.borrowers[k]];
+            uint256[] memory ids = accountFixedRateBorrowIds[page.borrowers[k]].values();
+            for (uint256 i = 0; i < ids.length; i++) {
+                FixedRateBorrow memory fixedBorrow = borrows[ids[i]];
+                uint256 maturityTimestamp = uint256(fixedBorrow.openedAt) + fixedBorrow.duration;
+                if (
+                    maturityTimestamp / maturityBucketSize == page.buckets[k] &&
+                    maturityTimestamp >= fromTs &&
+                    maturityTimestamp <= toTs &&
+                    block.timestamp > maturityTimestamp + restPeriod_
+                ) {
+                    expired.borrowers[expired.count] = page.borrowers[k];
+                    expired.borrowIds[expired.count] = ids[i];
+                    expired.repayAmounts[expired.count] =
+                        fixedBorrow.amount +
+                        ((uint256(fixedBorrow.amount) * fixedBorrow.rate) / 1e18);
+                    expired.count++;
+                }
+            }
+        }
+    }
+
     /**
      * @notice Return the borrow balance of account based on stored data
      * @param account The address whose balance should be calculated
@@ -359,6 +575,16 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      */
     function borrowBalanceStoredInternal(address account) internal view returns (uint256) {
         /* Note: we do not assert that the market is up to date */
+        return borrowBalanceInternal(account, borrowIndex);
+    }
+
+    /**
+     * @notice Return the borrow balance of account for the given market borrow index
+     * @param account The address whose balance should be calculated
+     * @param borrowIndex_ The market borrow index to calculate the balance with
+     * @return The calculated balance
+     */
+    function borrowBalanceInternal(address account, uint256 borrowIndex_) internal view returns (uint256) {
         uint256 principalTimesIndex;
         uint256 result;
 
@@ -375,29 +601,31 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         /* Calculate new borrow balance using the interest index:
          *  recentBorrowBalance = borrower.borrowBalance * market.borrowIndex / borrower.borrowIndex
          */
-        principalTimesIndex = borrowSnapshot.principal * borrowIndex;
+        principalTimesIndex = borrowSnapshot.principal * borrowIndex_;
 
         result = principalTimesIndex / borrowSnapshot.interestIndex;
 
         return result;
     }
 
+    /**
+     * @notice Return the principal of account's fixed rate borrows based on stored data
+     * @dev The running total is maintained on every fixed borrow and repay, so this is a single SLOAD
+     * @param account The address whose balance should be calculated
+     * @return The total principal of open fixed rate borrows
+     */
     function borrowBalanceFixedStored(address account) internal view returns (uint256) {
-        FixedRateBorrow[] memory borrows = accountFixedRateBorrows[account];
-        uint256 accountTotalFixedBorrow;
-        for (uint256 i = 0; i < borrows.length; i++) {
-            accountTotalFixedBorrow += borrows[i].amount;
-        }
-        return accountTotalFixedBorrow;
+        return accountFixedRateBorrowsPrincipal[account];
     }
 
     /**
-     * @notice Accrue interest then return the up-to-date exchange rate
+     * @notice Return the up-to-date exchange rate, with interest accrued up to the current block
+     * @dev Interest is computed on the fly without being written to storage
      * @return Calculated exchange rate scaled by 1e18
      */
-    function exchangeRateCurrent() public nonReentrant returns (uint256) {
-        accrueInterest();
-        return exchangeRateStored();
+    function exchangeRateCurrent() public view returns (uint256) {
+        AccrualState memory state = accruedInterestState();
+        return exchangeRateInternal(state.totalBorrows, state.totalReserves);
     }
 
     /**
@@ -415,6 +643,16 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @return (error code, calculated exchange rate scaled by 1e18)
      */
     function exchangeRateStoredInternal() internal view returns (uint256) {
+        return exchangeRateInternal(totalBorrows, totalReserves);
+    }
+
+    /**
+     * @notice Calculates the exchange rate from the underlying to the CToken for the given borrows and reserves
+     * @param totalBorrows_ Total variable rate borrows of the market
+     * @param totalReserves_ Total reserves of the market
+     * @return Calculated exchange rate scaled by 1e18
+     */
+    function exchangeRateInternal(uint256 totalBorrows_, uint256 totalReserves_) internal view returns (uint256) {
         uint256 _totalSupply = totalSupply;
         if (_totalSupply == 0) {
             /*
@@ -432,7 +670,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         uint256 cashPlusBorrowsMinusReserves;
         uint256 exchangeRate;
 
-        cashPlusBorrowsMinusReserves = totalCash + (totalBorrows + totalBorrowsFixed) - totalReserves;
+        cashPlusBorrowsMinusReserves = totalCash + (totalBorrows_ + totalBorrowsFixed) - totalReserves_;
 
         exchangeRate = (cashPlusBorrowsMinusReserves * 1e18) / _totalSupply;
 
@@ -448,74 +686,109 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
     }
 
     /**
-     * @notice Applies accrued interest to total borrows and reserves
-     * @dev This calculates interest accrued from the last checkpointed block
-     *   up to the current block and writes new checkpoint to storage.
+     * @notice Container for the market interest state, with interest accrued up to the current block
+     * @member cashPrior Cash of the market
+     * @member interestAccumulated Interest accumulated since the last accrual
+     * @member borrowIndex Borrow index with accrued interest
+     * @member totalBorrows Total variable rate borrows with accrued interest
+     * @member totalReserves Total reserves with accrued interest
      */
-    function accrueInterest() public {
-        /* Remember the initial block number */
-        uint256 currentBlockNumber = getBlockNumber();
-        uint256 accrualBlockNumberPrior = accrualBlockNumber;
-
-        /* Short-circuit accumulating 0 interest */
-        if (accrualBlockNumberPrior == currentBlockNumber) {
-            return;
-        }
+    struct AccrualState {
+        uint256 cashPrior;
+        uint256 interestAccumulated;
+        uint256 borrowIndex;
+        uint256 totalBorrows;
+        uint256 totalReserves;
+    }
 
+    /**
+     * @notice Calculates the market interest state with interest accrued up to the current block
+     * @dev This calculates interest accrued from the last checkpointed timestamp
+     *   up to the current block timestamp, without writing anything to storage.
+     * @return state The accrued market interest state
+     */
+    function accruedInterestState() internal view returns (AccrualState memory state) {
         /* Read the previous values out of storage */
-        uint256 cashPrior = getCashPrior();
-        uint256 borrowsPrior = totalBorrows;
-        uint256 reservesPrior = totalReserves;
-        uint256 borrowIndexPrior = borrowIndex;
-
-        /* Calculate the current borrow interest rate */
-        uint256 borrowRateMantissa = interestRateModel.getBorrowRate(
-            cashPrior,
-            borrowsPrior + totalBorrowsFixed,
-            reservesPrior
-        );
-        require(borrowRateMantissa <= borrowRateMaxMantissa, "borrow rate is absurdly high");
+        state.cashPrior = getCashPrior();
+        state.borrowIndex = borrowIndex;
+        state.totalBorrows = totalBorrows;
+        state.totalReserves = totalReserves;
+
+        /* Calculate the time elapsed since the last accrual */
+        uint256 timeDelta = getBlockTimestamp() - accrualBlockTimestamp;
 
-        /* Calculate the number of blocks elapsed since the last accrual */
-        uint256 blockDelta = currentBlockNumber - accrualBlockNumberPrior;
+        /* Short-circuit accumulating 0 interest */
+        if (timeDelta == 0) {
+            return state;
+        }
 
         /*
          * Calculate the interest accumulated into borrows and reserves and the new index:
-         *  simpleInterestFactor = borrowRate * blockDelta
+         *  simpleInterestFactor = borrowRate * timeDelta
          *  interestAccumulated = simpleInterestFactor * totalBorrows
          *  totalBorrowsNew = interestAccumulated + totalBorrows
          *  totalReservesNew = interestAccumulated * reserveFactor + totalReserves
          *  borrowIndexNew = simpleInterestFactor * borrowIndex + borrowIndex
          */
+        uint256 simpleInterestFactor = interestRateModel.getBorrowRatePerTime(
+            state.cashPrior,
+            state.totalBorrows + totalBorrowsFixed,
+            state.totalReserves,
+            timeDelta
+        );
+        require(
+            simpleInterestFactor * secondsPerBlock <= borrowRateMaxMantissa * timeDelta,
+            "borrow rate is absurdly high"
+        );
 
-        uint256 simpleInterestFactor;
-        uint256 interestAccumulated;
-        uint256 totalBorrowsNew;
-        uint256 totalReservesNew;
-        uint256 borrowIndexNew;
+        state.interestAccumulated = (simpleInterestFactor * state.totalBorrows) / 1e18;
+
+        state.totalBorrows += state.interestAccumulated;
 
-        simpleInterestFactor = borrowRateMantissa * blockDelta;
+        state.totalReserves += (reserveFactorMantissa * state.interestAccumulated) / 1e18;
 
-        interestAccumulated = (simpleInterestFactor * borrowsPrior) / 1e18;
+        state.borrowIndex += (simpleInterestFactor * state.borrowIndex) / 1e18;
+    }
+
+    /**
+     * @notice Applies accrued interest to total borrows and reserves
+     * @dev This calculates interest accrued from the last checkpointed timestamp
+     *   up to the current block timestamp and writes new checkpoint to storage.
+     *   Accrual is skipped while the market is fresh (see accrualFresh).
+     */
+    function accrueInterest() public {
+        /* Short-circuit if interest was accrued recently enough */
+        if (accrualFresh()) {
+            return;
+        }
 
-        totalBorrowsNew = interestAccumulated + borrowsPrior;
+        accrueInterestInternal();
+    }
 
-        totalReservesNew = ((reserveFactorMantissa * interestAccumulated) / 1e18) + reservesPrior;
+    /**
+     * @notice Applies accrued interest to total borrows and reserves, whatever the minimum accrual interval
+     * @dev Used by the operations which change borrows or reserves, they must not act on stale values
+     */
+    function accrueInterestInternal() internal {
+        /* Short-circuit accumulating 0 interest */
+        if (accrualBlockTimestamp == getBlockTimestamp()) {
+            return;
+        }
 
-        borrowIndexNew = ((simpleInterestFactor * borrowIndexPrior) / 1e18) + borrowIndexPrior;
+        AccrualState memory state = accruedInterestState();
 
         /////////////////////////
         // EFFECTS & INTERACTIONS
         // (No safe failures beyond this point)
 
         /* We write the previously calculated values into storage */
-        accrualBlockNumber = currentBlockNumber;
-        borrowIndex = borrowIndexNew;
-        totalBorrows = totalBorrowsNew;
-        totalReserves = totalReservesNew;
+        accrualBlockTimestamp = getBlockTimestamp();
+        borrowIndex = state.borrowIndex;
+        totalBorrows = state.totalBorrows;
+        totalReserves = state.totalReserves;
 
         /* We emit an AccrueInterest event */
-        emit AccrueInterest(cashPrior, interestAccumulated, borrowIndexNew, totalBorrowsNew);
+        emit AccrueInterest(state.cashPrior, state.interestAccumulated, state.borrowIndex, state.totalBorrows);
     }
 
     /**
@@ -537,11 +810,12 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param mintAmount The amount of the underlying asset to supply
      * @return the actual mint amount.
      */
-    function mintFresh(address minter, uint256 mintAmount) internal marketFresh returns (uint256) {
+    function mintFresh(address minter, uint256 mintAmount) internal marketAccrualFresh returns (uint256) {
         /* Fail if mint not allowed */
         require(controller.mintAllowed(address(this), minter, mintAmount), "Mint is not allowed");
 
-        uint256 exchangeRateMantissa = exchangeRateStoredInternal();
+        /* Interest pending since the last accrual is priced in, the accrual itself may be skipped */
+        uint256 exchangeRateMantissa = exchangeRateCurrent();
 
         /////////////////////////
         // EFFECTS & INTERACTIONS
@@ -610,11 +884,11 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         address payable redeemer,
         uint256 redeemTokensIn,
         uint256 redeemAmountIn
-    ) internal marketFresh {
+    ) internal marketAccrualFresh {
         require(redeemTokensIn == 0 || redeemAmountIn == 0, "one of redeemTokensIn or redeemAmountIn must be zero");
 
-        /* exchangeRate = invoke Exchange Rate Stored() */
-        uint256 exchangeRateMantissa = exchangeRateStoredInternal();
+        /* exchangeRate = invoke Exchange Rate Current(), the accrual itself may be skipped */
+        uint256 exchangeRateMantissa = exchangeRateCurrent();
         uint256 redeemTokens;
         uint256 redeemAmount;
 
@@ -675,8 +949,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      */
     function borrowFixedRateInternal(uint256 borrowAmount, uint256 maturity) internal nonReentrant {
         require(borrowAmount != 0, "Wrong borrow amount");
-        require(maturity == 1 weeks || maturity == 2 weeks || maturity == 4 weeks, "Wrong maturity provided");
-        accrueInterest();
+        accrueInterestInternal();
         borrowFixedRateFresh(payable(msg.sender), borrowAmount, maturity);
     }
 
@@ -698,28 +971,88 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         require(borrowAmount < cashPrior, "Insufficient cash");
         doTransferOut(borrower, borrowAmount);
 
-        /* Calculate the current borrow interest rate */
-        uint256 borrowRateMantissa = interestRateModel.getBorrowRatePerTime(
-            cashPrior,
-            totalBorrows + totalBorrowsFixed,
-            totalReserves,
-            maturity
-        );
+        /* Calculate the fixed rate of the borrow for its whole maturity */
+        uint256 borrowRateMantissa = fixedBorrowRateInternal(cashPrior, maturity);
 
-        accountFixedRateBorrows[borrower].push(
-            FixedRateBorrow({
-                amount: borrowAmount,
-                rate: borrowRateMantissa,
-                openedAt: block.timestamp,
-                duration: maturity
-            })
-        );
+        uint256 borrowId = nextFixedRateBorrowId[borrower]++;
+        accountFixedRateBorrows[borrower][borrowId] = FixedRateBorrow({
+            amount: SafeCast.toUint128(borrowAmount),
+            rate: SafeCast.toUint64(borrowRateMantissa),
+            openedAt: SafeCast.toUint32(block.timestamp),
+            duration: SafeCast.toUint32(maturity)
+        });
+        accountFixedRateBorrowIds[borrower].add(borrowId);
+        accountFixedRateBorrowsPrincipal[borrower] += borrowAmount;
+        _addToExpiryIndex(borrower, block.timestamp + maturity);
 
         uint256 interestAccumulated = (borrowAmount * borrowRateMantissa) / 1e18;
         totalBorrowsFixed += borrowAmount + interestAccumulated;
         totalReserves += (interestAccumulated * reserveFactorMantissa) / 1e18;
 
-        emit BorrowFixedRate(borrower, borrowAmount, block.timestamp, maturity);
+        emit BorrowFixedRate(borrower, borrowAmount, block.timestamp, maturity, borrowId);
+    }
+
+    /**
+     * @notice Returns the rate a fixed rate borrow with the given maturity would pay for its whole maturity
+     * @param maturity Duration of the borrow in seconds
+     * @return The rate as a mantissa (scaled by 1e18)
+     */
+    function fixedBorrowRate(uint256 maturity) external view returns (uint256) {
+        return fixedBorrowRateInternal(getCashPrior(), maturity);
+    }
+
+    /**
+     * @notice Prices a fixed rate borrow on the term curve, interpolating linearly between its tenors
+     * @dev Without a term curve the rate model's spot rate is scaled to the 1, 2 or 4 weeks maturity
+     * @param cash The cash of the market before the borrow
+     * @param maturity Duration of the borrow in seconds
+     * @return The rate for the whole maturity as a mantissa (scaled by 1e18)
+     */
+    function fixedBorrowRateInternal(uint256 cash, uint256 maturity) internal view returns (uint256) {
+        uint256 curve = termCurve;
+        if (curve == 0) {
+            require(maturity == 1 weeks || maturity == 2 weeks || maturity == 4 weeks, "Wrong maturity provided");
+            return
+                interestRateModel.getBorrowRatePerTime(cash, totalBorrows + totalBorrowsFixed, totalReserves, maturity);
+        }
+
+        uint256 prevTenor;
+        uint256 prevRate;
+        for (uint256 i = 0; i < termCurveMaxTenors; i++) {
+            uint256 point = curve >> (64 * i);
+            uint256 tenor = uint32(point);
+            if (tenor == 0) {
+                break;
+            }
+            uint256 rate = uint256(uint32(point >> 32)) * 1e12;
+
+            if (maturity <= tenor) {
+                require(maturity == tenor || prevTenor != 0, "Wrong maturity provided");
+                if (maturity != tenor) {
+                    // Interpolate the yearly rate between the surrounding tenors
+                    rate = rate >= prevRate
+                        ? prevRate + ((rate - prevRate) * (maturity - prevTenor)) / (tenor - prevTenor)
+                        : prevRate - ((prevRate - rate) * (maturity - prevTenor)) / (tenor - prevTenor);
+                }
+                return (rate * maturity) / 365 days;
+            }
+            prevTenor = tenor;
+            prevRate = rate;
+        }
+        revert("Wrong maturity provided");
+    }
+
+    /**
+     * @notice Registers borrower in the expiry index bucket of the maturity timestamp
+     * @param borrower Address of borrower
+     * @param maturityTimestamp Timestamp, when the borrow reaches maturity
+     */
+    function _addToExpiryIndex(address borrower, uint256 maturityTimestamp) internal {
+        uint256 bucket = maturityTimestamp / maturityBucketSize;
+        if (!maturityBucketMembers[bucket][borrower]) {
+            maturityBucketMembers[bucket][borrower] = true;
+            maturityBuckets[bucket].push(borrower);
+        }
     }
 
     /**
@@ -727,7 +1060,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param borrowAmount The amount of the underlying asset to borrow
      */
     function borrowInternal(uint256 borrowAmount) internal nonReentrant {
-        accrueInterest();
+        accrueInterestInternal();
         borrowFresh(payable(msg.sender), borrowAmount);
     }
 
@@ -758,61 +1091,83 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
 
     /**
      * @notice Sender repays their own borrows, taken with fixed rate
-     * @param borrowsIndexes Indexes of borrows to repay
+     * @param borrowIds IDs of borrows to repay
      */
-    function repayBorrowFixedRateInternal(uint256[] memory borrowsIndexes) internal nonReentrant {
-        accrueInterest();
-        repayBorrowFixedRateFresh(msg.sender, msg.sender, borrowsIndexes);
+    function repayBorrowFixedRateInternal(uint256[] memory borrowIds) internal nonReentrant {
+        accrueInterestInternal();
+        repayBorrowFixedRateFresh(msg.sender, msg.sender, borrowIds);
     }
 
     /**
      * @notice Sender repays borrower's borrows, taken with fixed rate
      * @param borrower Address of borrower
-     * @param borrowsIndexes Indexes of borrows to repay
+     * @param borrowIds IDs of borrows to repay
      */
-    function repayBorrowFixedRateOnBehalfInternal(address borrower, uint256[] memory borrowsIndexes)
+    function repayBorrowFixedRateOnBehalfInternal(address borrower, uint256[] memory borrowIds)
         internal
         nonReentrant
     {
-        accrueInterest();
-        repayBorrowFixedRateFresh(msg.sender, borrower, borrowsIndexes);
+        accrueInterestInternal();
+        repayBorrowFixedRateFresh(msg.sender, borrower, borrowIds);
     }
 
     /**
      * @notice User repays borrows, taken with fixed rate
-     * @param borrowsIndexes Indexes of borrows to repay
+     * @param borrowIds IDs of borrows to repay
      */
     function repayBorrowFixedRateFresh(
         address payer,
         address borrower,
-        uint256[] memory borrowsIndexes
+        uint256[] memory borrowIds
     ) internal marketFresh returns (uint256[] memory actualRepayAmounts) {
-        FixedRateBorrow[] storage borrows = accountFixedRateBorrows[borrower];
         uint256 totalRepayAmount;
+        (actualRepayAmounts, totalRepayAmount) = _repayFixedBorrows(payer, borrower, borrowIds);
+        doTransferIn(payer, totalRepayAmount);
+    }
+
+    /**
+     * @notice Closes the borrower's fixed rate borrows, without transferring the repayment in
+     * @dev The caller must transfer `totalRepayAmount` from the payer
+     * @return actualRepayAmounts The amount to repay for each borrow
+     * @return totalRepayAmount The amount to repay for all the borrows
+     */
+    function _repayFixedBorrows(
+        address payer,
+        address borrower,
+        uint256[] memory borrowIds
+    ) internal returns (uint256[] memory actualRepayAmounts, uint256 totalRepayAmount) {
+        mapping(uint256 => FixedRateBorrow) storage borrows = accountFixedRateBorrows[borrower];
+        EnumerableSet.UintSet storage openBorrowIds = accountFixedRateBorrowIds[borrower];
+        uint256 principalToSub;
         uint256 borrowsFixedToSub;
         uint256 totalReservesToSub;
         uint256 totalReservesToAdd;
-        actualRepayAmounts = new uint256[](borrowsIndexes.length);
+        actualRepayAmounts = new uint256[](borrowIds.length);
 
         // Calculate how much to pay for borrows
         uint256 repaid;
         uint256 interestAccumulated;
         uint256 timeDelta;
-        for (uint256 i = 0; i < borrowsIndexes.length; i++) {
-            interestAccumulated = (borrows[borrowsIndexes[i]].amount * borrows[borrowsIndexes[i]].rate) / 1e18;
-            if (block.timestamp >= borrows[borrowsIndexes[i]].openedAt + borrows[borrowsIndexes[i]].duration) {
-                repaid = borrows[borrowsIndexes[i]].amount + interestAccumulated;
+        for (uint256 i = 0; i < borrowIds.length; i++) {
+            // Removing the ID also rejects unknown and duplicated IDs
+            require(openBorrowIds.remove(borrowIds[i]), "Fixed rate borrow does not exist");
+            // Read the whole packed borrow with a single SLOAD
+            FixedRateBorrow memory fixedBorrow = borrows[borrowIds[i]];
+            interestAccumulated = (uint256(fixedBorrow.amount) * fixedBorrow.rate) / 1e18;
+            if (block.timestamp >= uint256(fixedBorrow.openedAt) + fixedBorrow.duration) {
+                repaid = fixedBorrow.amount + interestAccumulated;
                 borrowsFixedToSub += repaid;
             } else {
-                borrowsFixedToSub += borrows[borrowsIndexes[i]].amount + interestAccumulated;
+                borrowsFixedToSub += fixedBorrow.amount + interestAccumulated;
                 totalReservesToSub += (reserveFactorMantissa * interestAccumulated) / 1e18;
-                timeDelta = block.timestamp - borrows[borrowsIndexes[i]].openedAt;
+                timeDelta = block.timestamp - fixedBorrow.openedAt;
                 // TODO extra coefficient for repaying before maturity is reached
-                interestAccumulated = (interestAccumulated * timeDelta) / borrows[borrowsIndexes[i]].duration;
-                repaid = borrows[borrowsIndexes[i]].amount + interestAccumulated;
+                interestAccumulated = (interestAccumulated * timeDelta) / fixedBorrow.duration;
+                repaid = fixedBorrow.amount + interestAccumulated;
                 totalReservesToAdd += (interestAccumulated * reserveFactorMantissa) / 1e18;
             }
-            borrows[borrowsIndexes[i]].amount = 0;
+            delete borrows[borrowIds[i]];
+            principalToSub += fixedBorrow.amount;
             totalRepayAmount += repaid;
             actualRepayAmounts[i] = repaid;
         }
@@ -823,24 +1178,12 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
             "Repay is not allowed"
         );
 
-        doTransferIn(payer, totalRepayAmount);
+        accountFixedRateBorrowsPrincipal[borrower] -= principalToSub;
         totalBorrowsFixed -= borrowsFixedToSub;
         totalReserves -= totalReservesToSub;
         totalReserves += totalReservesToAdd;
 
-        // Remove repaid borrows
-        unchecked {
-            for (uint256 i = 0; i < borrows.length; i++) {
-                if (borrows[i].amount == 0) {
-                    borrows[i] = borrows[borrows.length - 1];
-                    borrows.pop();
-                    i--;
-                }
-            }
-        }
         emit RepayBorrowFixedRate(payer, borrower, totalRepayAmount, totalBorrowsFixed, actualRepayAmounts);
-
-        return actualRepayAmounts;
     }
 
     /**
@@ -849,7 +1192,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @return the actual repayment amount.
      */
     function repayBorrowInternal(uint256 repayAmount) internal nonReentrant returns (uint256) {
-        accrueInterest();
+        accrueInterestInternal();
         // repayBorrowFresh emits repay-borrow-specific logs on errors, so we don't need to
         return repayBorrowFresh(msg.sender, msg.sender, repayAmount);
     }
@@ -861,7 +1204,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @return the actual repayment amount.
      */
     function repayBorrowBehalfInternal(address borrower, uint256 repayAmount) internal nonReentrant returns (uint256) {
-        accrueInterest();
+        accrueInterestInternal();
         // repayBorrowFresh emits repay-borrow-specific logs on errors, so we don't need to
         return repayBorrowFresh(msg.sender, borrower, repayAmount);
     }
@@ -917,16 +1260,16 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @notice The sender liquidates the borrowers collateral.
      *  The collateral seized is transferred to the liquidator.
      * @param borrower The borrower of this mToken to be liquidated
-     * @param borrowsIndexes Indexes of fixed rate borrows to be repaid on behalf of borrower
+     * @param borrowIds IDs of fixed rate borrows to be repaid on behalf of borrower
      */
     function liquidateBorrowFixedRateInternal(
         address borrower,
-        uint256[] memory borrowsIndexes,
+        uint256[] memory borrowIds,
         IMToken[] memory mTokensCollaterals
     ) internal nonReentrant {
-        require(borrowsIndexes.length == mTokensCollaterals.length, "Wrong arrays length");
-        accrueInterest();
-        liquidateBorrowFixedRate(msg.sender, borrower, borrowsIndexes, mTokensCollaterals);
+        require(borrowIds.length == mTokensCollaterals.length, "Wrong arrays length");
+        accrueInterestInternal();
+        liquidateBorrowFixedRate(msg.sender, borrower, borrowIds, mTokensCollaterals);
     }
 
     /**
@@ -935,49 +1278,225 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
     function liquidateBorrowFixedRate(
         address liquidator,
         address borrower,
-        uint256[] memory borrowsIndexes,
+        uint256[] memory borrowIds,
         IMToken[] memory mTokensCollaterals
     ) internal marketFresh {
+        Seizes memory seizes = _newSeizes(borrowIds.length);
+        uint256 repayAmount = _liquidateFixedBorrowsOf(liquidator, borrower, borrowIds, mTokensCollaterals, seizes);
+
+        doTransferIn(liquidator, repayAmount);
+        _seizeByCollateral(liquidator, seizes);
+    }
+
+    /**
+     * @notice The sender liquidates fixed rate borrows of many borrowers in one transaction.
+     *  The collateral seized is transferred to the liquidator.
+     * @param borrowers The borrowers of this mToken to be liquidated
+     * @param borrowIds IDs of fixed rate borrows to be repaid on behalf of each borrower
+     * @param mTokensCollaterals The market in which to seize collateral for each borrow of each borrower
+     */
+    function liquidateBorrowFixedRateBatchInternal(
+        address[] memory borrowers,
+        uint256[][] memory borrowIds,
+        IMToken[][] memory mTokensCollaterals
+    ) internal nonReentrant {
+        require(
+            borrowers.length == borrowIds.length && borrowers.length == mTokensCollaterals.length,
+            "Wrong arrays length"
+        );
+        accrueInterestInternal();
+        liquidateBorrowFixedRateBatch(msg.sender, borrowers, borrowIds, mTokensCollaterals);
+    }
+
+    /**
+     * @notice Seizes queued by a fixed rate liquidation, one entry per borrower and collateral market
+     * @dev Collateral markets are indexed in order of first appearance, lastEntries maps a collateral index
+     *  to its latest entry plus one, so the entry of the current borrower is found without a search
+     */
+    struct Seizes {
+        IMToken[] collaterals;
+        uint256 collateralsCount;
+        uint256[] lastEntries;
+        uint256[] collateralIndexes;
+        address[] borrowers;
+        uint256[] repayAmounts;
+        uint256 count;
+    }
+
+    /**
+     * @return An empty queue for the seizes of `size` borrows
+     */
+    function _newSeizes(uint256 size) internal pure returns (Seizes memory) {
+        return
+            Seizes({
+                collaterals: new IMToken[](size),
+                collateralsCount: 0,
+                lastEntries: new uint256[](size),
+                collateralIndexes: new uint256[](size),
+                borrowers: new address[](size),
+                repayAmounts: new uint256[](size),
+                count: 0
+            });
+    }
+
+    /**
+     * @notice The user liquidates fixed rate borrows of many borrowers.
+     * @dev Interest is accrued once by the caller, the repayments of all the borrowers are transferred in at once,
+     *  each collateral is priced once and seized with a single call per collateral market
+     */
+    function liquidateBorrowFixedRateBatch(
+        address liquidator,
+        address[] memory borrowers,
+        uint256[][] memory borrowIds,
+        IMToken[][] memory mTokensCollaterals
+    ) internal marketFresh {
+        uint256 seizesCount;
+        for (uint256 i = 0; i < borrowIds.length; i++) {
+            seizesCount += borrowIds[i].length;
+        }
+        Seizes memory seizes = _newSeizes(seizesCount);
+
+        uint256 totalRepayAmount;
+        for (uint256 i = 0; i < borrowers.length; i++) {
+            totalRepayAmount += _liquidateFixedBorrowsOf(
+                liquidator,
+                borrowers[i],
+                borrowIds[i],
+                mTokensCollaterals[i],
+                seizes
+            );
+        }
+
+        doTransferIn(liquidator, totalRepayAmount);
+        _seizeByCollateral(liquidator, seizes);
+    }
+
+    /**
+     * @notice Repays the borrower's expired fixed rate borrows and queues the seizes of their collateral
+     * @return repayAmount The amount the liquidator has to transfer in for the borrower
+     */
+    function _liquidateFixedBorrowsOf(
+        address liquidator,
+        address borrower,
+        uint256[] memory borrowIds,
+        IMToken[] memory mTokensCollaterals,
+        Seizes memory seizes
+    ) internal returns (uint256 repayAmount) {
+        require(borrowIds.length == mTokensCollaterals.length, "Wrong arrays length");
         /* Fail if borrower = liquidator */
         require(borrower != liquidator, "Can't liquidate your own position");
 
         // Verify that all the borrows can be liquidated
-        _liquidateFixedBorrowsAllowed(borrower, borrowsIndexes);
+        _liquidateFixedBorrowsAllowed(borrower, borrowIds);
+
+        uint256[] memory actualRepayAmounts;
+        (actualRepayAmounts, repayAmount) = _repayFixedBorrows(liquidator, borrower, borrowIds);
+
+        /* Repayments against the same collateral market are summed into one entry per borrower */
+        uint256 firstEntry = seizes.count;
+        uint256 collateralIndex;
+        for (uint256 i = 0; i < mTokensCollaterals.length; i++) {
+            if (i == 0 || mTokensCollaterals[i] != mTokensCollaterals[i - 1]) {
+                collateralIndex = _collateralIndex(seizes, mTokensCollaterals[i]);
+            }
+
+            uint256 lastEntry = seizes.lastEntries[collateralIndex];
+            if (lastEntry > firstEntry) {
+                seizes.repayAmounts[lastEntry - 1] += actualRepayAmounts[i];
+            } else {
+                seizes.collateralIndexes[seizes.count] = collateralIndex;
+                seizes.borrowers[seizes.count] = borrower;
+                seizes.repayAmounts[seizes.count] = actualRepayAmounts[i];
+                seizes.lastEntries[collateralIndex] = ++seizes.count;
+            }
+        }
+
+        emit LiquidateBorrowFixedRate(liquidator, borrower, actualRepayAmounts, mTokensCollaterals);
+    }
 
-        uint256[] memory actualRepayAmounts = repayBorrowFixedRateFresh(liquidator, borrower, borrowsIndexes);
+    /**
+     * @return collateralIndex The index of the collateral market in the seizes, added if it is not there yet
+     * @dev Only the distinct collateral markets are searched, at most the number of listed markets
+     */
+    function _collateralIndex(Seizes memory seizes, IMToken mTokenCollateral)
+        internal
+        pure
+        returns (uint256 collateralIndex)
+    {
+        for (; collateralIndex < seizes.collateralsCount; collateralIndex++) {
+            if (seizes.collaterals[collateralIndex] == mTokenCollateral) {
+                return collateralIndex;
+            }
+        }
+        seizes.collaterals[seizes.collateralsCount++] = mTokenCollateral;
+    }
 
-        // Calculate seize tokens
-        for (uint256 i = 0; i < actualRepayAmounts.length; i++) {
-            /* We calculate the number of collateral tokens that will be seized */
-            uint256 seizeTokens = controller.liquidateCalculateSeizeTokens(
+    /**
+     * @notice Prices the queued seizes with a single controller call and executes them,
+     *  with one seizeBatch call per collateral market
+     */
+    function _seizeByCollateral(address liquidator, Seizes memory seizes) internal {
+        IMToken[] memory collaterals = new IMToken[](seizes.collateralsCount);
+        uint256[] memory groupSizes = new uint256[](seizes.collateralsCount);
+        for (uint256 i = 0; i < collaterals.length; i++) {
+            collaterals[i] = seizes.collaterals[i];
+        }
+
+        uint256[] memory collateralIndexes = new uint256[](seizes.count);
+        uint256[] memory seizeTokens;
+        {
+            uint256[] memory repayAmounts = new uint256[](seizes.count);
+            for (uint256 i = 0; i < seizes.count; i++) {
+                collateralIndexes[i] = seizes.collateralIndexes[i];
+                repayAmounts[i] = seizes.repayAmounts[i];
+                groupSizes[collateralIndexes[i]]++;
+            }
+
+            /* We calculate the number of collateral tokens that will be seized, each collateral is priced once */
+            seizeTokens = controller.liquidateCalculateSeizeTokensBatch(
                 address(this),
-                address(mTokensCollaterals[i]),
-                actualRepayAmounts[i]
+                collaterals,
+                collateralIndexes,
+                repayAmounts
             );
+        }
 
-            /* Revert if borrower collateral token balance < seizeTokens */
-            require(mTokensCollaterals[i].balanceOf(borrower) >= seizeTokens, "LIQUIDATE_SEIZE_TOO_MUCH");
+        /* We group the seizes by collateral market in a single pass */
+        address[][] memory groupBorrowers = new address[][](collaterals.length);
+        uint256[][] memory groupSeizeTokens = new uint256[][](collaterals.length);
+        for (uint256 i = 0; i < collaterals.length; i++) {
+            groupBorrowers[i] = new address[](groupSizes[i]);
+            groupSeizeTokens[i] = new uint256[](groupSizes[i]);
+            groupSizes[i] = 0;
+        }
+        for (uint256 i = 0; i < seizes.count; i++) {
+            uint256 group = collateralIndexes[i];
+            groupBorrowers[group][groupSizes[group]] = seizes.borrowers[i];
+            groupSeizeTokens[group][groupSizes[group]] = seizeTokens[i];
+            groupSizes[group]++;
+        }
 
-            // If this is also the collateral, run seizeInternal to avoid re-entrancy, otherwise make an external call
-            if (address(mTokensCollaterals[i]) == address(this)) {
-                seizeInternal(address(this), liquidator, borrower, seizeTokens);
+        // The collateral market checks the borrower balances when seizing
+        for (uint256 i = 0; i < collaterals.length; i++) {
+            // If this is also the collateral, seize internally to avoid re-entrancy, otherwise make an external call
+            if (address(collaterals[i]) == address(this)) {
+                seizeBatchInternal(address(this), liquidator, groupBorrowers[i], groupSeizeTokens[i]);
             } else {
-                mTokensCollaterals[i].seize(liquidator, borrower, seizeTokens);
+                collaterals[i].seizeBatch(liquidator, groupBorrowers[i], groupSeizeTokens[i]);
             }
         }
-
-        emit LiquidateBorrowFixedRate(liquidator, borrower, actualRepayAmounts, mTokensCollaterals);
     }
 
     /**
      * @notice Verifies that provided fixed rate borrows can be liquidated
      */
-    function _liquidateFixedBorrowsAllowed(address borrower, uint256[] memory borrowsIndexes) internal {
-        FixedRateBorrow[] storage borrows = accountFixedRateBorrows[borrower];
-        for (uint256 i = 0; i < borrowsIndexes.length; i++) {
+    function _liquidateFixedBorrowsAllowed(address borrower, uint256[] memory borrowIds) internal {
+        mapping(uint256 => FixedRateBorrow) storage borrows = accountFixedRateBorrows[borrower];
+        uint256 restPeriod_ = restPeriod;
+        for (uint256 i = 0; i < borrowIds.length; i++) {
+            FixedRateBorrow memory fixedBorrow = borrows[borrowIds[i]];
             require(
-                block.timestamp >
-                    borrows[borrowsIndexes[i]].openedAt + borrows[borrowsIndexes[i]].duration + restPeriod,
+                block.timestamp > uint256(fixedBorrow.openedAt) + fixedBorrow.duration + restPeriod_,
                 "Cannot liquidate fixed rate borrow"
             );
         }
@@ -996,7 +1515,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         uint256 repayAmount,
         IMToken mTokenCollateral
     ) internal nonReentrant returns (uint256) {
-        accrueInterest();
+        accrueInterestInternal();
         mTokenCollateral.accrueInterest();
         // liquidateBorrowFresh emits borrow-specific logs on errors, so we don't need to
         return liquidateBorrowFresh(msg.sender, borrower, repayAmount, mTokenCollateral);
@@ -1029,9 +1548,9 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
             "Liquidate is not allowed"
         );
 
-        /* Verify market's block number equals current block number */
+        /* Verify interest was accrued in this block, and recently enough in the collateral market */
         require(
-            accrualBlockNumber == getBlockNumber() && mTokenCollateral.getAccrualBlockNumber() == getBlockNumber(),
+            accrualBlockTimestamp == getBlockTimestamp() && mTokenCollateral.accrualFresh(),
             "Market is not fresh"
         );
 
@@ -1101,6 +1620,61 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         address borrower,
         uint256 seizeTokens
     ) internal {
+        uint256 protocolSeizeTokens = seizeFromBorrower(seizerToken, liquidator, borrower, seizeTokens);
+        creditSeizedTokens(liquidator, seizeTokens, protocolSeizeTokens);
+    }
+
+    /**
+     * @notice Transfers collateral tokens (this market) of many borrowers to the liquidator.
+     * @dev Will fail unless called by another mToken during the process of a batched liquidation.
+     *  Its absolutely critical to use msg.sender as the borrowed mToken and not a parameter.
+     * @param liquidator The account receiving seized collateral
+     * @param borrowers The accounts having collateral seized
+     * @param seizeTokens The number of cTokens to seize from each borrower
+     */
+    function seizeBatch(
+        address liquidator,
+        address[] calldata borrowers,
+        uint256[] calldata seizeTokens
+    ) external nonReentrant {
+        return seizeBatchInternal(msg.sender, liquidator, borrowers, seizeTokens);
+    }
+
+    /**
+     * @notice Transfers collateral tokens (this market) of many borrowers to the liquidator.
+     * @dev The liquidator balance, the total supply and the reserves are updated once for all the borrowers.
+     * @param seizerToken The contract seizing the collateral (i.e. borrowed mToken)
+     * @param liquidator The account receiving seized collateral
+     * @param borrowers The accounts having collateral seized
+     * @param seizeTokens The number of cTokens to seize from each borrower
+     */
+    function seizeBatchInternal(
+        address seizerToken,
+        address liquidator,
+        address[] memory borrowers,
+        uint256[] memory seizeTokens
+    ) internal {
+        require(borrowers.length == seizeTokens.length, "Wrong arrays length");
+
+        uint256 totalSeizeTokens;
+        uint256 totalProtocolSeizeTokens;
+        for (uint256 i = 0; i < borrowers.length; i++) {
+            totalSeizeTokens += seizeTokens[i];
+            totalProtocolSeizeTokens += seizeFromBorrower(seizerToken, liquidator, borrowers[i], seizeTokens[i]);
+        }
+        creditSeizedTokens(liquidator, totalSeizeTokens, totalProtocolSeizeTokens);
+    }
+
+    /**
+     * @notice Takes the seized tokens from the borrower
+     * @return protocolSeizeTokens The part of the seized tokens added to the reserves
+     */
+    function seizeFromBorrower(
+        address seizerToken,
+        address liquidator,
+        address borrower,
+        uint256 seizeTokens
+    ) internal returns (uint256 protocolSeizeTokens) {
         /* Fail if seize not allowed */
         require(
             controller.seizeAllowed(address(this), seizerToken, liquidator, borrower, seizeTokens),
@@ -1110,30 +1684,43 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         /* Fail if borrower = liquidator */
         require(liquidator != borrower, "Can't liquidate your own position");
 
-        /*
-         * We calculate the new borrower and liquidator token balances, failing on underflow/overflow:
-         *  borrowerTokensNew = accountTokens[borrower] - seizeTokens
-         *  liquidatorTokensNew = accountTokens[liquidator] + seizeTokens
-         */
-        uint256 protocolSeizeTokens = (seizeTokens * protocolSeizeShareMantissa) / 1e18;
-        uint256 liquidatorSeizeTokens = seizeTokens - protocolSeizeTokens;
-        uint256 exchangeRateMantissa = exchangeRateStoredInternal();
-        uint256 protocolSeizeAmount = (exchangeRateMantissa * protocolSeizeTokens) / 1e18;
+        /* Revert if borrower collateral token balance < seizeTokens */
+        require(accountTokens[borrower] >= seizeTokens, "LIQUIDATE_SEIZE_TOO_MUCH");
+
+        protocolSeizeTokens = (seizeTokens * protocolSeizeShareMantissa) / 1e18;
 
         /////////////////////////
         // EFFECTS & INTERACTIONS
         // (No safe failures beyond this point)
 
-        /* We write the previously calculated values into storage */
-        totalReserves += protocolSeizeAmount;
-        totalSupply -= protocolSeizeTokens;
-
         accountTokens[borrower] -= seizeTokens;
-        accountTokens[liquidator] += liquidatorSeizeTokens;
 
         /* Emit a Transfer event */
-        emit Transfer(borrower, liquidator, liquidatorSeizeTokens);
+        emit Transfer(borrower, liquidator, seizeTokens - protocolSeizeTokens);
         emit Transfer(borrower, address(this), protocolSeizeTokens);
+    }
+
+    /**
+     * @notice Credits the seized tokens to the liquidator and adds the protocol share to the reserves
+     */
+    function creditSeizedTokens(
+        address liquidator,
+        uint256 seizeTokens,
+        uint256 protocolSeizeTokens
+    ) internal {
+        /*
+         * We calculate the new liquidator token balance and reserves, failing on underflow/overflow:
+         *  liquidatorTokensNew = accountTokens[liquidator] + seizeTokens - protocolSeizeTokens
+         * The collateral market may have skipped its accrual, interest pending since then is priced in.
+         */
+        uint256 exchangeRateMantissa = exchangeRateCurrent();
+        uint256 protocolSeizeAmount = (exchangeRateMantissa * protocolSeizeTokens) / 1e18;
+
+        /* We write the previously calculated values into storage */
+        totalReserves += protocolSeizeAmount;
+        totalSupply -= protocolSeizeTokens;
+        accountTokens[liquidator] += seizeTokens - protocolSeizeTokens;
+
         emit ReservesAdded(address(this), protocolSeizeAmount, totalReserves);
     }
 
@@ -1190,7 +1777,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @dev Admin function to accrue interest and set a new reserve factor
      */
     function setReserveFactor(uint256 newReserveFactorMantissa) external nonReentrant onlyAdmin(msg.sender) {
-        accrueInterest();
+        accrueInterestInternal();
         // _setReserveFactorFresh emits reserve-factor-specific logs on errors, so we don't need to.
         return _setReserveFactorFresh(newReserveFactorMantissa);
     }
@@ -1199,6 +1786,61 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         restPeriod = newRestPeriod;
     }
 
+    /**
+     * @notice Sets the fixed rate term curve, the maturities of fixed rate borrows range from its first to last tenor
+     * @dev Admin function, empty arrays restore the rate model pricing of 1, 2 and 4 weeks maturities
+     * @param tenors Increasing tenors in seconds
+     * @param ratesPerYear Yearly fixed rate of each tenor as a mantissa (scaled by 1e18), with 1e-6 precision
+     */
+    function setTermCurve(uint256[] calldata tenors, uint256[] calldata ratesPerYear) external onlyAdmin(msg.sender) {
+        require(tenors.length == ratesPerYear.length && tenors.length <= termCurveMaxTenors, "Wrong arrays length");
+
+        uint256 curve;
+        uint256 prevTenor;
+        for (uint256 i = 0; i < tenors.length; i++) {
+            require(tenors[i] > prevTenor, "Tenors must be increasing");
+            require(ratesPerYear[i] % 1e12 == 0, "Rate precision is 1e-6");
+            uint256 point = SafeCast.toUint32(tenors[i]) | (uint256(SafeCast.toUint32(ratesPerYear[i] / 1e12)) << 32);
+            curve |= point << (64 * i);
+            prevTenor = tenors[i];
+        }
+        termCurve = curve;
+
+        emit NewTermCurve(tenors, ratesPerYear);
+    }
+
+    /**
+     * @notice Returns the fixed rate term curve
+     * @return tenors Tenors in seconds
+     * @return ratesPerYear Yearly fixed rate of each tenor as a mantissa (scaled by 1e18)
+     */
+    function getTermCurve() external view returns (uint256[] memory tenors, uint256[] memory ratesPerYear) {
+        uint256 curve = termCurve;
+        uint256 count;
+        while (count < termCurveMaxTenors && uint32(curve >> (64 * count)) != 0) {
+            count++;
+        }
+
+        tenors = new uint256[](count);
+        ratesPerYear = new uint256[](count);
+        for (uint256 i = 0; i < count; i++) {
+            tenors[i] = uint32(curve >> (64 * i));
+            ratesPerYear[i] = uint256(uint32(curve >> (64 * i + 32))) * 1e12;
+        }
+    }
+
+    /**
+     * @notice Sets the minimum time between two interest accruals (*requires fresh interest accrual)
+     * @dev Admin function to set a new minimum accrual interval, zero accrues on every new block timestamp
+     * @param newMinAccrualInterval New minimum accrual interval in seconds
+     */
+    function setMinAccrualInterval(uint256 newMinAccrualInterval) external nonReentrant onlyAdmin(msg.sender) {
+        accrueInterestInternal();
+        uint256 oldMinAccrualInterval = minAccrualInterval;
+        minAccrualInterval = newMinAccrualInterval;
+        emit NewMinAccrualInterval(oldMinAccrualInterval, newMinAccrualInterval);
+    }
+
     /**
      * @notice Sets a new reserve factor for the protocol (*requires fresh interest accrual)
      * @dev Admin function to set a new reserve factor
@@ -1217,19 +1859,33 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param addAmount Amount of addition to reserves
      */
     function _addReservesInternal(uint256 addAmount) internal nonReentrant {
-        accrueInterest();
+        accrueInterestInternal();
 
         // _addReservesFresh emits reserve-addition-specific logs on errors, so we don't need to.
-        _addReservesFresh(addAmount);
+        _addReservesFresh(msg.sender, addAmount);
+    }
+
+    /**
+     * @notice Accrues interest and adds reserves by transferring from a payer
+     * @dev Controller function, used to add the reserves of many markets in one transaction.
+     *  The payer must have approved this market.
+     * @param payer The account the underlying is transferred from
+     * @param addAmount Amount of addition to reserves
+     * @return the actual amount added, net token fees
+     */
+    function addReservesFrom(address payer, uint256 addAmount) external nonReentrant onlyController returns (uint256) {
+        accrueInterestInternal();
+        return _addReservesFresh(payer, addAmount);
     }
 
     /**
-     * @notice Add reserves by transferring from caller
+     * @notice Add reserves by transferring from a payer
      * @dev Requires fresh interest accrual
+     * @param payer The account the underlying is transferred from
      * @param addAmount Amount of addition to reserves
      * @return the actual amount added, net token fees
      */
-    function _addReservesFresh(uint256 addAmount) internal marketFresh returns (uint256) {
+    function _addReservesFresh(address payer, uint256 addAmount) internal marketFresh returns (uint256) {
         // totalReserves + actualAddAmount
         uint256 actualAddAmount;
 
@@ -1238,20 +1894,20 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
         // (No safe failures beyond this point)
 
         /*
-         * We call doTransferIn for the caller and the addAmount
+         * We call doTransferIn for the payer and the addAmount
          *  Note: The mToken must handle variations between ERC-20 and ETH underlying.
          *  On success, the mToken holds an additional addAmount of cash.
          *  doTransferIn reverts if anything goes wrong, since we can't be sure if side effects occurred.
          *  it returns the amount actually transferred, in case of a fee.
          */
 
-        actualAddAmount = doTransferIn(msg.sender, addAmount);
+        actualAddAmount = doTransferIn(payer, addAmount);
 
         // Store reserves[n+1] = reserves[n] + actualAddAmount
         totalReserves += actualAddAmount;
 
         /* Emit NewReserves(admin, actualAddAmount, reserves[n+1]) */
-        emit ReservesAdded(msg.sender, actualAddAmount, totalReserves);
+        emit ReservesAdded(payer, actualAddAmount, totalReserves);
 
         return actualAddAmount;
     }
@@ -1261,11 +1917,21 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param reduceAmount Amount of reduction to reserves
      */
     function reduceReserves(uint256 reduceAmount) external nonReentrant onlyAdmin(msg.sender) {
-        accrueInterest();
+        accrueInterestInternal();
         // _reduceReservesFresh emits reserve-reduction-specific logs on errors, so we don't need to.
         return _reduceReservesFresh(reduceAmount);
     }
 
+    /**
+     * @notice Accrues interest and reduces reserves by transferring to admin
+     * @dev Controller function, used to reduce the reserves of many markets in one transaction
+     * @param reduceAmount Amount of reduction to reserves
+     */
+    function reduceReservesFromController(uint256 reduceAmount) external nonReentrant onlyController {
+        accrueInterestInternal();
+        return _reduceReservesFresh(reduceAmount);
+    }
+
     /**
      * @notice Reduces reserves by transferring to admin
      * @dev Requires fresh interest accrual
@@ -1295,7 +1961,7 @@ abstract contract MToken is MTokenStorage, IMTokenEvents {
      * @param newInterestRateModel the new interest rate model to use
      */
     function setInterestRateModel(IInterestRateModel newInterestRateModel) public onlyAdmin(msg.sender) {
-        accrueInterest();
+        accrueInterestInternal();
         // _setInterestRateModelFresh emits interest-rate-model-update-specific logs on errors, so we don't need to.
         _setInterestRateModelFresh(newInterestRateModel);
     }
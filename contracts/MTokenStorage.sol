@@ -5,6 +5,8 @@ import "./interfaces/IController.sol";
 import "./interfaces/IInterestRateModel.sol";
 import "./interfaces/IMToken.sol";
 
+import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
+
 abstract contract MTokenStorage is IMToken {
     /**
      * @notice Indicator that this is a CToken contract (for inspection)
@@ -37,6 +39,11 @@ abstract contract MTokenStorage is IMToken {
 
     uint256 internal constant borrowRateMaxMantissa = 0.0005e16;
 
+    /**
+     * @notice Block time the per-block rates are expressed for, see BaseJumpRateModelV2.secondsPerBlock
+     */
+    uint256 internal constant secondsPerBlock = 15;
+
     /**
      * @notice Maximum fraction of interest that can be set aside for reserves
      */
@@ -73,9 +80,16 @@ abstract contract MTokenStorage is IMToken {
     uint256 public reserveFactorMantissa;
 
     /**
-     * @notice Block number that interest was last accrued at
+     * @notice Block timestamp that interest was last accrued at
      */
-    uint256 public accrualBlockNumber;
+    uint256 public accrualBlockTimestamp;
+
+    /**
+     * @notice Minimum time in seconds between two interest accruals.
+     *  Within this interval accrueInterest is skipped, mint and redeem price the pending interest in and views
+     *  compute accrued values on the fly. Operations changing borrows or reserves always accrue.
+     */
+    uint256 public minAccrualInterval;
 
     /**
      * @notice Accumulator of the total earned interest rate since the opening of the market
@@ -134,22 +148,75 @@ abstract contract MTokenStorage is IMToken {
 
     /**
      * @notice Container for fixed borrow balance information
+     * @dev Packed into a single storage slot, so reading a borrow costs one SLOAD
      * @member amount Amount of underlying borrowed with provided rate
      * @member rate Fixed rate with which a borrow was made
      * @member openedAt Timestamp, inidicating when a borrow was taken
      * @member duration Duration till maturity will be reached
      */
     struct FixedRateBorrow {
-        uint256 amount;
-        uint256 rate;
-        uint256 openedAt;
-        uint256 duration;
+        uint128 amount;
+        uint64 rate;
+        uint32 openedAt;
+        uint32 duration;
     }
 
     /**
-     * @notice Mapping of account addresses to array of every fixed borrow
+     * @notice Mapping of account addresses to their fixed borrows by borrow ID
+     * @dev IDs are assigned per account and never reused, so an ID stays valid until its borrow is repaid
+     */
+    mapping(address => mapping(uint256 => FixedRateBorrow)) public accountFixedRateBorrows;
+
+    /**
+     * @notice Mapping of account addresses to the IDs of their open fixed borrows
+     */
+    mapping(address => EnumerableSet.UintSet) internal accountFixedRateBorrowIds;
+
+    /**
+     * @notice Mapping of account addresses to the ID of their next fixed borrow
+     */
+    mapping(address => uint256) public nextFixedRateBorrowId;
+
+    /**
+     * @notice Mapping of account addresses to the total principal of their open fixed borrows
+     */
+    mapping(address => uint256) public accountFixedRateBorrowsPrincipal;
+
+    /**
+     * @notice Width of a bucket in the expiry index of fixed rate borrows
+     */
+    uint256 public constant maturityBucketSize = 1 hours;
+
+    /**
+     * @notice Expiry index of fixed rate borrows: maturity bucket => borrowers with a borrow maturing in the bucket
+     * @dev Bucket of a borrow is (openedAt + duration) / maturityBucketSize. Entries are never removed,
+     *  repaid borrows are skipped when the index is read.
+     */
+    mapping(uint256 => address[]) internal maturityBuckets;
+
+    /**
+     * @notice Indicator that a borrower is already registered in the maturity bucket
+     */
+    mapping(uint256 => mapping(address => bool)) internal maturityBucketMembers;
+
+    /**
+     * @notice Account whose liquidity check is deferred to the end of the multicall in progress
+     * @dev Zero address when no multicall is in progress
+     */
+    address public deferredLiquidityAccount;
+
+    /**
+     * @notice Maximum number of tenors of the fixed rate term curve
+     */
+    uint256 public constant termCurveMaxTenors = 4;
+
+    /**
+     * @notice Fixed rate term curve, packed in a single slot so pricing a fixed rate borrow costs one SLOAD
+     * @dev Tenor i takes bits [64 * i, 64 * i + 64): the low 32 bits are the tenor in seconds,
+     *  the high 32 bits the yearly rate in millionths. Tenors are increasing, unused tenors are 0.
+     *  A zero curve falls back to the interest rate model and the 1, 2 and 4 weeks maturities.
      */
-    mapping(address => FixedRateBorrow[]) public accountFixedRateBorrows;
+    uint256 internal termCurve;
 
     /**
      * @notice Share of seized collateral that is added to reserves
@@ -0,0 +1,128 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "./interfaces/IController.sol";
+import "./interfaces/IMErc20.sol";
+import "./interfaces/IMToken.sol";
+import "./interfaces/IInterestRateModel.sol";
+import "@openzeppelin/contracts/proxy/Clones.sol";
+
+/**
+ * @title Lists MErc20 markets as EIP-1167 clones of one implementation
+ * @notice A market is cloned, initialized, configured and listed on the Controller in a single transaction.
+ *  The factory must be set as the Controller market factory. The factory is the admin of new markets until
+ *  the owner calls acceptAdmin on them.
+ */
+contract MarketFactory {
+    struct MarketParams {
+        address underlying;
+        IInterestRateModel interestRateModel;
+        uint256 initialExchangeRateMantissa;
+        string name;
+        string symbol;
+        uint8 decimals;
+        uint256 restPeriod;
+        uint256 reserveFactorMantissa;
+        /// @notice Collateral factor set when listing, 0 to leave it unset, requires an oracle price for the market
+        uint256 collateralFactorMantissa;
+    }
+
+    event NewOwner(address oldOwner, address newOwner);
+
+    event NewImplementation(address oldImplementation, address newImplementation);
+
+    event MarketCreated(IMErc20 indexed market, address indexed underlying, bytes32 salt);
+
+    /**
+     * @notice The address of the owner, which creates markets and becomes their admin
+     */
+    address public owner;
+
+    /**
+     * @notice The Controller the markets are listed on
+     */
+    IController public controller;
+
+    /**
+     * @notice The MErc20 contract the markets are clones of
+     */
+    address public implementation;
+
+    /**
+     * @param owner_ The address of the owner
+     * @param controller_ The Controller the markets are listed on
+     * @param implementation_ The MErc20 contract the markets are clones of
+     */
+    constructor(
+        address owner_,
+        IController controller_,
+        address implementation_
+    ) {
+        owner = owner_;
+        controller = controller_;
+        implementation = implementation_;
+    }
+
+    /**
+     * @notice Create, configure and list a market
+     * @dev The owner must call acceptAdmin on the market to become its admin
+     * @param params The market parameters
+     * @param salt The salt of the clone, see predictMarket
+     * @return market The new market
+     */
+    function createMarket(MarketParams calldata params, bytes32 salt) external returns (IMErc20 market) {
+        require(msg.sender == owner, "only the owner may call this function.");
+
+        market = IMErc20(Clones.cloneDeterministic(implementation, salt));
+        market.initialize(
+            params.underlying,
+            controller,
+            params.interestRateModel,
+            params.initialExchangeRateMantissa,
+            params.name,
+            params.symbol,
+            params.decimals
+        );
+
+        IMToken mToken = IMToken(address(market));
+        mToken.setRestPeriod(params.restPeriod);
+        mToken.setReserveFactor(params.reserveFactorMantissa);
+
+        controller.supportMarket(mToken);
+        if (params.collateralFactorMantissa != 0) {
+            controller.setCollateralFactor(mToken, params.collateralFactorMantissa);
+        }
+
+        mToken.setPendingAdmin(payable(owner));
+        emit MarketCreated(market, params.underlying, salt);
+    }
+
+    /**
+     * @notice Get the address of the market created with a salt, e.g. to post its price before listing it
+     * @param salt The salt passed to createMarket
+     * @return The market address
+     */
+    function predictMarket(bytes32 salt) external view returns (address) {
+        return Clones.predictDeterministicAddress(implementation, salt);
+    }
+
+    /**
+     * @notice Set the MErc20 contract new markets are clones of
+     * @param newImplementation The new implementation
+     */
+    function setImplementation(address newImplementation) external {
+        require(msg.sender == owner, "only the owner may call this function.");
+        emit NewImplementation(implementation, newImplementation);
+        implementation = newImplementation;
+    }
+
+    /**
+     * @notice Transfer the ownership of the factory
+     * @param newOwner The new owner
+     */
+    function setOwner(address newOwner) external {
+        require(msg.sender == owner, "only the owner may call this function.");
+        emit NewOwner(owner, newOwner);
+        owner = newOwner;
+    }
+}
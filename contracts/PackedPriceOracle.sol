@@ -0,0 +1,140 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "./interfaces/IPriceOracle.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+
+/**
+ * @title Price oracle fed by a trusted poster
+ * @notice Stores the price and the update time of every market in a single storage slot,
+ *  so a price read costs one SLOAD
+ */
+contract PackedPriceOracle is IPriceOracle {
+    using SafeCast for uint256;
+
+    struct PriceData {
+        /// @notice The underlying price mantissa, scaled like IPriceOracle.getUnderlyingPrice
+        uint224 price;
+        /// @notice The timestamp of the price update
+        uint32 updatedAt;
+    }
+
+    event NewOwner(address oldOwner, address newOwner);
+
+    event NewPoster(address oldPoster, address newPoster);
+
+    event NewMaxPriceAge(uint256 oldMaxPriceAge, uint256 newMaxPriceAge);
+
+    event PricePosted(IMToken mToken, uint256 previousPriceMantissa, uint256 newPriceMantissa);
+
+    /**
+     * @notice The address of the owner, which can set the poster and the max price age
+     */
+    address public owner;
+
+    /**
+     * @notice The address allowed to post prices
+     */
+    address public poster;
+
+    /**
+     * @notice Age in seconds after which a price is considered unavailable, 0 to never expire prices
+     */
+    uint256 public maxPriceAge;
+
+    /**
+     * @notice The latest price of every market
+     */
+    mapping(IMToken => PriceData) public prices;
+
+    /**
+     * @param owner_ The address of the owner
+     * @param poster_ The address allowed to post prices
+     * @param maxPriceAge_ Age in seconds after which a price is considered unavailable
+     */
+    constructor(
+        address owner_,
+        address poster_,
+        uint256 maxPriceAge_
+    ) {
+        owner = owner_;
+        poster = poster_;
+        maxPriceAge = maxPriceAge_;
+    }
+
+    /**
+     * @notice Get the underlying price of a mToken asset
+     * @param mToken The mToken to get the underlying price of
+     * @return The underlying asset price mantissa, zero if it is missing or older than maxPriceAge
+     */
+    function getUnderlyingPrice(IMToken mToken) external view returns (uint256) {
+        return _getUnderlyingPrice(mToken, maxPriceAge);
+    }
+
+    /**
+     * @notice Get the underlying prices of many mToken assets
+     * @param mTokens The mTokens to get the underlying prices of
+     * @return underlyingPrices The underlying asset price mantissas, zero where the price is unavailable
+     */
+    function getUnderlyingPrices(IMToken[] calldata mTokens) external view returns (uint256[] memory underlyingPrices) {
+        uint256 maxPriceAge_ = maxPriceAge;
+        underlyingPrices = new uint256[](mTokens.length);
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            underlyingPrices[i] = _getUnderlyingPrice(mTokens[i], maxPriceAge_);
+        }
+    }
+
+    function _getUnderlyingPrice(IMToken mToken, uint256 maxPriceAge_) internal view returns (uint256) {
+        PriceData memory data = prices[mToken];
+        if (maxPriceAge_ != 0 && block.timestamp > uint256(data.updatedAt) + maxPriceAge_) {
+            return 0;
+        }
+        return data.price;
+    }
+
+    /**
+     * @notice Post the underlying prices of many markets
+     * @param mTokens The markets to post the prices of
+     * @param underlyingPriceMantissas The underlying price mantissas
+     */
+    function setUnderlyingPrices(IMToken[] calldata mTokens, uint256[] calldata underlyingPriceMantissas) external {
+        require(msg.sender == poster, "only the poster may post prices");
+        require(mTokens.length == underlyingPriceMantissas.length, "Wrong arrays length");
+
+        uint32 updatedAt = block.timestamp.toUint32();
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            emit PricePosted(mTokens[i], prices[mTokens[i]].price, underlyingPriceMantissas[i]);
+            prices[mTokens[i]] = PriceData({price: underlyingPriceMantissas[i].toUint224(), updatedAt: updatedAt});
+        }
+    }
+
+    /**
+     * @notice Set the address allowed to post prices
+     * @param newPoster The new poster
+     */
+    function setPoster(address newPoster) external {
+        require(msg.sender == owner, "only the owner may call this function.");
+        emit NewPoster(poster, newPoster);
+        poster = newPoster;
+    }
+
+    /**
+     * @notice Set the age after which prices are considered unavailable
+     * @param newMaxPriceAge The new max price age in seconds, 0 to never expire prices
+     */
+    function setMaxPriceAge(uint256 newMaxPriceAge) external {
+        require(msg.sender == owner, "only the owner may call this function.");
+        emit NewMaxPriceAge(maxPriceAge, newMaxPriceAge);
+        maxPriceAge = newMaxPriceAge;
+    }
+
+    /**
+     * @notice Transfer the ownership of the oracle
+     * @param newOwner The new owner
+     */
+    function setOwner(address newOwner) external {
+        require(msg.sender == owner, "only the owner may call this function.");
+        emit NewOwner(owner, newOwner);
+        owner = newOwner;
+    }
+}
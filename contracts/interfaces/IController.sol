@@ -1,6 +1,8 @@
 // SPDX-License-Identifier: MIT
 pragma solidity 0.8.10;
 
+import "./IMToken.sol";
+
 interface IController {
     /*** Assets You Are In ***/
 
@@ -112,11 +114,28 @@ interface IController {
 
     /*** Liquidity/Liquidation Calculations ***/
 
+    function getAccountLiquidity(address account) external view returns (uint256, uint256);
+
     function liquidateCalculateSeizeTokens(
         address mTokenBorrowed,
         address mTokenCollateral,
         uint256 repayAmount
     ) external view returns (uint256);
 
+    function liquidateCalculateSeizeTokensBatch(
+        address mTokenBorrowed,
+        IMToken[] calldata mTokenCollaterals,
+        uint256[] calldata collateralIndexes,
+        uint256[] calldata repayAmounts
+    ) external view returns (uint256[] memory);
+
     function isController() external view returns (bool);
+
+    function accrueAll(IMToken[] calldata mTokens, uint256 maxAge) external returns (uint256 accrued);
+
+    /*** Admin Functions ***/
+
+    function supportMarket(IMToken mToken) external;
+
+    function setCollateralFactor(IMToken mToken, uint256 newCollateralFactorMantissa) external;
 }
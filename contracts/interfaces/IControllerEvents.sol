@@ -26,6 +26,9 @@ interface IControllerEvents {
     /// @notice Emitted when price oracle is changed
     event NewPriceOracle(IPriceOracle oldPriceOracle, IPriceOracle newPriceOracle);
 
+    /// @notice Emitted when market factory is changed
+    event NewMarketFactory(address oldMarketFactory, address newMarketFactory);
+
     /// @notice Emitted when pause guardian is changed
     event NewPauseGuardian(address oldPauseGuardian, address newPauseGuardian);
 
@@ -7,6 +7,16 @@ import "./IInterestRateModel.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 
 interface IMErc20 {
+    function initialize(
+        address underlying_,
+        IController controller_,
+        IInterestRateModel interestRateModel_,
+        uint256 initialExchangeRateMantissa_,
+        string memory name_,
+        string memory symbol_,
+        uint8 decimals_
+    ) external;
+
     /*** User Interface ***/
     function underlying() external view returns (address);
 
@@ -20,9 +30,9 @@ interface IMErc20 {
 
     function borrowFixedRate(uint256 borrowAmount, uint256 maturity) external;
 
-    function repayBorrowFixedRate(uint256[] memory borrowsIndexes) external;
+    function repayBorrowFixedRate(uint256[] memory borrowIds) external;
 
-    function repayBorrowFixedRateOnBehalf(address borrower, uint256[] memory borrowsIndexes) external;
+    function repayBorrowFixedRateOnBehalf(address borrower, uint256[] memory borrowIds) external;
 
     function repayBorrow(uint256 repayAmount) external returns (uint256);
 
@@ -30,10 +40,16 @@ interface IMErc20 {
 
     function liquidateBorrowFixedRate(
         address borrower,
-        uint256[] memory borrowsIndexes,
+        uint256[] memory borrowIds,
         IMToken[] memory mTokenCollaterals
     ) external;
 
+    function liquidateBorrowFixedRateBatch(
+        address[] memory borrowers,
+        uint256[][] memory borrowIds,
+        IMToken[][] memory mTokenCollaterals
+    ) external;
+
     function liquidateBorrow(
         address borrower,
         uint256 repayAmount,
@@ -45,4 +61,6 @@ interface IMErc20 {
     /*** Admin Functions ***/
 
     function addReserves(uint256 addAmount) external;
+
+    function setCashAccounting(bool internalCash_, bool noTransferFee_) external;
 }
@@ -23,7 +23,7 @@ interface IMToken {
 
     function totalSupply() external view returns (uint256);
 
-    function balanceOfUnderlying(address owner) external returns (uint256);
+    function balanceOfUnderlying(address owner) external view returns (uint256);
 
     function getTotalBorrows() external view returns (uint256);
 
@@ -37,32 +37,67 @@ interface IMToken {
             uint256
         );
 
+    function getAccountSnapshots(address[] calldata accounts)
+        external
+        view
+        returns (
+            uint256[] memory tokenBalances,
+            uint256[] memory borrowBalances,
+            uint256 exchangeRateMantissa,
+            uint256[] memory borrowBalancesTotal
+        );
+
     function borrowRatePerBlock() external view returns (uint256);
 
     function borrowRatePerTime(uint256 time) external view returns (uint256);
 
+    function fixedBorrowRate(uint256 maturity) external view returns (uint256);
+
+    function getTermCurve() external view returns (uint256[] memory tenors, uint256[] memory ratesPerYear);
+
     function fixedBorrowsAmount(address account) external view returns (uint256);
 
+    function fixedBorrowIds(address account) external view returns (uint256[] memory);
+
     function expiredBorrows(address account)
         external
         view
-        returns (uint256[] memory indexes, uint256[] memory repayAmounts);
+        returns (uint256[] memory borrowIds, uint256[] memory repayAmounts);
+
+    function expiredBorrowsBetween(
+        uint256 fromTs,
+        uint256 toTs,
+        uint256 cursor,
+        uint256 limit
+    )
+        external
+        view
+        returns (
+            address[] memory borrowers,
+            uint256[] memory borrowIds,
+            uint256[] memory repayAmounts,
+            uint256 nextCursor
+        );
 
     function supplyRatePerBlock() external view returns (uint256);
 
-    function totalBorrowsCurrent() external returns (uint256);
+    function totalBorrowsCurrent() external view returns (uint256);
 
-    function borrowBalanceCurrent(address account) external returns (uint256);
+    function borrowBalanceCurrent(address account) external view returns (uint256);
 
     function borrowBalanceStored(address account) external view returns (uint256);
 
-    function exchangeRateCurrent() external returns (uint256);
+    function exchangeRateCurrent() external view returns (uint256);
 
     function exchangeRateStored() external view returns (uint256);
 
     function getCash() external view returns (uint256);
 
-    function getAccrualBlockNumber() external view returns (uint256);
+    function accrualFresh() external view returns (bool);
+
+    function accrualBlockTimestamp() external view returns (uint256);
+
+    function deferredLiquidityAccount() external view returns (address);
 
     function accrueInterest() external;
 
@@ -72,6 +107,12 @@ interface IMToken {
         uint256 seizeTokens
     ) external;
 
+    function seizeBatch(
+        address liquidator,
+        address[] calldata borrowers,
+        uint256[] calldata seizeTokens
+    ) external;
+
     function totalBorrows() external view returns (uint256);
 
     function borrowIndex() external view returns (uint256);
@@ -92,7 +133,15 @@ interface IMToken {
 
     function setReserveFactor(uint256 newReserveFactorMantissa) external;
 
+    function setRestPeriod(uint256 newRestPeriod) external;
+
     function reduceReserves(uint256 reduceAmount) external;
 
+    function addReservesFrom(address payer, uint256 addAmount) external returns (uint256);
+
+    function reduceReservesFromController(uint256 reduceAmount) external;
+
     function setInterestRateModel(IInterestRateModel newInterestRateModel) external;
+
+    function setTermCurve(uint256[] calldata tenors, uint256[] calldata ratesPerYear) external;
 }
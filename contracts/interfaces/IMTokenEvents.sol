@@ -31,7 +31,7 @@ interface IMTokenEvents {
     /**
      * @notice Event emitted when underlying is borrowed with fixed rate
      */
-    event BorrowFixedRate(address borrower, uint256 borrowAmount, uint256 openedAt, uint256 maturity);
+    event BorrowFixedRate(address borrower, uint256 borrowAmount, uint256 openedAt, uint256 maturity, uint256 borrowId);
 
     /**
      * @notice Event emitted when a borrow is repaid
@@ -97,6 +97,26 @@ interface IMTokenEvents {
      */
     event NewReserveFactor(uint256 oldReserveFactorMantissa, uint256 newReserveFactorMantissa);
 
+    /**
+     * @notice Event emitted when the minimum accrual interval is changed
+     */
+    event NewMinAccrualInterval(uint256 oldMinAccrualInterval, uint256 newMinAccrualInterval);
+
+    /**
+     * @notice Event emitted when the fixed rate term curve is changed
+     */
+    event NewTermCurve(uint256[] tenors, uint256[] ratesPerYear);
+
+    /**
+     * @notice Event emitted when the cash accounting of the market is changed
+     */
+    event NewCashAccounting(bool internalCash, bool noTransferFee, uint256 totalCash);
+
+    /**
+     * @notice Event emitted when the internal cash is reconciled with the underlying balance
+     */
+    event CashReconciled(uint256 oldTotalCash, uint256 newTotalCash);
+
     /**
      * @notice Event emitted when the reserves are added
      */
@@ -11,4 +11,12 @@ interface IPriceOracle {
      *  Zero means the price is unavailable.
      */
     function getUnderlyingPrice(IMToken mToken) external view returns (uint256);
+
+    /**
+     * @notice Get the underlying prices of many mToken assets in one call
+     * @param mTokens The mTokens to get the underlying prices of
+     * @return The underlying asset price mantissas (scaled by 1e18), in the order of `mTokens`.
+     *  Zero means the price is unavailable.
+     */
+    function getUnderlyingPrices(IMToken[] calldata mTokens) external view returns (uint256[] memory);
 }
@@ -0,0 +1,66 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "../Controller.sol";
+
+/**
+ * @title Controller exposing the state left behind by earlier storage layouts, for upgrade tests,
+ *  with a settable block number and NEB token for NEB distribution tests
+ */
+contract ControllerHarness is Controller {
+    uint256 public harnessBlockNumber;
+
+    address public harnessNebAddress;
+
+    /**
+     * @notice Enters the account in the market with the array based layout used before the membership bitmaps
+     */
+    function harnessEnterLegacyMarket(address account, IMToken mToken) external {
+        accountAssets[account].push(mToken);
+        accountMembership[address(mToken)][account] = true;
+    }
+
+    /**
+     * @notice Clears the index of the market, as for a market listed before the indexes
+     */
+    function harnessClearMarketIndex(address mToken) external {
+        marketIndexes[mToken] = 0;
+    }
+
+    /**
+     * @notice Clears the cached underlying scale of the market, as for a market listed before the cache
+     */
+    function harnessClearUnderlyingScale(address mToken) external {
+        markets[mToken].underlyingScale = 0;
+    }
+
+    /**
+     * @notice Empties the supply market list of the account, as for an account supplying before the lists
+     */
+    function harnessClearSupplyMarkets(address account) external {
+        IMToken[] storage supplyMarkets = accountSupplyMarkets[account];
+        for (uint256 i = 0; i < supplyMarkets.length; i++) {
+            supplyMembership[address(supplyMarkets[i])][account] = false;
+        }
+        delete accountSupplyMarkets[account];
+    }
+
+    /**
+     * @notice Sets the block number NEB is distributed at, zero to follow the chain
+     */
+    function harnessSetBlockNumber(uint256 blockNumber) external {
+        harnessBlockNumber = blockNumber;
+    }
+
+    function harnessSetNebAddress(address neb) external {
+        harnessNebAddress = neb;
+    }
+
+    function getBlockNumber() public view override returns (uint256) {
+        return harnessBlockNumber == 0 ? block.number : harnessBlockNumber;
+    }
+
+    function getNebAddress() public view override returns (address) {
+        return harnessNebAddress;
+    }
+}
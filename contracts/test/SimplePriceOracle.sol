@@ -24,6 +24,13 @@ contract SimplePriceOracle is IPriceOracle {
         return prices[_getUnderlyingAddress(mToken)];
     }
 
+    function getUnderlyingPrices(IMToken[] calldata mTokens) external view returns (uint256[] memory underlyingPrices) {
+        underlyingPrices = new uint256[](mTokens.length);
+        for (uint256 i = 0; i < mTokens.length; i++) {
+            underlyingPrices[i] = getUnderlyingPrice(mTokens[i]);
+        }
+    }
+
     function setUnderlyingPrice(IMToken mToken, uint256 underlyingPriceMantissa) public {
         address asset = _getUnderlyingAddress(mToken);
         emit PricePosted(asset, prices[asset], underlyingPriceMantissa, underlyingPriceMantissa);
@@ -0,0 +1,95 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "@openzeppelin/contracts/utils/Address.sol";
+import "@openzeppelin/contracts/utils/Create2.sol";
+
+/**
+ * @title Deploys contracts at addresses known before the deployment
+ * @notice The salt is namespaced by the sender, so nobody can take an address reserved by another deployer
+ */
+contract Create2Deployer {
+    event Deployed(address indexed deployer, bytes32 salt, address deployed);
+
+    /**
+     * @notice Deploy a contract with CREATE2
+     * @param salt The salt, combined with the sender address
+     * @param bytecode The creation code, including the ABI encoded constructor arguments
+     * @return deployed The address of the new contract
+     */
+    function deploy(bytes32 salt, bytes calldata bytecode) external payable returns (address deployed) {
+        deployed = Create2.deploy(msg.value, _senderSalt(msg.sender, salt), bytecode);
+        emit Deployed(msg.sender, salt, deployed);
+    }
+
+    /**
+     * @notice Deploy a contract with CREATE2 and call it in the same transaction
+     * @dev Used to initialize a proxy before anybody else can, the calls should hand the admin rights
+     *  this contract receives from the initializer over to the sender (e.g. with setPendingAdmin)
+     * @param salt The salt, combined with the sender address
+     * @param bytecode The creation code, including the ABI encoded constructor arguments
+     * @param calls The calldata of each call to the new contract, in order
+     * @return deployed The address of the new contract
+     */
+    function deployAndCall(
+        bytes32 salt,
+        bytes calldata bytecode,
+        bytes[] calldata calls
+    ) external payable returns (address deployed) {
+        return _deployAndCall(msg.value, salt, bytecode, calls);
+    }
+
+    /**
+     * @notice Deploy several contracts with CREATE2 and call each of them in the same transaction
+     * @dev See deployAndCall, used to deploy and initialize a batch of proxies in one transaction
+     * @param salts The salt of each contract, combined with the sender address
+     * @param bytecodes The creation code of each contract, including the ABI encoded constructor arguments
+     * @param calls The calldata of the calls to each contract, in order
+     * @return deployed The addresses of the new contracts
+     */
+    function deployAndCallMany(
+        bytes32[] calldata salts,
+        bytes[] calldata bytecodes,
+        bytes[][] calldata calls
+    ) external returns (address[] memory deployed) {
+        require(salts.length == bytecodes.length && salts.length == calls.length, "Wrong arrays length");
+
+        deployed = new address[](salts.length);
+        for (uint256 i = 0; i < salts.length; i++) {
+            deployed[i] = _deployAndCall(0, salts[i], bytecodes[i], calls[i]);
+        }
+    }
+
+    /**
+     * @notice Get the address a contract is deployed at
+     * @param deployer The address sending the deploy transaction
+     * @param salt The salt passed to deploy
+     * @param bytecodeHash The keccak256 hash of the creation code, including the constructor arguments
+     * @return The address of the contract
+     */
+    function computeAddress(
+        address deployer,
+        bytes32 salt,
+        bytes32 bytecodeHash
+    ) external view returns (address) {
+        return Create2.computeAddress(_senderSalt(deployer, salt), bytecodeHash);
+    }
+
+    function _deployAndCall(
+        uint256 amount,
+        bytes32 salt,
+        bytes calldata bytecode,
+        bytes[] calldata calls
+    ) internal returns (address deployed) {
+        deployed = Create2.deploy(amount, _senderSalt(msg.sender, salt), bytecode);
+        emit Deployed(msg.sender, salt, deployed);
+
+        for (uint256 i = 0; i < calls.length; i++) {
+            Address.functionCall(deployed, calls[i]);
+        }
+    }
+
+    function _senderSalt(address deployer, bytes32 salt) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(deployer, salt));
+    }
+}
@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "@openzeppelin/contracts/proxy/transparent/TransparentUpgradeableProxy.sol";
+
+/**
+ * @title Transparent proxy of the upgradable protocol contracts
+ * @dev Deployed by utils/deploy_helpers.py, directly or through the Create2Deployer
+ */
+contract UtilProxy is TransparentUpgradeableProxy {
+    /**
+     * @param logic The implementation address
+     * @param admin_ The proxy admin, usually a UtilProxyAdmin
+     * @param data Initializer call data, empty to initialize the proxy in a separate transaction
+     */
+    constructor(
+        address logic,
+        address admin_,
+        bytes memory data
+    ) payable TransparentUpgradeableProxy(logic, admin_, data) {}
+}
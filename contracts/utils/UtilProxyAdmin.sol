@@ -0,0 +1,9 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "@openzeppelin/contracts/proxy/transparent/ProxyAdmin.sol";
+
+/**
+ * @title Admin of the UtilProxy instances, owned by its deployer
+ */
+contract UtilProxyAdmin is ProxyAdmin {}
@@ -0,0 +1,39 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+from utils.accrual_keeper import AccrualKeeper
+import os
+import json
+
+
+def report(tx):
+    print(f"Block {tx.block_number}: accrued {tx.return_value} markets, gas used {tx.gas_used}")
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+    keeper = accounts.add(os.getenv("KEEPER_PRIVATE_KEY"))
+
+    f = open('./scripts/deploy_script/deploy_info.json')
+    data = json.load(f)
+    deployed_contracts_addresses = data["deployedContracts"]
+
+    # Getting instances of contracts
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
+    markets = [
+        MErc20.at(deployed_contracts_addresses["UsdcMarketToken"]),
+        MErc20.at(deployed_contracts_addresses["MetisMarketToken"]),
+    ]
+
+    # Markets are accrued once ACCRUAL_MAX_AGE seconds old while the gas price is at most ACCRUAL_MAX_GAS_PRICE wei,
+    # and at any gas price once ACCRUAL_FORCE_AGE seconds old
+    max_gas_price = os.getenv("ACCRUAL_MAX_GAS_PRICE")
+    accrual_keeper = AccrualKeeper(
+        controller,
+        markets,
+        keeper,
+        max_age=int(os.getenv("ACCRUAL_MAX_AGE", 3600)),
+        force_age=int(os.getenv("ACCRUAL_FORCE_AGE", 4 * 3600)),
+        max_gas_price=int(max_gas_price) if max_gas_price else None,
+    )
+    accrual_keeper.run(poll_interval=60, callback=report)
@@ -0,0 +1,50 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+from utils.async_client import protocol_state
+import os
+import json
+
+RESERVE_TARGETS_PATH = "./scripts/admin_scripts/reserve_targets.json"
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+    deployer = accounts.add(os.getenv("DEPLOYER_PRIVATE_KEY"))
+
+    f = open('./scripts/deploy_script/deploy_info.json')
+    data = json.load(f)
+    deployed_contracts_addresses = data["deployedContracts"]
+
+    # Target reserves of every market, in underlying units
+    with open(RESERVE_TARGETS_PATH) as targets_file:
+        targets = json.load(targets_file)
+
+    # Getting instances of contracts
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
+    markets = [MErc20.at(deployed_contracts_addresses[name]) for name in targets]
+
+    # Current reserves of all the markets, read in one batch of RPC calls.
+    # Interest accrued until the transaction is mined leaves the reserves slightly above their targets
+    state = protocol_state(controller, markets)
+    deltas = [targets[name] - state.markets[market.address].total_reserves for name, market in zip(targets, markets)]
+    add_amounts = [max(delta, 0) for delta in deltas]
+    reduce_amounts = [max(-delta, 0) for delta in deltas]
+
+    # Markets pull added reserves from the admin, an approval is only sent once the previous one is used up
+    for market, amount in zip(markets, add_amounts):
+        underlying = ERC20PresetMinterPauserMock.at(market.underlying())
+        if amount and underlying.allowance(deployer, market) < amount:
+            underlying.approve(market, 2 ** 256 - 1, {"from": deployer})
+
+    for name, add_amount, reduce_amount in zip(targets, add_amounts, reduce_amounts):
+        print(f"{name}: adding {add_amount}, reducing {reduce_amount}")
+
+    # Every market is rebalanced in a single transaction, reduced reserves are sent to the market admin
+    controller.multicall(
+        [
+            controller.addReservesMany.encode_input(markets, add_amounts),
+            controller.reduceReservesMany.encode_input(markets, reduce_amounts),
+        ],
+        {"from": deployer},
+    )
@@ -3,6 +3,7 @@ from dotenv import load_dotenv, find_dotenv
 from brownie.convert.normalize import format_input
 from brownie.convert import to_bytes
 from utils.deploy_helpers import deploy_proxy, deploy_admin
+from utils.async_client import protocol_state
 import os
 import json
 
@@ -35,16 +36,18 @@ def main():
     # Borrow Metis for 1$ worth(Current price is 200$) with fixed rate for one week long
     metis_borrow_amount = 0.005e18
 
-    print("Your Metis balance before borrowing: ", metis.balanceOf(user) / 1e18)
-    print("Your Metis Market Token Borrow balance with fixed rate before borrowing", (metis_market.getAccountSnapshot(user)[3] - metis_market.borrowBalanceStored(user)) / 1e18)
-    borrows_amount_before = metis_market.fixedBorrowsAmount(user)
-    print("Amount of your loans, taken with fixed rate before borrowing: ", borrows_amount_before)
+    # Balances are read in one batch of RPC calls
+    position = protocol_state(controller, [metis_market], [user]).accounts[user.address][metis_market.address]
+    print("Your Metis balance before borrowing: ", position.underlying_balance / 1e18)
+    print("Your Metis Market Token Borrow balance with fixed rate before borrowing", position.borrow_balance_fixed / 1e18)
+    print("Amount of your loans, taken with fixed rate before borrowing: ", position.fixed_borrows_amount)
 
     metis_market.borrowFixedRate(metis_borrow_amount, ONE_WEEK, {"from": user})
 
-    print("Your Metis balance after borrowing: ", metis.balanceOf(user) / 1e18)
-    print("Your Metis Market Token Borrow balance with fixed rate before borrowing", (metis_market.getAccountSnapshot(user)[3] - metis_market.borrowBalanceStored(user)) / 1e18)
-    print("Amount of your loans, taken with fixed rate after borrowing: ", metis_market.fixedBorrowsAmount(user))
+    position = protocol_state(controller, [metis_market], [user]).accounts[user.address][metis_market.address]
+    print("Your Metis balance after borrowing: ", position.underlying_balance / 1e18)
+    print("Your Metis Market Token Borrow balance with fixed rate after borrowing", position.borrow_balance_fixed / 1e18)
+    print("Amount of your loans, taken with fixed rate after borrowing: ", position.fixed_borrows_amount)
 
     # You have borrowed some tokens with fixed rate for one week. After this period,
     # you have 4 hours to repay this borrow, otherwise your position might be liquidated
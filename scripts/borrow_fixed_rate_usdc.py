@@ -3,6 +3,7 @@ from dotenv import load_dotenv, find_dotenv
 from brownie.convert.normalize import format_input
 from brownie.convert import to_bytes
 from utils.deploy_helpers import deploy_proxy, deploy_admin
+from utils.async_client import protocol_state
 import os
 import json
 
@@ -35,16 +36,18 @@ def main():
     # Borrow 1 USDC with fixed rate for one week long
     usdc_borrow_amount = 1e6
 
-    print("Your USDC balance before borrowing: ", usdc.balanceOf(user) / 1e6)
-    print("Your USDC Market Token Borrow balance with fixed rate before borrowing", (usdc_market.getAccountSnapshot(user)[3] - usdc_market.borrowBalanceStored(user)) / 1e6)
-    borrows_amount_before = usdc_market.fixedBorrowsAmount(user)
-    print("Amount of your loans, taken with fixed rate before borrowing: ", borrows_amount_before)
+    # Balances are read in one batch of RPC calls
+    position = protocol_state(controller, [usdc_market], [user]).accounts[user.address][usdc_market.address]
+    print("Your USDC balance before borrowing: ", position.underlying_balance / 1e6)
+    print("Your USDC Market Token Borrow balance with fixed rate before borrowing", position.borrow_balance_fixed / 1e6)
+    print("Amount of your loans, taken with fixed rate before borrowing: ", position.fixed_borrows_amount)
 
     usdc_market.borrowFixedRate(usdc_borrow_amount, ONE_WEEK, {"from": user})
 
-    print("Your USDC balance after borrowing: ", usdc.balanceOf(user) / 1e6)
-    print("Your USDC Market Token Borrow balance with fixed rate after borrowing", (usdc_market.getAccountSnapshot(user)[3] - usdc_market.borrowBalanceStored(user)) / 1e6)
-    print("Amount of your loans, taken with fixed rate after borrowing: ", usdc_market.fixedBorrowsAmount(user))
+    position = protocol_state(controller, [usdc_market], [user]).accounts[user.address][usdc_market.address]
+    print("Your USDC balance after borrowing: ", position.underlying_balance / 1e6)
+    print("Your USDC Market Token Borrow balance with fixed rate after borrowing", position.borrow_balance_fixed / 1e6)
+    print("Amount of your loans, taken with fixed rate after borrowing: ", position.fixed_borrows_amount)
 
     # You have borrowed some tokens with fixed rate for one week. After this period,
     # you have 4 hours to repay this borrow, otherwise your position might be liquidated
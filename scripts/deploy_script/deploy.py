@@ -0,0 +1,21 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+from utils.deploy_pipeline import DeploymentPipeline
+import os
+import json
+
+MANIFEST_PATH = "./scripts/deploy_script/manifest.json"
+DEPLOY_INFO_PATH = "./scripts/deploy_script/deploy_info.json"
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+    deployer = accounts.add(os.getenv("DEPLOYER_PRIVATE_KEY"))
+
+    with open(MANIFEST_PATH) as f:
+        manifest = json.load(f)
+
+    # Steps recorded in deploy_info.json are skipped, delete their entries to redeploy them
+    sent = DeploymentPipeline(manifest, DEPLOY_INFO_PATH, deployer).run()
+    print(f"Deployment complete, {sent} transactions sent")
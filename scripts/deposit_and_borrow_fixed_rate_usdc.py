@@ -0,0 +1,45 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+import os
+import json
+
+ONE_WEEK = 7 * 86400
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+    user = accounts.add(os.getenv("USER_PRIVATE_KEY"))
+
+    f = open('./scripts/deploy_script/deploy_info.json')
+    data = json.load(f)
+    tokens = data["tokens"]
+    deployed_contracts_addresses = data["deployedContracts"]
+
+    # Getting instances of contracts
+    usdc = ERC20PresetMinterPauserMock.at(tokens["USDC"])
+    usdc_market = MErc20.at(deployed_contracts_addresses["UsdcMarketToken"])
+
+    # Set amount of USDC to deposit(currently 5 USDC) and to borrow with fixed rate for one week(currently 1 USDC)
+    amount_to_deposit = 5e6
+    usdc_borrow_amount = 1e6
+
+    # Approving USDC
+    usdc.approve(usdc_market, amount_to_deposit, {"from": user})
+
+    print("Your balance of USDC before: ", usdc.balanceOf(user) / 1e6)
+    print("Your balance of USDC Market Token before:", usdc_market.balanceOf(user) / 1e8)
+
+    # Depositing USDC and borrowing against it in a single transaction.
+    # The borrowed market is entered automatically, and liquidity is checked once after both actions
+    usdc_market.multicall(
+        [
+            usdc_market.mint.encode_input(amount_to_deposit),
+            usdc_market.borrowFixedRate.encode_input(usdc_borrow_amount, ONE_WEEK),
+        ],
+        {"from": user},
+    )
+
+    print("Your balance of USDC after: ", usdc.balanceOf(user) / 1e6)
+    print("Your balance of USDC Market Token after:", usdc_market.balanceOf(user) / 1e8)
+    print("Amount of your loans, taken with fixed rate: ", usdc_market.fixedBorrowsAmount(user))
@@ -0,0 +1,41 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+from utils.liquidation_scanner import LiquidationScanner
+import os
+import json
+
+CHECKPOINT_PATH = "./scripts/liquidation_scanner_checkpoint.json"
+
+
+def report(liquidatable):
+    print(f"Block {chain.height}: {len(liquidatable)} liquidatable accounts")
+    for candidate in liquidatable:
+        if candidate.shortfall:
+            print(f"  {candidate.account} health {candidate.health / 1e18:.4f}, shortfall {candidate.shortfall / 1e18}")
+        for market, borrow_ids in candidate.expired_borrows.items():
+            print(f"  {candidate.account} expired fixed rate borrows {borrow_ids} in market {market}")
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+
+    f = open('./scripts/deploy_script/deploy_info.json')
+    data = json.load(f)
+    deployed_contracts_addresses = data["deployedContracts"]
+
+    # Getting instances of contracts
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
+    markets = [
+        MErc20.at(deployed_contracts_addresses["UsdcMarketToken"]),
+        MErc20.at(deployed_contracts_addresses["MetisMarketToken"]),
+    ]
+
+    # Resumes from the checkpoint of the previous run, otherwise indexes from SCANNER_START_BLOCK
+    scanner = LiquidationScanner(
+        controller,
+        markets,
+        checkpoint_path=CHECKPOINT_PATH,
+        start_block=int(os.getenv("SCANNER_START_BLOCK", 0)),
+    )
+    scanner.run(poll_interval=5, callback=report)
@@ -0,0 +1,38 @@
+from brownie import *
+from dotenv import load_dotenv, find_dotenv
+from utils.async_client import protocol_state
+import os
+import json
+
+
+def main():
+    load_dotenv(dotenv_path="./.env", override=True)
+    load_dotenv(find_dotenv())
+
+    f = open('./scripts/deploy_script/deploy_info.json')
+    data = json.load(f)
+    deployed_contracts_addresses = data["deployedContracts"]
+
+    # Getting instances of contracts
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
+    markets = [
+        MErc20.at(deployed_contracts_addresses["UsdcMarketToken"]),
+        MErc20.at(deployed_contracts_addresses["MetisMarketToken"]),
+    ]
+
+    # Comma separated list of the accounts to report, every market and account is read in one batch of RPC calls
+    watched = [account for account in os.getenv("ACCOUNTS", "").split(",") if account]
+    state = protocol_state(controller, markets, watched)
+
+    print(f"Block {state.block}")
+    for market in markets:
+        snapshot = state.markets[market.address]
+        print(f"  {market.symbol()}: cash {snapshot.cash}, borrows {snapshot.total_borrows}, "
+              f"fixed rate borrows {snapshot.total_borrows_fixed}, reserves {snapshot.total_reserves}")
+    for account in watched:
+        liquidity, shortfall = state.liquidity[account]
+        print(f"  {account}: liquidity {liquidity / 1e18}, shortfall {shortfall / 1e18}")
+        for market in markets:
+            position = state.accounts[account][market.address]
+            print(f"    {market.symbol()}: tokens {position.tokens}, borrow {position.borrow_balance}, "
+                  f"fixed rate borrow {position.borrow_balance_fixed} in {position.fixed_borrows_amount} loans")
@@ -3,6 +3,7 @@ from dotenv import load_dotenv, find_dotenv
 from brownie.convert.normalize import format_input
 from brownie.convert import to_bytes
 from utils.deploy_helpers import deploy_proxy, deploy_admin
+from utils.async_client import protocol_state
 import os
 import json
 
@@ -20,19 +21,23 @@ def main():
     # Getting instances of contracts
     metis = ERC20PresetMinterPauserMock.at(tokens["METIS"])
     metis_market = MErc20.at(deployed_contracts_addresses["MetisMarketToken"])
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
 
     # !!! NOTE !!! You need to have enough Metis tokens in order to repay your borrow
-    borrow_amount_fixed = (metis_market.getAccountSnapshot(user)[3] - metis_market.borrowBalanceStored(user)) / 1e18
+    # Balances are read in one batch of RPC calls
+    position = protocol_state(controller, [metis_market], [user]).accounts[user.address][metis_market.address]
+    borrow_amount_fixed = position.borrow_balance_fixed / 1e18
 
     print(f"You have borrow with fixed rate in quantity {borrow_amount_fixed} Metis tokens")
 
     # Repaing the first one of borrows
-    print("Your Metis balance before repaying borrow: ", metis.balanceOf(user) / 1e18)
+    print("Your Metis balance before repaying borrow: ", position.underlying_balance / 1e18)
 
-    print("Your amount of borrows with fixed rate before repaying: ", metis_market.fixedBorrowsAmount(user))
-    metis.approve(metis_market, metis.balanceOf(user), {"from": user})
-    metis_market.repayBorrowFixedRate([0], {"from": user})
+    print("Your amount of borrows with fixed rate before repaying: ", position.fixed_borrows_amount)
+    metis.approve(metis_market, position.underlying_balance, {"from": user})
+    metis_market.repayBorrowFixedRate([metis_market.fixedBorrowIds(user)[0]], {"from": user})
 
-    print("Your Metis balance after repaying borrow: ", metis.balanceOf(user) / 1e18)
-    print("You debt with fixed rate after repaying borrow: ", (metis_market.getAccountSnapshot(user)[3] - metis_market.borrowBalanceStored(user)) / 1e18)
-    print("Your amount of borrows with fixed rate after repaying: ", metis_market.fixedBorrowsAmount(user))
+    position = protocol_state(controller, [metis_market], [user]).accounts[user.address][metis_market.address]
+    print("Your Metis balance after repaying borrow: ", position.underlying_balance / 1e18)
+    print("You debt with fixed rate after repaying borrow: ", position.borrow_balance_fixed / 1e18)
+    print("Your amount of borrows with fixed rate after repaying: ", position.fixed_borrows_amount)
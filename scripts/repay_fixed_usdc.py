@@ -3,6 +3,7 @@ from dotenv import load_dotenv, find_dotenv
 from brownie.convert.normalize import format_input
 from brownie.convert import to_bytes
 from utils.deploy_helpers import deploy_proxy, deploy_admin
+from utils.async_client import protocol_state
 import os
 import json
 
@@ -20,19 +21,23 @@ def main():
     # Getting instances of contracts
     usdc = ERC20PresetMinterPauserMock.at(tokens["USDC"])
     usdc_market = MErc20.at(deployed_contracts_addresses["UsdcMarketToken"])
+    controller = Controller.at(deployed_contracts_addresses["Controller"])
 
     # !!! NOTE !!! You need to have enough USDC tokens in order to repay your borrow
-    borrow_amount_fixed = (usdc_market.getAccountSnapshot(user)[3] - usdc_market.borrowBalanceStored(user)) / 1e6
+    # Balances are read in one batch of RPC calls
+    position = protocol_state(controller, [usdc_market], [user]).accounts[user.address][usdc_market.address]
+    borrow_amount_fixed = position.borrow_balance_fixed / 1e6
 
     print(f"You have borrow with fixed rate in quantity {borrow_amount_fixed} USDC tokens")
 
     # Repaing the first one of borrows
-    print("Your USDC balance before repaying borrow: ", usdc.balanceOf(user) / 1e6)
+    print("Your USDC balance before repaying borrow: ", position.underlying_balance / 1e6)
 
-    print("Your amount of borrows with fixed rate before repaying: ", usdc_market.fixedBorrowsAmount(user))
-    usdc.approve(usdc_market, usdc.balanceOf(user), {"from": user})
-    usdc_market.repayBorrowFixedRate([0], {"from": user})
+    print("Your amount of borrows with fixed rate before repaying: ", position.fixed_borrows_amount)
+    usdc.approve(usdc_market, position.underlying_balance, {"from": user})
+    usdc_market.repayBorrowFixedRate([usdc_market.fixedBorrowIds(user)[0]], {"from": user})
 
-    print("Your USDC balance after repaying borrow: ", usdc.balanceOf(user) / 1e6)
-    print("You debt with fixed rate after repaying borrow: ", (usdc_market.getAccountSnapshot(user)[3] - usdc_market.borrowBalanceStored(user)) / 1e6)
-    print("Your amount of borrows with fixed rate after repaying: ", usdc_market.fixedBorrowsAmount(user))
+    position = protocol_state(controller, [usdc_market], [user]).accounts[user.address][usdc_market.address]
+    print("Your USDC balance after repaying borrow: ", position.underlying_balance / 1e6)
+    print("You debt with fixed rate after repaying borrow: ", position.borrow_balance_fixed / 1e6)
+    print("Your amount of borrows with fixed rate after repaying: ", position.fixed_borrows_amount)
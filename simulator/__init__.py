@@ -0,0 +1,17 @@
+"""
+Vectorized off-chain simulator of the MToken / BaseJumpRateModelV2 math.
+
+All amounts are NumPy arrays of Python ints (object dtype), so results match the contracts' uint256
+arithmetic exactly, while every operation runs over a whole batch of markets at once.
+"""
+from simulator.rate_model import BLOCKS_PER_YEAR, EXP_SCALE, SECONDS_PER_BLOCK, JumpRateModel, as_uint
+from simulator.market import (
+    BORROW_RATE_MAX_MANTISSA,
+    MarketState,
+    accrue_interest,
+    borrow_fixed_rate,
+    exchange_rate,
+    fixed_borrow_repay_amount,
+    simulate,
+)
+from simulator.term_curve import term_curve_rate
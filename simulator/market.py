@@ -0,0 +1,155 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from simulator.rate_model import EXP_SCALE, SECONDS_PER_BLOCK, as_uint, safe_div
+
+# MTokenStorage.borrowRateMaxMantissa, the maximum borrow rate per block
+BORROW_RATE_MAX_MANTISSA = 5 * 10 ** 12
+
+
+@dataclass(frozen=True)
+class MarketState:
+    """
+    @dev
+        Interest state of a batch of markets, one array entry per market. Fields mirror MTokenStorage.
+        `cash` stands for MErc20.getCashPrior(), i.e. the underlying balance of the market.
+    """
+
+    cash: np.ndarray
+    total_borrows: np.ndarray
+    total_borrows_fixed: np.ndarray
+    total_reserves: np.ndarray
+    total_supply: np.ndarray
+    borrow_index: np.ndarray
+    reserve_factor_mantissa: np.ndarray
+    initial_exchange_rate_mantissa: np.ndarray
+
+    @classmethod
+    def create(
+        cls,
+        cash,
+        total_borrows=0,
+        total_borrows_fixed=0,
+        total_reserves=0,
+        total_supply=0,
+        borrow_index=EXP_SCALE,
+        reserve_factor_mantissa=0,
+        initial_exchange_rate_mantissa=EXP_SCALE,
+    ):
+        """
+        @dev Builds a state, broadcasting scalar fields to the number of markets
+        """
+        fields = np.broadcast_arrays(
+            *(
+                as_uint(value)
+                for value in (
+                    cash,
+                    total_borrows,
+                    total_borrows_fixed,
+                    total_reserves,
+                    total_supply,
+                    borrow_index,
+                    reserve_factor_mantissa,
+                    initial_exchange_rate_mantissa,
+                )
+            )
+        )
+        return cls(*(np.array(field, dtype=object) for field in fields))
+
+
+def accrue_interest(model, state, time_delta):
+    """
+    @dev
+        Mirrors MToken.accruedInterestState: accrues `time_delta` seconds of interest to every market.
+    @param model JumpRateModel of the markets
+    @param state MarketState before the accrual
+    @param time_delta Seconds elapsed since the last accrual, scalar or one per market
+    @return (MarketState after the accrual, interest accumulated by each market)
+    """
+    time_delta = as_uint(time_delta)
+    simple_interest_factor = model.borrow_rate_per_time(
+        state.cash,
+        state.total_borrows + state.total_borrows_fixed,
+        state.total_reserves,
+        time_delta,
+    )
+    if np.any(simple_interest_factor * SECONDS_PER_BLOCK > BORROW_RATE_MAX_MANTISSA * time_delta):
+        raise ValueError("borrow rate is absurdly high")
+
+    interest_accumulated = (simple_interest_factor * state.total_borrows) // EXP_SCALE
+    accrued = replace(
+        state,
+        total_borrows=state.total_borrows + interest_accumulated,
+        total_reserves=state.total_reserves
+        + (state.reserve_factor_mantissa * interest_accumulated) // EXP_SCALE,
+        borrow_index=state.borrow_index + (simple_interest_factor * state.borrow_index) // EXP_SCALE,
+    )
+    return accrued, interest_accumulated
+
+
+def exchange_rate(state):
+    """
+    @dev Mirrors MToken.exchangeRateInternal: `(cash + borrows - reserves) / totalSupply`
+    """
+    cash_plus_borrows_minus_reserves = (
+        state.cash + state.total_borrows + state.total_borrows_fixed - state.total_reserves
+    )
+    rate = safe_div(cash_plus_borrows_minus_reserves * EXP_SCALE, state.total_supply)
+    return np.where(state.total_supply == 0, state.initial_exchange_rate_mantissa, rate)
+
+
+def simulate(model, state, time_deltas):
+    """
+    @dev
+        Accrues interest step by step. Each step is vectorized over the markets, so the Python loop runs once
+        per time step, not once per market and time step.
+    @param model JumpRateModel of the markets
+    @param state Initial MarketState
+    @param time_deltas Seconds between consecutive accruals, e.g. [15] * 2102400 for a year of blocks
+    @return (final MarketState, borrow index of every market after every step, shape (steps, markets))
+    """
+    borrow_indexes = np.empty((len(time_deltas), len(state.cash)), dtype=object)
+    for step, time_delta in enumerate(time_deltas):
+        state, _ = accrue_interest(model, state, time_delta)
+        borrow_indexes[step] = state.borrow_index
+    return state, borrow_indexes
+
+
+def borrow_fixed_rate(model, state, borrow_amount, maturity):
+    """
+    @dev
+        Mirrors MToken.borrowFixedRateFresh for one borrow in every market.
+    @return (MarketState after the borrow, fixed rate of the borrow for its whole maturity)
+    """
+    borrow_amount = as_uint(borrow_amount)
+    rate = model.borrow_rate_per_time(
+        state.cash,
+        state.total_borrows + state.total_borrows_fixed,
+        state.total_reserves,
+        maturity,
+    )
+    interest_accumulated = (borrow_amount * rate) // EXP_SCALE
+    borrowed = replace(
+        state,
+        cash=state.cash - borrow_amount,
+        total_borrows_fixed=state.total_borrows_fixed + borrow_amount + interest_accumulated,
+        total_reserves=state.total_reserves
+        + (interest_accumulated * state.reserve_factor_mantissa) // EXP_SCALE,
+    )
+    return borrowed, rate
+
+
+def fixed_borrow_repay_amount(amount, rate, opened_at, duration, now):
+    """
+    @dev
+        Mirrors the repay amount of MToken.repayBorrowFixedRateFresh. Before maturity the interest is charged
+        pro rata to the time the borrow was open.
+    @return Amount of underlying to repay for every borrow
+    """
+    amount, rate, opened_at, duration, now = (as_uint(value) for value in (amount, rate, opened_at, duration, now))
+    interest_accumulated = (amount * rate) // EXP_SCALE
+    matured = now >= opened_at + duration
+    time_delta = np.where(matured, 0, now - opened_at)
+    early_interest = safe_div(interest_accumulated * time_delta, duration)
+    return amount + np.where(matured, interest_accumulated, early_interest)
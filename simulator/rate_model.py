@@ -0,0 +1,97 @@
+import numpy as np
+
+EXP_SCALE = 10 ** 18
+BLOCKS_PER_YEAR = 2102400
+SECONDS_PER_BLOCK = 15
+
+
+def as_uint(values):
+    """
+    @dev
+        Converts a scalar or a sequence into a NumPy array of Python ints (object dtype).
+        Object dtype keeps the uint256 arithmetic of the contracts exact, where int64/float64 would overflow or round.
+    @param values Scalar, sequence or array of numbers. Floats like 0.57e18 are truncated to ints.
+    @return Array of Python ints with object dtype, or a Python int for a scalar
+    """
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values
+    if isinstance(values, int):
+        return values
+    array = np.asarray(values, dtype=object)
+    if array.ndim == 0:
+        return int(array)
+    return np.vectorize(int, otypes=[object])(array) if array.size else array
+
+
+def safe_div(numerator, denominator):
+    """
+    @dev
+        Integer division rounding down like Solidity, which returns 0 where the denominator is 0.
+        The contracts guard these cases explicitly, so the result there is always masked by the caller.
+    """
+    denominator = np.asarray(denominator, dtype=object)
+    return numerator // np.where(denominator == 0, 1, denominator)
+
+
+class JumpRateModel:
+    """
+    @dev
+        Vectorized mirror of BaseJumpRateModelV2. Every parameter is an array, one entry per simulated market,
+        so one call evaluates hundreds of parameter sets at once.
+    """
+
+    def __init__(self, base_rate_per_block, multiplier_per_block, jump_multiplier_per_block, kink):
+        self.base_rate_per_block = as_uint(base_rate_per_block)
+        self.multiplier_per_block = as_uint(multiplier_per_block)
+        self.jump_multiplier_per_block = as_uint(jump_multiplier_per_block)
+        self.kink = as_uint(kink)
+
+    @classmethod
+    def from_per_year(cls, base_rate_per_year, multiplier_per_year, jump_multiplier_per_year, kink):
+        """
+        @dev
+            Builds the model from the constructor arguments of BaseJumpRateModelV2
+            (see updateJumpRateModelInternal), including its rounding.
+        """
+        base_rate_per_year = as_uint(base_rate_per_year)
+        multiplier_per_year = as_uint(multiplier_per_year)
+        jump_multiplier_per_year = as_uint(jump_multiplier_per_year)
+        kink = as_uint(kink)
+        return cls(
+            base_rate_per_year // BLOCKS_PER_YEAR,
+            (multiplier_per_year * EXP_SCALE) // (BLOCKS_PER_YEAR * kink),
+            jump_multiplier_per_year // BLOCKS_PER_YEAR,
+            kink,
+        )
+
+    def utilization_rate(self, cash, borrows, reserves):
+        """
+        @dev Mirrors BaseJumpRateModelV2.utilizationRate: `borrows / (cash + borrows - reserves)`
+        """
+        cash, borrows, reserves = as_uint(cash), as_uint(borrows), as_uint(reserves)
+        denominator = cash + borrows - reserves
+        util = safe_div(borrows * EXP_SCALE, denominator)
+        return np.where((borrows == 0) | (denominator == 0), 0, util)
+
+    def borrow_rate(self, cash, borrows, reserves):
+        """
+        @dev Mirrors BaseJumpRateModelV2.getBorrowRateInternal, the borrow rate per block
+        """
+        util = self.utilization_rate(cash, borrows, reserves)
+        normal_rate = (util * self.multiplier_per_block) // EXP_SCALE + self.base_rate_per_block
+        excess_util = np.where(util > self.kink, util - self.kink, 0)
+        return normal_rate + (excess_util * self.jump_multiplier_per_block) // EXP_SCALE
+
+    def borrow_rate_per_time(self, cash, borrows, reserves, duration):
+        """
+        @dev Mirrors BaseJumpRateModelV2.getBorrowRatePerTime, the borrow rate for `duration` seconds
+        """
+        return (self.borrow_rate(cash, borrows, reserves) * as_uint(duration)) // SECONDS_PER_BLOCK
+
+    def supply_rate(self, cash, borrows, reserves, reserve_factor_mantissa):
+        """
+        @dev Mirrors BaseJumpRateModelV2.getSupplyRate, the supply rate per block
+        """
+        one_minus_reserve_factor = EXP_SCALE - as_uint(reserve_factor_mantissa)
+        rate_to_pool = (self.borrow_rate(cash, borrows, reserves) * one_minus_reserve_factor) // EXP_SCALE
+        return (self.utilization_rate(cash, borrows, reserves) * rate_to_pool) // EXP_SCALE
@@ -0,0 +1,40 @@
+import numpy as np
+
+from simulator.rate_model import as_uint
+
+SECONDS_PER_YEAR = 365 * 86400
+RATE_PRECISION = 10 ** 12
+
+
+def term_curve_rate(tenors, rates_per_year, maturity):
+    """
+    @dev
+        Mirrors MToken.fixedBorrowRateInternal for a market with a term curve: the yearly rate is interpolated
+        linearly between the surrounding tenors, then scaled to the maturity.
+    @param tenors Increasing tenors of the curve in seconds
+    @param rates_per_year Yearly rate of each tenor as a mantissa, truncated to 1e-6 like MToken.setTermCurve
+    @param maturity Maturities in seconds, scalar or array. Every maturity must lie within the curve.
+    @return Rate of each maturity for its whole duration as a mantissa
+    """
+    tenors = as_uint(tenors)
+    rates = as_uint(rates_per_year) // RATE_PRECISION * RATE_PRECISION
+    maturity = np.atleast_1d(as_uint(maturity))
+    if np.any((maturity < tenors[0]) | (maturity > tenors[-1])):
+        raise ValueError("Wrong maturity provided")
+
+    upper = np.searchsorted(tenors.astype(np.int64), maturity.astype(np.int64), side="left")
+    lower = np.maximum(upper - 1, 0)
+    tenor_low, tenor_high = tenors[lower], tenors[upper]
+    rate_low, rate_high = rates[lower], rates[upper]
+
+    exact = maturity == tenor_high
+    span = np.where(exact, 1, tenor_high - tenor_low)
+    elapsed = np.where(exact, 0, maturity - tenor_low)
+    rising = rate_high >= rate_low
+    interpolated = np.where(
+        rising,
+        rate_low + ((rate_high - rate_low) * elapsed) // span,
+        rate_low - ((rate_low - rate_high) * elapsed) // span,
+    )
+    rate = np.where(exact, rate_high, interpolated)
+    return (rate * maturity) // SECONDS_PER_YEAR
@@ -1,41 +1,95 @@
 import pytest
 from brownie import *
+import json
 import os
+from types import SimpleNamespace
 from dotenv import load_dotenv, find_dotenv
 from utils.deploy_helpers import deploy_proxy, deploy_admin
 
 
-@pytest.fixture(scope="module")
+GAS_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "gas_baseline.json")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        default=False,
+        help="Write measured gas usage of the benchmarks to tests/gas_baseline.json",
+    )
+    parser.addoption(
+        "--gas-tolerance",
+        type=float,
+        default=0.02,
+        help="Allowed relative increase of gas usage over the baseline before a benchmark fails",
+    )
+
+
+@pytest.fixture(scope="session")
+def gas_benchmark(request):
+    """
+    @dev
+        Records gas used by a transaction under a benchmark name.
+        Fails the benchmark if gas usage exceeds the baseline by more than --gas-tolerance or if the baseline
+        has no entry for it, or writes the measured values to the baseline when --update-gas-baseline is passed.
+    """
+    update = request.config.getoption("--update-gas-baseline")
+    tolerance = request.config.getoption("--gas-tolerance")
+    baseline = {}
+    if os.path.exists(GAS_BASELINE_PATH):
+        with open(GAS_BASELINE_PATH) as f:
+            baseline = json.load(f)
+    measured = {}
+
+    def record(name, tx):
+        measured[name] = tx.gas_used
+        if update:
+            return tx.gas_used
+        expected = baseline.get(name)
+        assert expected is not None, f"{name} has no gas baseline, rerun with --update-gas-baseline"
+        assert tx.gas_used <= expected * (1 + tolerance), f"{name} used {tx.gas_used} gas, baseline is {expected}"
+        return tx.gas_used
+
+    yield record
+
+    if update and measured:
+        baseline.update(measured)
+        with open(GAS_BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+            f.write("\n")
+
+
+@pytest.fixture(scope="session")
 def env_settings():
     yield load_dotenv(find_dotenv())
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def deployer(accounts):
     yield accounts[0]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def user1(accounts):
     yield accounts[1]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def user2(accounts):
     yield accounts[2]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def user3(accounts):
     yield accounts[3]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def user4(accounts):
     yield accounts[4]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc(deployer, ERC20PresetMinterPauserMock):
     yield deployer.deploy(
         ERC20PresetMinterPauserMock,
@@ -45,7 +99,7 @@ def usdc(deployer, ERC20PresetMinterPauserMock):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def wbtc(deployer, ERC20PresetMinterPauserMock):
     yield deployer.deploy(
         ERC20PresetMinterPauserMock,
@@ -55,7 +109,7 @@ def wbtc(deployer, ERC20PresetMinterPauserMock):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def weth(deployer, ERC20PresetMinterPauserMock):
     yield deployer.deploy(
         ERC20PresetMinterPauserMock,
@@ -65,7 +119,7 @@ def weth(deployer, ERC20PresetMinterPauserMock):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def usdc_rate_model(deployer, BaseJumpRateModelV2):
     yield deployer.deploy(
         BaseJumpRateModelV2,
@@ -77,7 +131,7 @@ def usdc_rate_model(deployer, BaseJumpRateModelV2):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def wbtc_rate_model(deployer, BaseJumpRateModelV2):
     yield deployer.deploy(
         BaseJumpRateModelV2,
@@ -89,7 +143,7 @@ def wbtc_rate_model(deployer, BaseJumpRateModelV2):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def weth_rate_model(deployer, BaseJumpRateModelV2):
     yield deployer.deploy(
         BaseJumpRateModelV2,
@@ -101,12 +155,12 @@ def weth_rate_model(deployer, BaseJumpRateModelV2):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def controller(deployer, Controller):
     yield deployer.deploy(Controller)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cUsdc(deployer, usdc, usdc_rate_model, controller, MErc20):
     ctoken = deployer.deploy(MErc20)
     ctoken.initialize(
@@ -123,7 +177,7 @@ def cUsdc(deployer, usdc, usdc_rate_model, controller, MErc20):
     yield ctoken
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cWbtc(deployer, wbtc, wbtc_rate_model, controller, MErc20):
     ctoken = deployer.deploy(MErc20)
     ctoken.initialize(
@@ -140,7 +194,7 @@ def cWbtc(deployer, wbtc, wbtc_rate_model, controller, MErc20):
     yield ctoken
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def cWeth(deployer, weth, weth_rate_model, controller, MErc20):
     ctoken = deployer.deploy(MErc20)
     ctoken.initialize(
@@ -157,7 +211,7 @@ def cWeth(deployer, weth, weth_rate_model, controller, MErc20):
     yield ctoken
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def oracle_mock(deployer, cUsdc, cWeth, cWbtc, SimplePriceOracle):
     oracle = deployer.deploy(SimplePriceOracle)
     oracle.setUnderlyingPrice(cUsdc, 1e18)
@@ -166,7 +220,7 @@ def oracle_mock(deployer, cUsdc, cWeth, cWbtc, SimplePriceOracle):
     yield oracle
 
 
-@pytest.fixture(scope="module", autouse=True)
+@pytest.fixture(scope="session")
 def setup_controller(controller, oracle_mock, cUsdc, cWbtc, cWeth):
     controller.setPriceOracle(oracle_mock)
     controller.setCloseFactor(0.5e18)
@@ -181,6 +235,50 @@ def setup_controller(controller, oracle_mock, cUsdc, cWbtc, cWeth):
     controller.setCollateralFactor(cWeth, 0.75e18)
 
 
+# The protocol is deployed once per session by the session-scoped fixtures above.
+# Brownie's module_isolation resets the chain, which would wipe that deployment, so isolation is done with
+# EVM snapshots instead: every module reverts to the deployed protocol, every test to the state its module set up.
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_isolation_snapshot(chain, setup_controller):
+    snapshot_id = rpc.snapshot()
+    yield
+    chain._revert(snapshot_id)
+
+
 @pytest.fixture(autouse=True)
-def isolation(fn_isolation):
-    pass
+def isolation(chain, module_isolation_snapshot):
+    chain.snapshot()
+    yield
+    chain.revert()
+
+
+@pytest.fixture(scope="module")
+def populated_protocol(user1, user2, user3, usdc, weth, cUsdc, cWeth, controller, module_isolation_snapshot):
+    """
+    @dev
+        Protocol with funded users and open positions, built once per module that requests it:
+        user1 supplies USDC, user2 and user3 supply WETH as collateral,
+        user2 holds a variable and a fixed rate USDC borrow, user3 a fixed rate USDC borrow,
+        and a day of interest has accrued.
+    """
+    mint_amount = 500000e6
+    usdc.mint(user1, mint_amount)
+    usdc.approve(cUsdc, mint_amount, {"from": user1})
+    cUsdc.mint(mint_amount, {"from": user1})
+
+    for user in (user2, user3):
+        weth.mint(user, 100e18)
+        controller.enterMarkets([cWeth], {"from": user})
+        weth.approve(cWeth, 100e18, {"from": user})
+        cWeth.mint(100e18, {"from": user})
+
+    cUsdc.borrow(100000e6, {"from": user2})
+    cUsdc.borrowFixedRate(20000e6, 7 * 86400, {"from": user2})
+    cUsdc.borrowFixedRate(10000e6, 2 * 7 * 86400, {"from": user3})
+
+    chain.sleep(86400)
+    cUsdc.accrueInterest({"from": user1})
+
+    yield SimpleNamespace(suppliers=[user1], borrowers=[user2, user3], collateral=cWeth, market=cUsdc)
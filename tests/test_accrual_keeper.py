@@ -0,0 +1,52 @@
+import pytest
+from brownie import *
+from utils.accrual_keeper import AccrualKeeper
+
+
+ONE_HOUR = 3600
+
+
+def test_due_markets(populated_protocol, controller, cUsdc, cWeth, user4):
+    keeper = AccrualKeeper(
+        controller, [cUsdc, cWeth], user4, max_age=ONE_HOUR, force_age=4 * ONE_HOUR, max_gas_price=100
+    )
+    ages = {cUsdc.address: (2 * ONE_HOUR, 0), cWeth.address: (10, 0)}
+
+    assert keeper.due(ages, gas_price=100) == [cUsdc]
+    # Too expensive until the market is force_age old
+    assert keeper.due(ages, gas_price=101) == []
+    ages[cUsdc.address] = (4 * ONE_HOUR, 0)
+    assert keeper.due(ages, gas_price=10 ** 12) == [cUsdc]
+    # Nothing is due
+    assert keeper.due({cUsdc.address: (0, 0), cWeth.address: (0, 0)}, gas_price=0) == []
+    # accrueAll skips a market until its minimum accrual interval has passed
+    ages = {cUsdc.address: (2 * ONE_HOUR, 3 * ONE_HOUR), cWeth.address: (3 * ONE_HOUR, 3 * ONE_HOUR)}
+    assert keeper.due(ages, gas_price=0) == [cWeth]
+
+    with pytest.raises(ValueError):
+        AccrualKeeper(controller, [cUsdc], user4, max_age=ONE_HOUR, force_age=10)
+
+
+def test_tick_accrues_stale_markets(populated_protocol, controller, cUsdc, cWeth, user4, deployer):
+    cWeth.setMinAccrualInterval(3 * ONE_HOUR, {"from": deployer})
+    controller.accrueAll([cUsdc, cWeth], 0, {"from": user4})
+    keeper = AccrualKeeper(controller, [cUsdc, cWeth], user4, max_age=ONE_HOUR)
+    assert keeper.tick() is None
+
+    chain.sleep(2 * ONE_HOUR)
+    chain.mine(1)
+    ages = keeper.ages()
+    assert ages[cUsdc.address][0] >= 2 * ONE_HOUR
+    assert ages[cWeth.address][1] == 3 * ONE_HOUR
+
+    # cWeth is not due before its minimum accrual interval, accrueAll would skip it
+    tx = keeper.tick()
+    assert tx.return_value == 1
+    assert cUsdc.accrualBlockTimestamp() == tx.timestamp
+    assert keeper.tick() is None
+
+    chain.sleep(ONE_HOUR)
+    chain.mine(1)
+    tx = keeper.tick()
+    assert tx.return_value == 2
+    assert cUsdc.accrualBlockTimestamp() == cWeth.accrualBlockTimestamp() == tx.timestamp
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from brownie import *
+from utils.async_client import AsyncRpcClient, RpcError, fetch_protocol_state, protocol_state
+
+
+def test_protocol_state_matches_calls(populated_protocol, controller, oracle_mock, usdc, weth, user1, user2, user3):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    state = protocol_state(controller, [cUsdc, cWeth], [user1, user2, user3])
+    assert state.block == chain.height
+
+    for market in (cUsdc, cWeth):
+        snapshot = state.markets[market.address]
+        assert snapshot.cash == market.getCash()
+        assert snapshot.total_borrows == market.totalBorrows()
+        assert snapshot.total_borrows_fixed == market.totalBorrowsFixed()
+        assert snapshot.total_supply == market.totalSupply()
+        assert snapshot.exchange_rate == market.exchangeRateStored()
+        assert snapshot.price == oracle_mock.getUnderlyingPrice(market)
+
+    for account in (user1, user2, user3):
+        assert state.liquidity[account] == controller.getAccountLiquidity(account)
+        for market, token in ((cUsdc, usdc), (cWeth, weth)):
+            position = state.accounts[account][market.address]
+            tokens, borrow_balance, _, borrow_balance_total = market.getAccountSnapshot(account)
+            assert position.tokens == tokens
+            assert position.borrow_balance == borrow_balance
+            assert position.borrow_balance_fixed == borrow_balance_total - borrow_balance
+            assert position.fixed_borrows_amount == market.fixedBorrowsAmount(account)
+            assert position.underlying_balance == token.balanceOf(account)
+
+
+def test_batches_and_errors(populated_protocol, controller, user1, user2):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    past_block = chain.height
+    cUsdc.accrueInterest({"from": user1})
+
+    async def run():
+        async with AsyncRpcClient(batch_size=3) as client:
+            # Requests spread over several concurrent batches come back in order
+            calls = [(cUsdc.balanceOf, (account,)) for account in (user1, user2)] * 4
+            assert await client.call_many(calls) == [cUsdc.balanceOf(*args) for _, args in calls]
+
+            state = await fetch_protocol_state(client, controller, [cUsdc, cWeth], block=past_block)
+            assert state.markets[cUsdc.address].borrow_index == cUsdc.borrowIndex(block_identifier=past_block)
+
+            with pytest.raises(RpcError):
+                await client.call_many([(cUsdc.fixedBorrowRate, (1,))])
+
+    asyncio.run(run())
@@ -0,0 +1,13 @@
+import pytest
+from brownie import *
+
+
+# EIP-170 limit on the runtime bytecode of a contract, ganache rejects larger deployments
+MAX_CODE_SIZE = 24576
+
+
+@pytest.mark.parametrize("name", ["MErc20", "Controller", "ControllerHarness"])
+def test_contract_size(request, name):
+    deployed_bytecode = request.getfixturevalue(name)._build["deployedBytecode"]
+    size = len(deployed_bytecode.replace("0x", "", 1)) // 2
+    assert size <= MAX_CODE_SIZE, f"{name} runtime bytecode is {size} bytes, EIP-170 limit is {MAX_CODE_SIZE}"
@@ -0,0 +1,256 @@
+import brownie
+import pytest
+from types import SimpleNamespace
+from brownie import *
+
+
+def supply(token, market, user, amount):
+    token.mint(user, amount)
+    token.approve(market, amount, {"from": user})
+    market.mint(amount, {"from": user})
+
+
+def test_market_indexes(controller, cUsdc, cWbtc, cWeth):
+    assert controller.getAllMarkets() == [cUsdc, cWbtc, cWeth]
+    assert [controller.marketIndexes(market) for market in (cUsdc, cWbtc, cWeth)] == [1, 2, 3]
+
+    with brownie.reverts("Market is already listed"):
+        controller.supportMarket(cUsdc)
+
+
+def test_membership_bitmap(user1, user2, usdc, weth, cUsdc, cWbtc, cWeth, controller, oracle_mock):
+    supply(usdc, cUsdc, user1, 100000e6)
+
+    controller.enterMarkets([cWeth, cUsdc, cWbtc], {"from": user2})
+    assert controller.getAssetsIn(user2) == [cUsdc, cWbtc, cWeth]
+    assert controller.accountMembershipBitmaps(user2) == 0b111
+    assert controller.checkMembership(user2, cWbtc)
+    assert not controller.checkMembership(user1, cWbtc)
+
+    # Entering a market twice is a no-op
+    tx = controller.enterMarkets([cWeth], {"from": user2})
+    assert "MarketEntered" not in tx.events
+
+    supply(weth, cWeth, user2, 1e18)
+    cUsdc.borrow(2000e6, {"from": user2})
+    oracle_mock.setUnderlyingPrice(cWeth, 100e18)
+
+    # A market without tokens can be exited even in shortfall, it backs no borrow
+    tx = controller.exitMarket(cWbtc, {"from": user2})
+    assert tx.events["MarketExited"]["mToken"] == cWbtc
+    assert controller.getAssetsIn(user2) == [cUsdc, cWeth]
+    assert not controller.checkMembership(user2, cWbtc)
+
+    with brownie.reverts("User is not in market"):
+        controller.exitMarket(cWbtc, {"from": user2})
+    with brownie.reverts("User has a borrow balance"):
+        controller.exitMarket(cUsdc, {"from": user2})
+    with brownie.reverts("User is not allowed to redeem"):
+        controller.exitMarket(cWeth, {"from": user2})
+    assert controller.getAssetsIn(user1) == []
+
+
+@pytest.fixture(scope="module")
+def legacy_protocol(
+    deployer,
+    usdc,
+    weth,
+    usdc_rate_model,
+    weth_rate_model,
+    oracle_mock,
+    ControllerHarness,
+    MErc20,
+    module_isolation_snapshot,
+):
+    """
+    @dev Controller with its own USDC and WETH markets, which can hold state of the layouts before an upgrade
+    """
+    controller = deployer.deploy(ControllerHarness)
+    controller.setPriceOracle(oracle_mock)
+    controller.setCloseFactor(0.5e18)
+    controller.setLiquidationIncentive(1.1e18)
+
+    usdc_market = deployer.deploy(MErc20)
+    usdc_market.initialize(usdc, controller, usdc_rate_model, 2e14, "mUSDC", "MUSDC", 8)
+    weth_market = deployer.deploy(MErc20)
+    weth_market.initialize(weth, controller, weth_rate_model, 2e26, "mWETH", "MWETH", 8)
+    for market, price, collateral_factor in ((usdc_market, 1e18, 0.85e18), (weth_market, 4000e18, 0.75e18)):
+        oracle_mock.setUnderlyingPrice(market, price)
+        controller.supportMarket(market)
+        controller.setCollateralFactor(market, collateral_factor)
+
+    yield SimpleNamespace(controller=controller, usdc_market=usdc_market, weth_market=weth_market)
+
+
+def test_legacy_memberships(user1, user2, usdc, weth, oracle_mock, legacy_protocol):
+    controller, mUsdc, mWeth = legacy_protocol.controller, legacy_protocol.usdc_market, legacy_protocol.weth_market
+    supply(usdc, mUsdc, user1, 100000e6)
+    supply(weth, mWeth, user2, 1e18)
+    controller.harnessEnterLegacyMarket(user2, mWeth)
+    controller.harnessEnterLegacyMarket(user2, mUsdc)
+
+    # Memberships entered before the bitmaps count until the account is migrated
+    assert controller.accountMembershipBitmaps(user2) == 0
+    assert controller.checkMembership(user2, mWeth)
+    assert controller.getAssetsIn(user2) == [mUsdc, mWeth]
+    mUsdc.borrow(2000e6, {"from": user2})
+    with brownie.reverts("Redeem is not allowed"):
+        mWeth.redeem(mWeth.balanceOf(user2), {"from": user2})
+    oracle_mock.setUnderlyingPrice(mWeth, 100e18)
+    assert controller.getAccountLiquidity(user2)[1] > 0
+    oracle_mock.setUnderlyingPrice(mWeth, 4000e18)
+
+    # Entering a market moves the legacy memberships to the bitmap
+    tx = controller.enterMarkets([mWeth], {"from": user2})
+    assert "MarketEntered" not in tx.events
+    assert controller.accountMembershipBitmaps(user2) == 0b11
+    assert not controller.accountMembership(mWeth, user2)
+    assert controller.getAssetsIn(user2) == [mUsdc, mWeth]
+    with brownie.reverts("Redeem is not allowed"):
+        mWeth.redeem(mWeth.balanceOf(user2), {"from": user2})
+
+    # A market without index can't be entered
+    controller.harnessClearMarketIndex(mUsdc)
+    with brownie.reverts("Market is not indexed"):
+        controller.enterMarkets([mUsdc], {"from": user1})
+    controller.indexMarkets()
+    controller.enterMarkets([mUsdc], {"from": user1})
+    assert controller.checkMembership(user1, mUsdc)
+
+
+def test_underlying_scale(user1, usdc, weth, legacy_protocol):
+    controller, mUsdc, mWeth = legacy_protocol.controller, legacy_protocol.usdc_market, legacy_protocol.weth_market
+    assert controller.markets(mUsdc)[3] == 10**6
+    assert controller.markets(mWeth)[3] == 10**18
+
+    supply(usdc, mUsdc, user1, 100000e6)
+    supply(weth, mWeth, user1, 10e18)
+    controller.enterMarkets([mUsdc, mWeth], {"from": user1})
+    mUsdc.borrow(1000e6, {"from": user1})
+
+    # 100000 USDC * 0.85 + 10 WETH * 4000 * 0.75 - 1000 USDC, in 18 decimals whatever the underlying decimals
+    liquidity = controller.getAccountLiquidity(user1)
+    assert liquidity == (114000e18, 0)
+    seize_tokens = [
+        controller.liquidateCalculateSeizeTokens(mUsdc, mWeth, 1000e6),
+        controller.liquidateCalculateSeizeTokens(mWeth, mUsdc, 1e18),
+    ]
+
+    # Markets listed before the scale was cached fall back to the underlying decimals
+    controller.harnessClearUnderlyingScale(mUsdc)
+    controller.harnessClearUnderlyingScale(mWeth)
+    assert controller.markets(mUsdc)[3] == controller.markets(mWeth)[3] == 0
+    assert controller.getAccountLiquidity(user1) == liquidity
+    assert controller.liquidateCalculateSeizeTokens(mUsdc, mWeth, 1000e6) == seize_tokens[0]
+    assert controller.liquidateCalculateSeizeTokens(mWeth, mUsdc, 1e18) == seize_tokens[1]
+
+
+def test_claim_neb(deployer, user1, user2, user3, usdc, weth, Neb, legacy_protocol):
+    controller, mUsdc, mWeth = legacy_protocol.controller, legacy_protocol.usdc_market, legacy_protocol.weth_market
+    neb = deployer.deploy(Neb, deployer)
+    neb.transfer(controller, 1000000e18, {"from": deployer})
+    controller.harnessSetNebAddress(neb)
+    block = chain.height + 1000
+    controller.harnessSetBlockNumber(block)
+    controller.setNebSpeeds([mUsdc, mWeth], [1, 1], [0, 1])
+
+    supply(usdc, mUsdc, user1, 100000e6)
+    supply(weth, mWeth, user2, 10e18)
+    supply(usdc, mUsdc, user3, 1000e6)
+    controller.enterMarkets([mUsdc], {"from": user1})
+    mWeth.borrow(1e18, {"from": user1})
+    controller.harnessSetBlockNumber(block + 100)
+
+    # The view matches what a claim pays, on the supply and the borrow side
+    for holder in (user1, user2):
+        expected = controller.nebAccruedCurrent(holder)
+        assert expected > 0
+        controller.claimNeb["address"](holder, {"from": holder})
+        assert neb.balanceOf(holder) == expected
+        assert controller.nebAccruedCurrent(holder) == 0
+
+    # A claim drops the supply markets the holder's balance went to zero in
+    mUsdc.redeem(mUsdc.balanceOf(user3), {"from": user3})
+    assert controller.accountSupplyMarkets(user3, 0) == mUsdc
+    expected = controller.nebAccruedCurrent(user3)
+    controller.claimNeb["address"](user3, {"from": user3})
+    assert neb.balanceOf(user3) == expected > 0
+    assert not controller.supplyMembership(mUsdc, user3)
+    with brownie.reverts():
+        controller.accountSupplyMarkets(user3, 0)
+
+    # Suppliers from before the supply market lists are not visited until they are migrated
+    controller.harnessClearSupplyMarkets(user2)
+    controller.harnessSetBlockNumber(block + 200)
+    assert controller.nebAccruedCurrent(user2) == 0
+    with brownie.reverts("Market is not listed"):
+        controller.migrateSupplyMarkets([user2], [user3], {"from": user3})
+    controller.migrateSupplyMarkets([user2, user3], [mUsdc, mWeth], {"from": user3})
+    assert controller.accountSupplyMarkets(user2, 0) == mWeth
+    with brownie.reverts():
+        controller.accountSupplyMarkets(user2, 1)
+    with brownie.reverts():
+        controller.accountSupplyMarkets(user3, 0)
+
+    expected = controller.nebAccruedCurrent(user2)
+    assert expected > 0
+    balance = neb.balanceOf(user2)
+    controller.claimNeb["address"](user2, {"from": user2})
+    assert neb.balanceOf(user2) == balance + expected
+
+
+def test_reserves_many(deployer, user1, usdc, weth, cUsdc, cWbtc, cWeth, controller):
+    usdc.mint(deployer, 100e6)
+    weth.mint(deployer, 1e18)
+    usdc.approve(cUsdc, 100e6, {"from": deployer})
+    weth.approve(cWeth, 1e18, {"from": deployer})
+
+    tx = controller.addReservesMany([cUsdc, cWbtc, cWeth], [100e6, 0, 1e18])
+    assert cUsdc.totalReserves() == 100e6
+    assert cWeth.totalReserves() == 1e18
+    assert [event["benefactor"] for event in tx.events["ReservesAdded"]] == [deployer, deployer]
+
+    # Adds and reductions of every market in one transaction
+    weth.mint(deployer, 1e18)
+    weth.approve(cWeth, 1e18, {"from": deployer})
+    balance = usdc.balanceOf(deployer)
+    controller.multicall(
+        [
+            controller.addReservesMany.encode_input([cWeth], [1e18]),
+            controller.reduceReservesMany.encode_input([cUsdc, cWeth], [40e6, 0.5e18]),
+        ],
+        {"from": deployer},
+    )
+    assert cUsdc.totalReserves() == 60e6
+    assert cWeth.totalReserves() == 1.5e18
+    assert usdc.balanceOf(deployer) == balance + 40e6
+
+    with brownie.reverts("Caller is not an admin"):
+        controller.reduceReservesMany([cUsdc], [1e6], {"from": user1})
+    with brownie.reverts("Wrong arrays length"):
+        controller.addReservesMany([cUsdc], [1e6, 1e6])
+    with brownie.reverts("Caller is not the controller"):
+        cUsdc.reduceReservesFromController(1e6, {"from": deployer})
+
+
+def test_accrue_all(deployer, user1, user2, cUsdc, cWbtc, cWeth, controller, populated_protocol):
+    chain.sleep(3600)
+    cWeth.accrueInterest({"from": user1})
+    chain.mine(1)
+
+    # cWeth was accrued an hour later than the other markets and is skipped
+    tx = controller.accrueAll([cUsdc, cWbtc, cWeth], 1800, {"from": user2})
+    assert tx.return_value == 2
+    assert cUsdc.accrualBlockTimestamp() == cWbtc.accrualBlockTimestamp() == tx.timestamp
+    assert cWeth.accrualBlockTimestamp() < tx.timestamp
+
+    # Markets inside their minimum accrual interval are not accrued, so they are not counted
+    cWbtc.setMinAccrualInterval(7200, {"from": deployer})
+    chain.sleep(3600)
+    tx = controller.accrueAll([cUsdc, cWbtc, cWeth], 0, {"from": user2})
+    assert tx.return_value == 2
+    assert cWbtc.accrualBlockTimestamp() < tx.timestamp
+    assert cUsdc.accrualBlockTimestamp() == cWeth.accrualBlockTimestamp() == tx.timestamp
+
+    with brownie.reverts("Market is not listed"):
+        controller.accrueAll([user1], 0)
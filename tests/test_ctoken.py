@@ -740,4 +740,380 @@ def test_deposit_redeem(user1, user2, usdc, wbtc, weth, cUsdc, cWeth, cWbtc, con
 #     # Can liquidate matured borrows
 #     cUsdc.liquidateBorrowFixedRate(user3, [0, 2], [cWeth, cWeth], {"from": user4})
 
-#     assert cWeth.balanceOf(user4) > 0
\ No newline at end of file
+#     assert cWeth.balanceOf(user4) > 0
+
+def test_expired_borrows_between(user1, user2, user3, user4, usdc, weth, cUsdc, cWeth, controller):
+    amount1 = 500000e6
+    mint_token(usdc, user1, amount1)
+    usdc.approve(cUsdc, amount1, {"from": user1})
+    cUsdc.mint(amount1, {"from": user1})
+
+    # Two borrowers with collateral
+    for user in (user2, user3):
+        mint_token(weth, user, 100e18)
+        controller.enterMarkets([cWeth], {"from": user})
+        weth.approve(cWeth, 100e18, {"from": user})
+        cWeth.mint(100e18, {"from": user})
+
+    cUsdc.borrowFixedRate(10000e6, ONE_WEEK, {"from": user2})
+    cUsdc.borrowFixedRate(10000e6, ONE_MONTH, {"from": user2})
+    cUsdc.borrowFixedRate(20000e6, ONE_WEEK, {"from": user3})
+    maturity = chain.time() + ONE_WEEK
+    from_ts, to_ts = maturity - 3600, maturity + 3600
+
+    # Nothing is liquidatable before the rest period passes
+    borrowers, indexes, repay_amounts, cursor = cUsdc.expiredBorrowsBetween(from_ts, to_ts, 0, 100)
+    assert len(borrowers) == 0
+    assert cursor == 0
+
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    borrowers, indexes, repay_amounts, cursor = cUsdc.expiredBorrowsBetween(from_ts, to_ts, 0, 100)
+    assert sorted(zip(borrowers, indexes)) == sorted([(user2, 0), (user3, 0)])
+    assert cursor == 0
+    for borrower, index, repay_amount in zip(borrowers, indexes, repay_amounts):
+        assert (index, repay_amount) in zip(*cUsdc.expiredBorrows(borrower))
+
+    # Paging visits at most `limit` entries per call and returns a cursor to continue from
+    _, _, _, cursor = cUsdc.expiredBorrowsBetween(from_ts, to_ts, 0, 1)
+    assert cursor != 0
+
+    # Repaid borrows are skipped
+    mint_token(usdc, user3, 30000e6)
+    usdc.approve(cUsdc, 30000e6, {"from": user3})
+    cUsdc.repayBorrowFixedRate([0], {"from": user3})
+
+    borrowers, indexes, _, _ = cUsdc.expiredBorrowsBetween(from_ts, to_ts, 0, 100)
+    assert list(zip(borrowers, indexes)) == [(user2, 0)]
+
+
+def test_batched_snapshots(user1, user2, user3, user4, cUsdc, controller, populated_protocol):
+    accounts = [user1, user2, user3, user4]
+    token_balances, borrow_balances, exchange_rate, borrow_balances_total = cUsdc.getAccountSnapshots(accounts)
+    for i, account in enumerate(accounts):
+        snapshot = cUsdc.getAccountSnapshot(account)
+        assert (token_balances[i], borrow_balances[i], exchange_rate, borrow_balances_total[i]) == snapshot
+
+    liquidities, shortfalls = controller.getAccountsLiquidity(accounts)
+    for i, account in enumerate(accounts):
+        assert (liquidities[i], shortfalls[i]) == controller.getAccountLiquidity(account)
+    assert liquidities[1] > 0
+
+
+def test_min_accrual_interval(deployer, user1, user2, usdc, weth, cUsdc, cWeth, controller):
+    amount1 = 500000e6
+    mint_token(usdc, user1, 2 * amount1)
+    usdc.approve(cUsdc, 2 * amount1, {"from": user1})
+    cUsdc.mint(amount1, {"from": user1})
+
+    mint_token(weth, user2, 100e18)
+    controller.enterMarkets([cWeth], {"from": user2})
+    weth.approve(cWeth, 100e18, {"from": user2})
+    cWeth.mint(100e18, {"from": user2})
+    cUsdc.borrow(100000e6, {"from": user2})
+
+    cUsdc.setMinAccrualInterval(3600, {"from": deployer})
+    accrued_at = cUsdc.accrualBlockTimestamp()
+
+    # Within the interval accrual is skipped, while views still include the accrued interest
+    chain.sleep(600)
+    tx = cUsdc.mint(amount1, {"from": user1})
+    assert cUsdc.accrualBlockTimestamp() == accrued_at
+    assert cUsdc.accrualFresh()
+    assert cUsdc.borrowBalanceCurrent(user2) > cUsdc.borrowBalanceStored(user2)
+    assert cUsdc.exchangeRateCurrent() > cUsdc.exchangeRateStored()
+
+    # The skipped accrual does not dilute suppliers, the mint is priced at the accrued exchange rate
+    assert tx.events["Mint"]["mintTokens"] < amount1 * 1e18 // cUsdc.exchangeRateStored()
+
+    # Operations changing borrows always accrue, so pending interest is charged to the repayer
+    chain.sleep(600)
+    mint_token(usdc, user2, 1000e6)
+    usdc.approve(cUsdc, 1000e6, {"from": user2})
+    tx = cUsdc.repayBorrow(1000e6, {"from": user2})
+    assert "AccrueInterest" in tx.events
+    assert cUsdc.accrualBlockTimestamp() == tx.timestamp
+    assert cUsdc.accrualFresh()
+    accrued_at = tx.timestamp
+
+    # Once the interval passes interest is written to storage
+    chain.sleep(3600)
+    chain.mine(1)
+    assert not cUsdc.accrualFresh()
+    borrow_balance = cUsdc.borrowBalanceCurrent(user2)
+    cUsdc.accrueInterest({"from": user1})
+    assert cUsdc.accrualBlockTimestamp() > accrued_at
+    assert cUsdc.borrowBalanceStored(user2) >= borrow_balance
+
+
+def test_multicall(user1, usdc, cUsdc, controller):
+    amount1 = 10000e6
+    mint_token(usdc, user1, amount1)
+    usdc.approve(cUsdc, amount1, {"from": user1})
+
+    # Deposit and borrow against the deposit in one transaction
+    cUsdc.multicall(
+        [cUsdc.mint.encode_input(amount1), cUsdc.borrowFixedRate.encode_input(5000e6, ONE_WEEK)],
+        {"from": user1},
+    )
+    assert usdc.balanceOf(user1) == 5000e6
+    assert cUsdc.fixedBorrowsAmount(user1) == 1
+    assert controller.checkMembership(user1, cUsdc)
+    assert cUsdc.deferredLiquidityAccount() == ZERO_ADDRESS
+
+    # The liquidity check still runs once all calls are done
+    with brownie.reverts("Insufficient liquidity"):
+        cUsdc.multicall(
+            [cUsdc.borrow.encode_input(1000e6), cUsdc.redeemUnderlying.encode_input(3000e6)],
+            {"from": user1},
+        )
+
+
+def test_liquidate_borrow_fixed_rate_batch(user1, user2, user3, usdc, cUsdc, cWeth, controller, populated_protocol):
+    borrowers = [user2, user3]
+    mint_token(usdc, user1, 100000e6)
+    usdc.approve(cUsdc, 100000e6, {"from": user1})
+
+    with brownie.reverts("Wrong arrays length"):
+        cUsdc.liquidateBorrowFixedRateBatch(borrowers, [[0]], [[cWeth], [cWeth]], {"from": user1})
+    with brownie.reverts("Cannot liquidate fixed rate borrow"):
+        cUsdc.liquidateBorrowFixedRateBatch(borrowers, [[0], [0]], [[cWeth], [cWeth]], {"from": user1})
+
+    chain.sleep(TWO_WEEKS + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+    with brownie.reverts("Can't liquidate your own position"):
+        cUsdc.liquidateBorrowFixedRateBatch(borrowers, [[0], [0]], [[cWeth], [cWeth]], {"from": user2})
+
+    repay_amounts = [cUsdc.expiredBorrows(borrower)[1][0] for borrower in borrowers]
+    seize_tokens = [controller.liquidateCalculateSeizeTokens(cUsdc, cWeth, amount) for amount in repay_amounts]
+    collateral_before = [cWeth.balanceOf(borrower) for borrower in borrowers]
+    usdc_before = usdc.balanceOf(user1)
+
+    tx = cUsdc.liquidateBorrowFixedRateBatch(borrowers, [[0], [0]], [[cWeth], [cWeth]], {"from": user1})
+
+    # Repayments are transferred in once, collateral is seized with one call for both borrowers
+    assert usdc_before - usdc.balanceOf(user1) == sum(repay_amounts)
+    assert len([event for event in tx.events["Transfer"] if event.address == usdc.address]) == 1
+    assert len(tx.events["ReservesAdded"]) == 1
+    assert len(tx.events["LiquidateBorrowFixedRate"]) == 2
+    for borrower, before, seized in zip(borrowers, collateral_before, seize_tokens):
+        assert before - cWeth.balanceOf(borrower) == seized
+        assert cUsdc.fixedBorrowsAmount(borrower) == 0
+    protocol_seize_tokens = sum(seized * cWeth.protocolSeizeShareMantissa() // 10 ** 18 for seized in seize_tokens)
+    assert cWeth.balanceOf(user1) == sum(seize_tokens) - protocol_seize_tokens
+
+
+def test_liquidate_borrow_fixed_rate_batch_collaterals(
+    user1, user2, user3, usdc, cUsdc, cWeth, controller, populated_protocol
+):
+    mint_token(usdc, user2, 10000e6)
+    usdc.approve(cUsdc, 10000e6, {"from": user2})
+    cUsdc.mint(10000e6, {"from": user2})
+    cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    chain.sleep(TWO_WEEKS + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    mint_token(usdc, user1, 100000e6)
+    usdc.approve(cUsdc, 100000e6, {"from": user1})
+    repay_amounts = {borrower: dict(zip(*cUsdc.expiredBorrows(borrower))) for borrower in (user2, user3)}
+    weth_seizes = [controller.liquidateCalculateSeizeTokens(cUsdc, cWeth, repay_amounts[user2][0])]
+    weth_seizes.append(controller.liquidateCalculateSeizeTokens(cUsdc, cWeth, repay_amounts[user3][0]))
+    usdc_seize = controller.liquidateCalculateSeizeTokens(cUsdc, cUsdc, repay_amounts[user2][1])
+    weth_before = [cWeth.balanceOf(user2), cWeth.balanceOf(user3)]
+    usdc_before = cUsdc.balanceOf(user2)
+
+    tx = cUsdc.liquidateBorrowFixedRateBatch(
+        [user2, user3], [[0, 1], [0]], [[cWeth, cUsdc], [cWeth]], {"from": user1}
+    )
+
+    # Each borrower is seized in each of its collateral markets, with one seize per collateral market
+    assert len(tx.events["ReservesAdded"]) == 2
+    assert weth_before[0] - cWeth.balanceOf(user2) == weth_seizes[0]
+    assert weth_before[1] - cWeth.balanceOf(user3) == weth_seizes[1]
+    assert usdc_before - cUsdc.balanceOf(user2) == pytest.approx(usdc_seize, rel=1e-6)
+    assert cUsdc.fixedBorrowsAmount(user2) == cUsdc.fixedBorrowsAmount(user3) == 0
+
+
+def test_term_curve(user1, user2, usdc, weth, cUsdc, cWeth, controller):
+    mint_token(usdc, user1, 100000e6)
+    usdc.approve(cUsdc, 100000e6, {"from": user1})
+    cUsdc.mint(100000e6, {"from": user1})
+    mint_token(weth, user2, 10e18)
+    controller.enterMarkets([cWeth], {"from": user2})
+    weth.approve(cWeth, 10e18, {"from": user2})
+    cWeth.mint(10e18, {"from": user2})
+
+    # Without a curve only the 1, 2 and 4 weeks maturities are offered
+    assert cUsdc.getTermCurve() == ([], [])
+    with brownie.reverts("Wrong maturity provided"):
+        cUsdc.borrowFixedRate(1000e6, 3 * ONE_WEEK, {"from": user2})
+
+    with brownie.reverts("Caller is not an admin"):
+        cUsdc.setTermCurve([ONE_WEEK], [0.05e18], {"from": user1})
+    with brownie.reverts("Tenors must be increasing"):
+        cUsdc.setTermCurve([TWO_WEEKS, ONE_WEEK], [0.05e18, 0.06e18])
+    with brownie.reverts("Rate precision is 1e-6"):
+        cUsdc.setTermCurve([ONE_WEEK], [0.05e18 + 1])
+    with brownie.reverts("Wrong arrays length"):
+        cUsdc.setTermCurve([1, 2, 3, 4, 5], [0, 0, 0, 0, 0])
+
+    tenors, rates = [ONE_WEEK, ONE_MONTH, 13 * ONE_WEEK], [0.05e18, 0.07e18, 0.06e18]
+    cUsdc.setTermCurve(tenors, rates)
+    assert cUsdc.getTermCurve() == (tenors, rates)
+
+    # Tenors are priced exactly, maturities in between are interpolated, outside the curve rejected
+    assert cUsdc.fixedBorrowRate(ONE_MONTH) == 7 * 10 ** 16 * ONE_MONTH // (365 * 86400)
+    assert cUsdc.fixedBorrowRate(TWO_WEEKS) == (5 * 10 ** 16 + 2 * 10 ** 16 // 3) * TWO_WEEKS // (365 * 86400)
+    with brownie.reverts("Wrong maturity provided"):
+        cUsdc.fixedBorrowRate(ONE_WEEK - 1)
+    with brownie.reverts("Wrong maturity provided"):
+        cUsdc.fixedBorrowRate(13 * ONE_WEEK + 1)
+
+    expected_rate = cUsdc.fixedBorrowRate(10 * ONE_WEEK)
+    cUsdc.borrowFixedRate(1000e6, 10 * ONE_WEEK, {"from": user2})
+    assert cUsdc.accountFixedRateBorrows(user2, 0)[1:4:2] == (expected_rate, 10 * ONE_WEEK)
+
+
+def test_internal_cash(deployer, user1, user2, usdc, weth, cUsdc, cWeth, controller):
+    amount1 = 10000e6
+    mint_token(usdc, user1, 2 * amount1)
+    usdc.approve(cUsdc, 2 * amount1, {"from": user1})
+    cUsdc.mint(amount1, {"from": user1})
+
+    with brownie.reverts("Caller is not an admin"):
+        cUsdc.setCashAccounting(True, True, {"from": user1})
+    with brownie.reverts("CErc20::sweepToken: can not sweep underlying token"):
+        cUsdc.sweepToken(usdc)
+
+    tx = cUsdc.setCashAccounting(True, True, {"from": deployer})
+    assert tx.events["NewCashAccounting"]["totalCash"] == amount1
+    assert cUsdc.totalCash() == cUsdc.getCash() == amount1
+
+    # Transfers in and out move the internal cash
+    cUsdc.mint(amount1, {"from": user1})
+    mint_token(weth, user2, 10e18)
+    controller.enterMarkets([cWeth], {"from": user2})
+    weth.approve(cWeth, 10e18, {"from": user2})
+    cWeth.mint(10e18, {"from": user2})
+    cUsdc.borrow(5000e6, {"from": user2})
+    assert cUsdc.totalCash() == cUsdc.getCash() == usdc.balanceOf(cUsdc) == 2 * amount1 - 5000e6
+
+    # A direct transfer doesn't change the cash, and can be swept by the admin
+    mint_token(usdc, user1, 1000e6)
+    usdc.transfer(cUsdc, 1000e6, {"from": user1})
+    exchange_rate = cUsdc.exchangeRateStored()
+    assert cUsdc.getCash() == 2 * amount1 - 5000e6
+    assert cUsdc.exchangeRateStored() == exchange_rate
+
+    admin_balance = usdc.balanceOf(deployer)
+    tx = cUsdc.sweepToken(usdc, {"from": deployer})
+    assert usdc.balanceOf(deployer) == admin_balance + 1000e6
+    assert tx.events["CashReconciled"]["newTotalCash"] == 2 * amount1 - 5000e6
+
+    # Disabling the internal cash falls back to the underlying balance
+    cUsdc.setCashAccounting(False, False, {"from": deployer})
+    assert cUsdc.getCash() == usdc.balanceOf(cUsdc)
+
+
+def test_liquidate_borrow_fixed_rate_grouped(user1, user2, usdc, cUsdc, cWeth, controller, populated_protocol):
+    cUsdc.borrowFixedRate(5000e6, ONE_WEEK, {"from": user2})
+    cUsdc.borrowFixedRate(5000e6, ONE_WEEK, {"from": user2})
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    mint_token(usdc, user1, 100000e6)
+    usdc.approve(cUsdc, 100000e6, {"from": user1})
+    indexes, repay_amounts = cUsdc.expiredBorrows(user2)
+    assert len(indexes) == 3
+    seize_tokens = controller.liquidateCalculateSeizeTokens(cUsdc, cWeth, sum(repay_amounts))
+    collateral_before = cWeth.balanceOf(user2)
+
+    tx = cUsdc.liquidateBorrowFixedRate(user2, indexes, [cWeth] * len(indexes), {"from": user1})
+
+    # The borrows share one collateral, which is priced on their total and seized with a single call
+    assert collateral_before - cWeth.balanceOf(user2) == seize_tokens
+    assert len([event for event in tx.events["Transfer"] if event.address == cWeth.address]) == 2
+    assert len(tx.events["ReservesAdded"]) == 1
+    assert cUsdc.fixedBorrowsAmount(user2) == 0
+
+
+def test_fixed_borrow_ids(user1, user2, usdc, cUsdc, populated_protocol):
+    cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    cUsdc.borrowFixedRate(2000e6, ONE_WEEK, {"from": user2})
+    assert cUsdc.fixedBorrowIds(user2) == [0, 1, 2]
+    borrow = cUsdc.accountFixedRateBorrows(user2, 2)
+
+    mint_token(usdc, user2, 10000e6)
+    usdc.approve(cUsdc, 10000e6, {"from": user2})
+    cUsdc.repayBorrowFixedRate([1], {"from": user2})
+
+    # Repaying a borrow doesn't move the other ones, their IDs stay valid
+    assert sorted(cUsdc.fixedBorrowIds(user2)) == [0, 2]
+    assert cUsdc.fixedBorrowsAmount(user2) == 2
+    assert cUsdc.accountFixedRateBorrows(user2, 2) == borrow
+    assert cUsdc.accountFixedRateBorrows(user2, 1) == (0, 0, 0, 0)
+
+    with brownie.reverts("Fixed rate borrow does not exist"):
+        cUsdc.repayBorrowFixedRate([1], {"from": user2})
+    with brownie.reverts("Fixed rate borrow does not exist"):
+        cUsdc.repayBorrowFixedRate([2, 2], {"from": user2})
+
+    # IDs are never reused
+    tx = cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    assert tx.events["BorrowFixedRate"]["borrowId"] == 3
+    assert cUsdc.nextFixedRateBorrowId(user2) == 4
+
+
+def test_fixed_borrow_principal(deployer, user1, user2, user3, usdc, cUsdc, cWeth, controller, populated_protocol):
+    def fixed_balance(account):
+        snapshot = cUsdc.getAccountSnapshot(account)
+        return snapshot[3] - snapshot[1]
+
+    tx = cUsdc.borrowFixedRate(5000e6, 2 * ONE_WEEK, {"from": user2})
+    cUsdc.borrowFixedRate(3000e6, 2 * ONE_WEEK, {"from": user2})
+    assert cUsdc.accountFixedRateBorrowsPrincipal(user2) == 28000e6
+    assert fixed_balance(user2) == 28000e6
+
+    # Every field of the borrow is packed in one slot
+    borrow = cUsdc.accountFixedRateBorrows(user2, 1)
+    assert borrow["amount"] == 5000e6
+    assert borrow["rate"] > 0
+    assert borrow["openedAt"] == tx.timestamp
+    assert borrow["duration"] == 2 * ONE_WEEK
+
+    # Repaying some of the borrows only subtracts their principal
+    mint_token(usdc, user2, 10000e6)
+    usdc.approve(cUsdc, 10000e6, {"from": user2})
+    cUsdc.repayBorrowFixedRate([1], {"from": user2})
+    assert cUsdc.accountFixedRateBorrowsPrincipal(user2) == 23000e6
+    assert fixed_balance(user2) == 23000e6
+
+    # So does liquidating an expired borrow
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+    mint_token(usdc, user3, 30000e6)
+    usdc.approve(cUsdc, 30000e6, {"from": user3})
+    cUsdc.liquidateBorrowFixedRate(user2, [0], [cWeth], {"from": user3})
+    assert cUsdc.accountFixedRateBorrowsPrincipal(user2) == 3000e6
+    assert fixed_balance(user2) == 3000e6
+    assert cUsdc.accountFixedRateBorrows(user2, 0) == (0, 0, 0, 0)
+
+    # The rate of a term curve borrow is stored exactly, a rate above the uint64 bound is rejected
+    cUsdc.setTermCurve([ONE_WEEK, 4 * ONE_WEEK, 2**32 - 1], [0.05e18, 0.1e18, 4000e18], {"from": deployer})
+    cUsdc.borrowFixedRate(1000e6, 2 * ONE_WEEK, {"from": user2})
+    yearly_rate = 5 * 10**16 + (5 * 10**16 * ONE_WEEK) // (3 * ONE_WEEK)
+    assert cUsdc.accountFixedRateBorrows(user2, 3)["rate"] == yearly_rate * 2 * ONE_WEEK // (365 * 86400)
+    with brownie.reverts("SafeCast: value doesn't fit in 64 bits"):
+        cUsdc.borrowFixedRate(1000e6, 2**32 - 1, {"from": user2})
+
+    # Amounts above the uint128 bound are rejected
+    mint_token(usdc, user1, 2**129)
+    usdc.approve(cUsdc, 2**129, {"from": user1})
+    cUsdc.mint(2**129, {"from": user1})
+    controller.enterMarkets([cUsdc], {"from": user1})
+    with brownie.reverts("SafeCast: value doesn't fit in 128 bits"):
+        cUsdc.borrowFixedRate(2**128, ONE_WEEK, {"from": user1})
+    cUsdc.borrowFixedRate(2**128 - 1, ONE_WEEK, {"from": user1})
+    assert cUsdc.accountFixedRateBorrows(user1, 0)["amount"] == 2**128 - 1
+    assert cUsdc.accountFixedRateBorrowsPrincipal(user1) == 2**128 - 1
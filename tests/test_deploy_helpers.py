@@ -0,0 +1,116 @@
+import pytest
+from brownie import *
+from utils.deploy_helpers import (
+    ImplementationRegistry,
+    compute_proxy_address,
+    deploy_admin,
+    deploy_proxy,
+    deploy_proxies_create2,
+    deploy_proxy_create2,
+    upgrade_proxy,
+)
+
+
+@pytest.fixture(scope="module")
+def proxy_admin(deployer, module_isolation_snapshot):
+    yield deploy_admin(deployer)
+
+
+@pytest.fixture(scope="module")
+def create2_deployer(deployer, Create2Deployer, module_isolation_snapshot):
+    yield deployer.deploy(Create2Deployer)
+
+
+def market_args(token, controller, usdc_rate_model, symbol):
+    return (token, controller, usdc_rate_model, 2e14, f"Market {symbol}", f"m{symbol}", 8)
+
+
+def test_proxies_share_implementation(deployer, proxy_admin, usdc, weth, controller, usdc_rate_model, tmp_path):
+    registry = ImplementationRegistry(str(tmp_path / "implementations.json"))
+    usdc_market, _, usdc_impl = deploy_proxy(
+        deployer, proxy_admin, MErc20, *market_args(usdc, controller, usdc_rate_model, "USDC"), registry=registry
+    )
+    weth_market, _, weth_impl = deploy_proxy(
+        deployer, proxy_admin, MErc20, *market_args(weth, controller, usdc_rate_model, "WETH"), registry=registry
+    )
+    assert usdc_impl == weth_impl
+    assert usdc_market.underlying() == usdc
+    assert weth_market.underlying() == weth
+
+    # A registry loaded from its file reuses the implementation too
+    nonce = deployer.nonce
+    _, proxy, impl = deploy_proxy(
+        deployer,
+        proxy_admin,
+        MErc20,
+        *market_args(usdc, controller, usdc_rate_model, "USDC"),
+        registry=ImplementationRegistry(registry.path),
+    )
+    assert impl == usdc_impl
+    assert deployer.nonce == nonce + 1
+    assert proxy_admin.getProxyImplementation(proxy) == usdc_impl
+
+    _, new_impl = upgrade_proxy(deployer, proxy_admin, proxy, MErc20, registry=registry)
+    assert new_impl == usdc_impl
+
+
+def test_create2_proxies(deployer, user1, proxy_admin, create2_deployer, usdc, weth, controller, usdc_rate_model):
+    registry = ImplementationRegistry()
+    salts = [b"\x01" * 32, b"\x02" * 32]
+    expected = [compute_proxy_address(deployer, create2_deployer, proxy_admin, MErc20, salt) for salt in salts]
+
+    args = [
+        market_args(usdc, controller, usdc_rate_model, "USDC"),
+        market_args(weth, controller, usdc_rate_model, "WETH"),
+    ]
+    markets = [
+        deploy_proxy_create2(deployer, create2_deployer, proxy_admin, MErc20, salt, *market, registry=registry)[0]
+        for salt, market in zip(salts, args)
+    ]
+    assert [market.address for market in markets] == expected
+    assert len(registry.implementations) == 1
+
+    # Initialized in the deployment, the admin rights are handed over to the deployer
+    assert [market.admin() for market in markets] == [deployer, deployer]
+    assert [market.pendingAdmin() for market in markets] == [ZERO_ADDRESS, ZERO_ADDRESS]
+    assert markets[1].underlying() == weth
+    with reverts("market may only be initialized once"):
+        markets[0].initialize(*args[0], {"from": user1})
+
+    # Salts are namespaced by the sender
+    assert compute_proxy_address(user1, create2_deployer, proxy_admin, MErc20, salts[0]) != expected[0]
+    with reverts():
+        deploy_proxy_create2(
+            deployer,
+            create2_deployer,
+            proxy_admin,
+            MErc20,
+            salts[0],
+            *args[0],
+            registry=registry,
+        )
+
+
+def test_create2_proxies_batch(deployer, proxy_admin, create2_deployer, usdc, weth, controller, usdc_rate_model):
+    registry = ImplementationRegistry()
+    registry.get_or_deploy(deployer, MErc20, create2_deployer)
+    salts = [b"\x03" * 32, b"\x04" * 32]
+    args = [
+        market_args(usdc, controller, usdc_rate_model, "USDC"),
+        market_args(weth, controller, usdc_rate_model, "WETH"),
+    ]
+
+    nonce = deployer.nonce
+    proxies = deploy_proxies_create2(deployer, create2_deployer, proxy_admin, MErc20, salts, args, registry=registry)
+    markets = [market for market, _, _ in proxies]
+
+    # One transaction deploys and initializes the proxies, then one per proxy accepts the admin rights
+    assert deployer.nonce == nonce + 1 + len(salts)
+    assert [market.address for market in markets] == [
+        compute_proxy_address(deployer, create2_deployer, proxy_admin, MErc20, salt) for salt in salts
+    ]
+    assert [market.admin() for market in markets] == [deployer, deployer]
+    assert [market.underlying() for market in markets] == [usdc, weth]
+
+    with reverts("Wrong arrays length"):
+        create2_deployer.deployAndCallMany(salts, [], [[], []], {"from": deployer})
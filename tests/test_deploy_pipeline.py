@@ -0,0 +1,115 @@
+import json
+import pytest
+from brownie import *
+from utils.deploy_pipeline import DeploymentPipeline
+
+
+MANIFEST_PATH = "./scripts/deploy_script/manifest.json"
+
+
+@pytest.fixture
+def manifest():
+    with open(MANIFEST_PATH) as f:
+        yield json.load(f)
+
+
+@pytest.fixture
+def info_path(tmp_path, usdc, weth):
+    path = str(tmp_path / "deploy_info.json")
+    with open(path, "w") as f:
+        json.dump({"tokens": {"USDC": usdc.address, "METIS": weth.address}, "deployedContracts": {}}, f)
+    yield path
+
+
+def check_deployment(info_path):
+    with open(info_path) as f:
+        info = json.load(f)
+    deployed = info["deployedContracts"]
+    assert info["pendingSteps"] == {}
+    controller = Controller.at(deployed["Controller"])
+    oracle = SimplePriceOracle.at(deployed["PriceOracle"])
+    assert controller.oracle() == oracle
+    assert controller.closeFactorMantissa() == 0.5e18
+    for market, collateral_factor, price in (
+        ("UsdcMarketToken", 0.85e18, 1e18),
+        ("MetisMarketToken", 0.75e18, 80e18),
+    ):
+        assert controller.markets(deployed[market])[:2] == (True, collateral_factor)
+        assert MErc20.at(deployed[market]).controller() == controller
+        assert MErc20.at(deployed[market]).restPeriod() == 4 * 3600
+        assert oracle.getUnderlyingPrice(deployed[market]) == price
+    # A price posted before its market was initialized is keyed by the zero address
+    assert oracle.assetPrices(ZERO_ADDRESS) == 0
+
+
+def test_pipeline_deploys_manifest(manifest, info_path, deployer):
+    pipeline = DeploymentPipeline(manifest, info_path, deployer)
+    assert pipeline.run() == len(manifest["steps"])
+    check_deployment(info_path)
+
+    # Completed steps are skipped by a rerun
+    nonce = deployer.nonce
+    assert DeploymentPipeline(manifest, info_path, deployer).run() == 0
+    assert deployer.nonce == nonce
+
+
+def test_pipeline_resumes_after_failure(manifest, info_path, deployer):
+    # The collateral factor can't be set without a price, the deployment stops at that step
+    manifest["steps"]["setMetisCollateralFactor"]["after"].remove("setMetisPrice")
+    manifest["steps"]["setMetisPrice"]["after"] = ["setMetisCollateralFactor"]
+    with pytest.raises(RuntimeError):
+        DeploymentPipeline(manifest, info_path, deployer).run()
+
+    with open(info_path) as f:
+        info = json.load(f)
+    assert "setMetisCollateralFactor" not in info["completedSteps"]
+    assert "initializeMetisMarket" in info["completedSteps"]
+
+    # Fixed manifest, only the remaining steps are sent
+    manifest["steps"]["setMetisPrice"]["after"] = ["initializeMetisMarket"]
+    manifest["steps"]["setMetisCollateralFactor"]["after"].append("setMetisPrice")
+    remaining = len(manifest["steps"]) - len(info["completedSteps"]) - len(info["deployedContracts"])
+    assert DeploymentPipeline(manifest, info_path, deployer).run() == remaining
+    controller = Controller.at(info["deployedContracts"]["Controller"])
+    assert controller.markets(info["deployedContracts"]["MetisMarketToken"])[1] == 0.75e18
+
+
+def test_pipeline_records_wave_on_broadcast_error(manifest, info_path, deployer, monkeypatch):
+    pipeline = DeploymentPipeline(manifest, info_path, deployer)
+    broadcast = pipeline._broadcast
+    first_wave = [name for name, dependencies in pipeline.dependencies.items() if not dependencies]
+    assert len(first_wave) > 1
+
+    # A live network fails the gas estimation with a ValueError rather than a VirtualMachineError
+    def failing_broadcast(name, nonce):
+        if name == first_wave[1]:
+            raise ValueError("Gas estimation failed")
+        return broadcast(name, nonce)
+
+    monkeypatch.setattr(pipeline, "_broadcast", failing_broadcast)
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+    # The step broadcast before the error is recorded, a rerun does not deploy it again
+    with open(info_path) as f:
+        info = json.load(f)
+    assert pipeline.is_done(first_wave[0])
+    assert info["pendingSteps"] == {}
+    nonce = deployer.nonce
+    assert DeploymentPipeline(manifest, info_path, deployer).run() == len(manifest["steps"]) - 1
+    assert deployer.nonce == nonce + len(manifest["steps"]) - 1
+
+
+def test_pipeline_declares_every_dependency(manifest, info_path, deployer):
+    # The steps of a wave are broadcast in manifest order. Reversing it sends every step before the steps
+    # listed above it in the same wave, so a step reading state of a step it does not declare breaks the deployment
+    manifest["steps"] = dict(reversed(list(manifest["steps"].items())))
+    assert DeploymentPipeline(manifest, info_path, deployer).run() == len(manifest["steps"])
+    check_deployment(info_path)
+
+
+def test_pipeline_rejects_cycles(manifest, info_path, deployer):
+    manifest["steps"]["setCloseFactor"]["after"] = ["setLiquidationIncentive"]
+    manifest["steps"]["setLiquidationIncentive"]["after"] = ["setCloseFactor"]
+    with pytest.raises(ValueError):
+        DeploymentPipeline(manifest, info_path, deployer)
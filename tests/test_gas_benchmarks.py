@@ -0,0 +1,178 @@
+import pytest
+from brownie import *
+
+
+# Gas benchmarks of the MToken and Controller entry points.
+# Run `brownie test tests/test_gas_benchmarks.py --update-gas-baseline` to refresh tests/gas_baseline.json,
+# every other run fails a benchmark whose gas usage exceeds the baseline by more than --gas-tolerance
+# or which has no baseline entry yet.
+
+ONE_WEEK = 7 * 86400
+EXTRA_MARKETS = 7
+
+
+def mint_token(token, to, amount):
+    token.mint(to, amount)
+
+
+def supply(token, market, user, amount):
+    mint_token(token, user, amount)
+    token.approve(market, amount, {"from": user})
+    return market.mint(amount, {"from": user})
+
+
+@pytest.fixture(scope="module")
+def extra_markets(
+    deployer, controller, oracle_mock, usdc_rate_model, setup_controller, MErc20, ERC20PresetMinterPauserMock
+):
+    markets = []
+    for i in range(EXTRA_MARKETS):
+        token = deployer.deploy(ERC20PresetMinterPauserMock, f"Token {i}", f"TKN{i}", 18)
+        market = deployer.deploy(MErc20)
+        market.initialize(token, controller, usdc_rate_model, 2e26, f"cTKN{i}", f"CTKN{i}", 8)
+        oracle_mock.setUnderlyingPrice(market, 1e18)
+        controller.supportMarket(market)
+        controller.setCollateralFactor(market, 0.75e18)
+        markets.append((token, market))
+    yield markets
+
+
+@pytest.fixture(scope="module")
+def usdc_liquidity(user1, usdc, cUsdc):
+    supply(usdc, cUsdc, user1, 10000000e6)
+
+
+@pytest.mark.parametrize("entered_markets", [1, 4, 8])
+def test_account_gas(
+    entered_markets,
+    gas_benchmark,
+    user2,
+    user3,
+    usdc,
+    weth,
+    cUsdc,
+    cWeth,
+    controller,
+    oracle_mock,
+    extra_markets,
+    usdc_liquidity,
+):
+    collaterals = [(weth, cWeth)] + extra_markets[: entered_markets - 1]
+    controller.enterMarkets([market for _, market in collaterals], {"from": user2})
+    for token, market in collaterals:
+        supply(token, market, user2, 10e18 if market == cWeth else 40000e18)
+
+    gas_benchmark(f"mint[markets={entered_markets}]", supply(weth, cWeth, user2, 1e18))
+    gas_benchmark(f"borrow[markets={entered_markets}]", cUsdc.borrow(20000e6, {"from": user2}))
+    gas_benchmark(
+        f"borrowFixedRate[markets={entered_markets}]", cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    )
+    gas_benchmark(f"redeem[markets={entered_markets}]", cWeth.redeem(1e8, {"from": user2}))
+
+    usdc.approve(cUsdc, 1000e6, {"from": user2})
+    gas_benchmark(f"repayBorrow[markets={entered_markets}]", cUsdc.repayBorrow(1000e6, {"from": user2}))
+
+    # Drop collateral prices to put the account in shortfall, liquidation seizes collateral in another market
+    oracle_mock.setUnderlyingPrice(cWeth, 100e18)
+    for _, market in collaterals[1:]:
+        oracle_mock.setUnderlyingPrice(market, 0.01e18)
+    mint_token(usdc, user3, 500e6)
+    usdc.approve(cUsdc, 500e6, {"from": user3})
+    gas_benchmark(
+        f"liquidateBorrow[markets={entered_markets}]", cUsdc.liquidateBorrow(user2, 500e6, cWeth, {"from": user3})
+    )
+
+
+@pytest.mark.parametrize("fixed_borrows", [1, 10, 30])
+def test_fixed_borrows_gas(
+    fixed_borrows, gas_benchmark, user2, user3, usdc, weth, cUsdc, cWeth, controller, usdc_liquidity
+):
+    controller.enterMarkets([cWeth], {"from": user2})
+    supply(weth, cWeth, user2, 100e18)
+
+    for _ in range(fixed_borrows - 1):
+        cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    gas_benchmark(
+        f"borrowFixedRate[borrows={fixed_borrows}]", cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    )
+
+    mint_token(usdc, user2, 2000e6)
+    usdc.approve(cUsdc, 2000e6, {"from": user2})
+    gas_benchmark(
+        f"repayBorrowFixedRate[borrows={fixed_borrows}]", cUsdc.repayBorrowFixedRate([0], {"from": user2})
+    )
+
+    # Reopen the repaid borrow and let every borrow expire
+    cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    mint_token(usdc, user3, 2000e6)
+    usdc.approve(cUsdc, 2000e6, {"from": user3})
+    gas_benchmark(
+        f"liquidateBorrowFixedRate[borrows={fixed_borrows}]",
+        cUsdc.liquidateBorrowFixedRate(user2, [cUsdc.fixedBorrowIds(user2)[0]], [cWeth], {"from": user3}),
+    )
+
+
+@pytest.mark.parametrize("fixed_borrows", [1, 5, 20])
+def test_fixed_liquidation_gas(
+    fixed_borrows, gas_benchmark, user2, user3, usdc, weth, cUsdc, cWeth, controller, usdc_liquidity
+):
+    controller.enterMarkets([cWeth], {"from": user2})
+    supply(weth, cWeth, user2, 100e18)
+    for _ in range(fixed_borrows):
+        cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": user2})
+
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    # Every borrow is liquidated against the same collateral, which is priced and seized once
+    mint_token(usdc, user3, 2000e6 * fixed_borrows)
+    usdc.approve(cUsdc, 2000e6 * fixed_borrows, {"from": user3})
+    gas_benchmark(
+        f"liquidateBorrowFixedRateAll[borrows={fixed_borrows}]",
+        cUsdc.liquidateBorrowFixedRate(user2, cUsdc.fixedBorrowIds(user2), [cWeth] * fixed_borrows, {"from": user3}),
+    )
+
+
+@pytest.mark.parametrize("holders", [1, 5, 15])
+def test_claim_neb_gas(holders, gas_benchmark, accounts, usdc, weth, wbtc, cUsdc, cWeth, cWbtc, controller):
+    suppliers = accounts[5 : 5 + holders]
+    for supplier in suppliers:
+        supply(usdc, cUsdc, supplier, 1000e6)
+        supply(weth, cWeth, supplier, 1e18)
+        supply(wbtc, cWbtc, supplier, 1e8)
+
+    gas_benchmark(
+        f"claimNeb[holders={holders}]", controller.claimNeb["address"](suppliers[0], {"from": suppliers[0]})
+    )
+    gas_benchmark(
+        f"claimNebMany[holders={holders}]",
+        controller.claimNeb["address[],address[],bool,bool"](
+            suppliers, [cUsdc, cWeth, cWbtc], True, True, {"from": suppliers[0]}
+        ),
+    )
+
+
+@pytest.mark.parametrize("borrowers", [1, 5, 15])
+def test_fixed_liquidation_batch_gas(
+    borrowers, gas_benchmark, accounts, user3, usdc, weth, cUsdc, cWeth, controller, usdc_liquidity
+):
+    holders = accounts[5 : 5 + borrowers]
+    for holder in holders:
+        controller.enterMarkets([cWeth], {"from": holder})
+        supply(weth, cWeth, holder, 10e18)
+        cUsdc.borrowFixedRate(1000e6, ONE_WEEK, {"from": holder})
+
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    mint_token(usdc, user3, 2000e6 * borrowers)
+    usdc.approve(cUsdc, 2000e6 * borrowers, {"from": user3})
+    gas_benchmark(
+        f"liquidateBorrowFixedRateBatch[borrowers={borrowers}]",
+        cUsdc.liquidateBorrowFixedRateBatch(
+            holders, [[0]] * borrowers, [[cWeth]] * borrowers, {"from": user3}
+        ),
+    )
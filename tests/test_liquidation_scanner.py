@@ -0,0 +1,74 @@
+from brownie import *
+from utils.liquidation_scanner import LiquidationScanner
+
+
+TWO_WEEKS = 2 * 7 * 86400
+
+
+def scanner_of(controller, populated_protocol, checkpoint_path=None):
+    markets = [populated_protocol.market, populated_protocol.collateral]
+    return LiquidationScanner(controller, markets, checkpoint_path=checkpoint_path)
+
+
+def test_scanner_ranks_accounts_in_shortfall(populated_protocol, controller, oracle_mock, usdc, user1, user2, user3):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    scanner = scanner_of(controller, populated_protocol)
+    assert scanner.scan() == []
+
+    # Only user2 holds a variable rate borrow, fixed rate borrows are not liquidated on shortfall
+    oracle_mock.setUnderlyingPrice(cWeth, 1000e18)
+    liquidatable = scanner.scan()
+    assert [candidate.account for candidate in liquidatable] == [user2]
+    assert liquidatable[0].health < 1e18
+    assert liquidatable[0].expired_borrows == {}
+
+    collateral, borrows = scanner.book.account_liquidity(user2)
+    assert collateral == 75000 * 10 ** 18
+    assert borrows == cUsdc.borrowBalanceStored(user2) * 1e12
+
+    # The ranked account can be liquidated, and leaves the ranking once healthy again
+    usdc.mint(user1, 10000e6)
+    usdc.approve(cUsdc, 10000e6, {"from": user1})
+    cUsdc.liquidateBorrow(user2, 10000e6, cWeth, {"from": user1})
+    oracle_mock.setUnderlyingPrice(cWeth, 4000e18)
+    assert scanner.scan() == []
+    assert scanner.book.positions[user1][cWeth.address].tokens == cWeth.balanceOf(user1)
+    assert user3 not in scanner.book._health
+
+
+def test_scanner_reports_expired_fixed_rate_borrows(populated_protocol, controller, user2, user3):
+    cUsdc = populated_protocol.market
+    scanner = scanner_of(controller, populated_protocol)
+    scanner.scan()
+
+    chain.sleep(TWO_WEEKS + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+    liquidatable = scanner.scan()
+    assert {candidate.account for candidate in liquidatable} == {user2, user3}
+    for candidate in liquidatable:
+        assert candidate.shortfall == 0
+        assert candidate.expired_borrows == {cUsdc.address: list(cUsdc.expiredBorrows(candidate.account)[0])}
+
+
+def test_scanner_resumes_from_checkpoint(populated_protocol, controller, usdc, user2, tmp_path):
+    cUsdc = populated_protocol.market
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    scanner_of(controller, populated_protocol, checkpoint_path).scan()
+
+    usdc.approve(cUsdc, 50000e6, {"from": user2})
+    cUsdc.repayBorrow(50000e6, {"from": user2})
+    cUsdc.repayBorrowFixedRate([0], {"from": user2})
+
+    resumed = scanner_of(controller, populated_protocol, checkpoint_path)
+    assert resumed.book.block < chain.height
+    resumed.scan()
+
+    # Balances rolled forward from the checkpoint match a scan of the whole history
+    fresh = scanner_of(controller, populated_protocol)
+    fresh.scan()
+    assert resumed.book.markets == fresh.book.markets
+    assert resumed.book.positions.keys() == fresh.book.positions.keys()
+    for account in fresh.book.positions:
+        assert resumed.book.account_liquidity(account) == fresh.book.account_liquidity(account)
+        assert resumed.book.liquidation_deadline(account) == fresh.book.liquidation_deadline(account)
+    assert resumed.book.positions[user2][cUsdc.address].fixed_maturities == {}
@@ -0,0 +1,86 @@
+import brownie
+import pytest
+from brownie import *
+
+
+SALT = b"\x01" * 32
+
+
+@pytest.fixture(scope="module")
+def market_factory(deployer, controller, MErc20, MarketFactory, module_isolation_snapshot):
+    implementation = deployer.deploy(MErc20)
+    factory = deployer.deploy(MarketFactory, deployer, controller, implementation)
+    controller.setMarketFactory(factory)
+    yield factory
+
+
+@pytest.fixture(scope="module")
+def dai(deployer, ERC20PresetMinterPauserMock, module_isolation_snapshot):
+    yield deployer.deploy(ERC20PresetMinterPauserMock, "Dai Stablecoin", "DAI", 18)
+
+
+def market_params(dai, usdc_rate_model, collateral_factor=0.8e18):
+    return (dai, usdc_rate_model, 2e26, "Market Dai", "mDAI", 8, 4 * 3600, 0.15e18, collateral_factor)
+
+
+def test_create_market(
+    deployer, user1, user2, dai, usdc, cUsdc, usdc_rate_model, controller, oracle_mock, market_factory
+):
+    market_address = market_factory.predictMarket(SALT)
+    oracle_mock.setUnderlyingPrice(market_address, 1e18)
+
+    tx = market_factory.createMarket(market_params(dai, usdc_rate_model), SALT)
+    market = MErc20.at(market_address)
+    assert tx.events["MarketCreated"]["market"] == market
+    assert tx.events["MarketListed"]["mToken"] == market
+
+    assert market.underlying() == dai
+    assert market.controller() == controller
+    assert market.symbol() == "mDAI"
+    assert market.restPeriod() == 4 * 3600
+    assert market.reserveFactorMantissa() == 0.15e18
+    assert controller.markets(market)[:2] == (True, 0.8e18)
+    assert controller.getAllMarkets()[-1] == market
+
+    # The owner takes over the market admin
+    assert market.admin() == market_factory
+    assert market.pendingAdmin() == deployer
+    market.acceptAdmin({"from": deployer})
+    assert market.admin() == deployer
+
+    # The clone is a working market
+    dai.mint(user2, 1000e18)
+    dai.approve(market, 1000e18, {"from": user2})
+    market.mint(1000e18, {"from": user2})
+    controller.enterMarkets([market], {"from": user2})
+    usdc.mint(user1, 1000e6)
+    usdc.approve(cUsdc, 1000e6, {"from": user1})
+    cUsdc.mint(1000e6, {"from": user1})
+    cUsdc.borrow(500e6, {"from": user2})
+    assert cUsdc.borrowBalanceStored(user2) == 500e6
+
+
+def test_create_market_access(user1, dai, usdc_rate_model, controller, market_factory):
+    with brownie.reverts("only the owner may call this function."):
+        market_factory.createMarket(market_params(dai, usdc_rate_model, 0), SALT, {"from": user1})
+    with brownie.reverts("Caller is not an admin or the market factory"):
+        controller.supportMarket(market_factory.implementation(), {"from": user1})
+    with brownie.reverts("Caller is not an admin"):
+        controller.setMarketFactory(user1, {"from": user1})
+
+    # Without a price the collateral factor can't be set at listing
+    with brownie.reverts("Failed to get price"):
+        market_factory.createMarket(market_params(dai, usdc_rate_model), SALT)
+
+    # A disabled factory can't list markets
+    controller.setMarketFactory(ZERO_ADDRESS)
+    with brownie.reverts("Caller is not an admin or the market factory"):
+        market_factory.createMarket(market_params(dai, usdc_rate_model, 0), SALT)
+
+
+def test_create_market_gas(deployer, dai, usdc_rate_model, oracle_mock, market_factory, MErc20):
+    full_deploy = deployer.deploy(MErc20).tx.gas_used
+    oracle_mock.setUnderlyingPrice(market_factory.predictMarket(SALT), 1e18)
+    tx = market_factory.createMarket(market_params(dai, usdc_rate_model), SALT)
+    # Cloning, configuring and listing costs less than deploying the market bytecode alone
+    assert tx.gas_used < full_deploy / 2
@@ -0,0 +1,53 @@
+import pytest
+from brownie import *
+from utils.vote_checkpoints import VoteCheckpointCache
+
+
+@pytest.fixture(scope="module")
+def neb(deployer, Neb, module_isolation_snapshot):
+    yield deployer.deploy(Neb, deployer)
+
+
+@pytest.fixture(scope="module")
+def delegated_votes(neb, deployer, user1, user2, user3, user4):
+    neb.delegate(user1, {"from": deployer})
+    neb.transfer(user2, 1000e18, {"from": deployer})
+    neb.delegate(user3, {"from": user2})
+    neb.transfer(user2, 500e18, {"from": deployer})
+    neb.delegate(user4, {"from": user2})
+    neb.transfer(user3, 10e18, {"from": user2})
+    chain.mine(1)
+
+
+def test_get_prior_votes_many(neb, delegated_votes, deployer, user1, user2, user3, user4):
+    delegates = [user1, user2, user3, user4, deployer]
+    for block in range(neb.tx.block_number - 1, chain.height):
+        assert neb.getPriorVotesMany(delegates, block) == [neb.getPriorVotes(account, block) for account in delegates]
+
+    assert neb.getPriorVotesMany([], chain.height - 1) == []
+    with reverts("Comp::getPriorVotes: not yet determined"):
+        neb.getPriorVotesMany(delegates, chain.height)
+
+
+def test_vote_checkpoint_cache(neb, delegated_votes, deployer, user1, user2, user3, user4, tmp_path):
+    checkpoint_path = str(tmp_path / "votes.json")
+    delegates = [user1, user2, user3, user4, deployer]
+    cache = VoteCheckpointCache(neb, checkpoint_path, start_block=neb.tx.block_number, max_block_range=2)
+    cache.sync()
+
+    for block in range(neb.tx.block_number, chain.height):
+        assert list(cache.tally(delegates, block).values()) == neb.getPriorVotesMany(delegates, block)
+    for account in delegates:
+        assert cache.current_votes(account) == neb.getCurrentVotes(account)
+    with pytest.raises(ValueError):
+        cache.prior_votes(user1, chain.height + 1)
+
+    # A restarted cache only fetches the events emitted since its checkpoint
+    neb.transfer(user2, 1e18, {"from": deployer})
+    chain.mine(1)
+    resumed = VoteCheckpointCache(neb, checkpoint_path, start_block=neb.tx.block_number)
+    assert resumed.block == cache.block
+    resumed.sync()
+    assert resumed.tally(delegates, chain.height - 1) == dict(
+        zip(delegates, neb.getPriorVotesMany(delegates, chain.height - 1))
+    )
@@ -0,0 +1,84 @@
+import brownie
+from brownie import *
+
+
+ONE_WEEK = 7 * 86400
+ONE_HOUR = 3600
+
+
+def test_packed_price_oracle(deployer, user1, cUsdc, cWeth, PackedPriceOracle):
+    oracle = deployer.deploy(PackedPriceOracle, deployer, user1, ONE_HOUR)
+
+    with brownie.reverts("only the poster may post prices"):
+        oracle.setUnderlyingPrices([cUsdc], [1e18], {"from": deployer})
+    with brownie.reverts("Wrong arrays length"):
+        oracle.setUnderlyingPrices([cUsdc, cWeth], [1e18], {"from": user1})
+
+    tx = oracle.setUnderlyingPrices([cUsdc, cWeth], [1e18, 4000e18], {"from": user1})
+    assert oracle.prices(cWeth) == (4000e18, tx.timestamp)
+    assert oracle.getUnderlyingPrice(cWeth) == 4000e18
+    assert oracle.getUnderlyingPrices([cWeth, cUsdc, cWeth]) == [4000e18, 1e18, 4000e18]
+
+    # Stale prices are reported as unavailable
+    chain.sleep(ONE_HOUR + 1)
+    chain.mine(1)
+    assert oracle.getUnderlyingPrices([cUsdc, cWeth]) == [0, 0]
+    oracle.setMaxPriceAge(0, {"from": deployer})
+    assert oracle.getUnderlyingPrices([cUsdc, cWeth]) == [1e18, 4000e18]
+
+    with brownie.reverts("only the owner may call this function."):
+        oracle.setPoster(deployer, {"from": user1})
+
+
+def test_controller_with_packed_price_oracle(deployer, populated_protocol, controller, PackedPriceOracle):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    borrower = populated_protocol.borrowers[0]
+    liquidity = controller.getAccountLiquidity(borrower)
+
+    oracle = deployer.deploy(PackedPriceOracle, deployer, deployer, ONE_HOUR)
+    oracle.setUnderlyingPrices([cUsdc, cWeth], [1e18, 4000e18])
+    controller.setPriceOracle(oracle)
+    assert controller.getAccountLiquidity(borrower) == liquidity
+
+    chain.sleep(ONE_HOUR + 1)
+    chain.mine(1)
+    with brownie.reverts("Failed to get price"):
+        controller.getAccountLiquidity(borrower)
+    with brownie.reverts("Failed to get price"):
+        cUsdc.borrow(1e6, {"from": borrower})
+
+
+def test_liquidate_calculate_seize_tokens_batch(populated_protocol, controller, oracle_mock, cWbtc):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    # Repayments reference their collateral by index, so each collateral is priced once
+    collaterals = [cWeth, cUsdc, cWbtc]
+    indexes = [0, 1, 0, 2]
+    amounts = [1000e6, 2000e6, 3000e6, 4000e6]
+
+    expected = [controller.liquidateCalculateSeizeTokens(cUsdc, collaterals[i], a) for i, a in zip(indexes, amounts)]
+    assert controller.liquidateCalculateSeizeTokensBatch(cUsdc, collaterals, indexes, amounts) == expected
+
+    with brownie.reverts("Wrong arrays length"):
+        controller.liquidateCalculateSeizeTokensBatch(cUsdc, collaterals, indexes, amounts[1:])
+    with brownie.reverts():
+        controller.liquidateCalculateSeizeTokensBatch(cUsdc, collaterals, [0, 1, 0, 3], amounts)
+    oracle_mock.setUnderlyingPrice(cWbtc, 0)
+    with brownie.reverts("Failed to get price"):
+        controller.liquidateCalculateSeizeTokensBatch(cUsdc, collaterals, indexes, amounts)
+
+
+def test_liquidate_fixed_rate_seizes_batch_amounts(populated_protocol, controller, usdc, user1):
+    cUsdc, cWeth = populated_protocol.market, populated_protocol.collateral
+    borrower = populated_protocol.borrowers[0]
+    chain.sleep(ONE_WEEK + cUsdc.restPeriod() + 1)
+    chain.mine(1)
+
+    usdc.mint(user1, 30000e6)
+    usdc.approve(cUsdc, 30000e6, {"from": user1})
+    _, repay_amounts = cUsdc.expiredBorrows(borrower)
+    seize_tokens = controller.liquidateCalculateSeizeTokens(cUsdc, cWeth, repay_amounts[0])
+    balance_before = cWeth.balanceOf(borrower)
+    tx = cUsdc.liquidateBorrowFixedRate(borrower, [0], [cWeth], {"from": user1})
+
+    assert tx.events["LiquidateBorrowFixedRate"]["repayAmounts"][0] == repay_amounts[0]
+    assert balance_before - cWeth.balanceOf(borrower) == seize_tokens
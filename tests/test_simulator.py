@@ -0,0 +1,133 @@
+import brownie
+import pytest
+from brownie import *
+from simulator import (
+    BLOCKS_PER_YEAR,
+    BORROW_RATE_MAX_MANTISSA,
+    JumpRateModel,
+    MarketState,
+    accrue_interest,
+    exchange_rate,
+    fixed_borrow_repay_amount,
+    term_curve_rate,
+)
+
+
+ONE_WEEK = 7 * 86400
+
+
+def mint_token(token, to, amount):
+    token.mint(to, amount)
+
+
+def model_of(rate_model):
+    return JumpRateModel(
+        [rate_model.baseRatePerBlock()],
+        [rate_model.multiplierPerBlock()],
+        [rate_model.jumpMultiplierPerBlock()],
+        [rate_model.kink()],
+    )
+
+
+def state_of(market, usdc):
+    return MarketState.create(
+        cash=[usdc.balanceOf(market)],
+        total_borrows=market.totalBorrows(),
+        total_borrows_fixed=market.totalBorrowsFixed(),
+        total_reserves=market.totalReserves(),
+        total_supply=market.totalSupply(),
+        borrow_index=market.borrowIndex(),
+        reserve_factor_mantissa=market.reserveFactorMantissa(),
+        initial_exchange_rate_mantissa=2e14,
+    )
+
+
+def test_rate_model_parameters(usdc_rate_model):
+    model = JumpRateModel.from_per_year(
+        [0.57e18], [39222804184156400], [3272914755156920000], [800000000000000000]
+    )
+    assert model.base_rate_per_block[0] == usdc_rate_model.baseRatePerBlock()
+    assert model.multiplier_per_block[0] == usdc_rate_model.multiplierPerBlock()
+    assert model.jump_multiplier_per_block[0] == usdc_rate_model.jumpMultiplierPerBlock()
+
+
+@pytest.mark.parametrize(
+    "cash,borrows,reserves",
+    [(0, 0, 0), (10 ** 12, 0, 0), (10 ** 12, 5 * 10 ** 11, 10 ** 9), (10 ** 11, 10 ** 12, 10 ** 10), (1, 10 ** 18, 0)],
+)
+def test_rate_model_matches_contract(usdc_rate_model, cash, borrows, reserves):
+    model = model_of(usdc_rate_model)
+    args = ([cash], [borrows], [reserves])
+
+    assert model.utilization_rate(*args)[0] == usdc_rate_model.utilizationRate(cash, borrows, reserves)
+    assert model.borrow_rate(*args)[0] == usdc_rate_model.getBorrowRate(cash, borrows, reserves)
+    assert model.borrow_rate_per_time(*args, ONE_WEEK)[0] == usdc_rate_model.getBorrowRatePerTime(
+        cash, borrows, reserves, ONE_WEEK
+    )
+    assert model.supply_rate(*args, 0.1e18)[0] == usdc_rate_model.getSupplyRate(cash, borrows, reserves, 0.1e18)
+
+
+def test_accrual_matches_contract(user1, user2, usdc, weth, cUsdc, cWeth, usdc_rate_model, controller):
+    amount1 = 500000e6
+    mint_token(usdc, user1, amount1)
+    usdc.approve(cUsdc, amount1, {"from": user1})
+    cUsdc.mint(amount1, {"from": user1})
+
+    mint_token(weth, user2, 100e18)
+    controller.enterMarkets([cWeth], {"from": user2})
+    weth.approve(cWeth, 100e18, {"from": user2})
+    cWeth.mint(100e18, {"from": user2})
+    cUsdc.borrow(200000e6, {"from": user2})
+    cUsdc.borrowFixedRate(50000e6, ONE_WEEK, {"from": user2})
+
+    model = model_of(usdc_rate_model)
+    for _ in range(3):
+        state = state_of(cUsdc, usdc)
+        accrued_at = cUsdc.accrualBlockTimestamp()
+
+        chain.sleep(86400)
+        cUsdc.accrueInterest({"from": user1})
+
+        expected, _ = accrue_interest(model, state, cUsdc.accrualBlockTimestamp() - accrued_at)
+        assert expected.borrow_index[0] == cUsdc.borrowIndex()
+        assert expected.total_borrows[0] == cUsdc.totalBorrows()
+        assert expected.total_reserves[0] == cUsdc.totalReserves()
+        assert exchange_rate(expected)[0] == cUsdc.exchangeRateStored()
+
+    # Early repay of the fixed rate borrow is charged pro rata
+    amount, rate, opened_at, duration = cUsdc.accountFixedRateBorrows(user2, 0)
+    mint_token(usdc, user2, 100000e6)
+    usdc.approve(cUsdc, 100000e6, {"from": user2})
+    tx = cUsdc.repayBorrowFixedRate([0], {"from": user2})
+    expected_repay = fixed_borrow_repay_amount([amount], [rate], [opened_at], [duration], [tx.timestamp])
+    assert tx.events["RepayBorrowFixedRate"]["repayAmounts"][0] == expected_repay[0]
+
+
+@pytest.mark.parametrize("base_rate_per_block", [BORROW_RATE_MAX_MANTISSA, BORROW_RATE_MAX_MANTISSA + 1])
+def test_borrow_rate_cap_matches_contract(deployer, usdc, cUsdc, BaseJumpRateModelV2, base_rate_per_block):
+    # Without borrows the borrow rate is the base rate, the cap applies to it per block
+    rate_model = deployer.deploy(BaseJumpRateModelV2, base_rate_per_block * BLOCKS_PER_YEAR, 0, 0, 0.8e18, deployer)
+    cUsdc.setInterestRateModel(rate_model, {"from": deployer})
+    model = model_of(rate_model)
+    state = state_of(cUsdc, usdc)
+
+    chain.sleep(3600)
+    if base_rate_per_block > BORROW_RATE_MAX_MANTISSA:
+        with pytest.raises(ValueError, match="borrow rate is absurdly high"):
+            accrue_interest(model, state, 3600)
+        with brownie.reverts("borrow rate is absurdly high"):
+            cUsdc.accrueInterest({"from": deployer})
+    else:
+        accrued_at = cUsdc.accrualBlockTimestamp()
+        cUsdc.accrueInterest({"from": deployer})
+        expected, _ = accrue_interest(model, state, cUsdc.accrualBlockTimestamp() - accrued_at)
+        assert expected.borrow_index[0] == cUsdc.borrowIndex()
+
+
+def test_term_curve_matches_contract(cUsdc):
+    tenors, rates = [ONE_WEEK, 4 * ONE_WEEK, 26 * ONE_WEEK], [0.04e18, 0.0612345e18, 0.05e18]
+    cUsdc.setTermCurve(tenors, rates)
+
+    maturities = [ONE_WEEK, ONE_WEEK + 1, 3 * ONE_WEEK, 4 * ONE_WEEK, 5 * ONE_WEEK + 17, 26 * ONE_WEEK]
+    expected = term_curve_rate(tenors, rates, maturities)
+    assert [cUsdc.fixedBorrowRate(maturity) for maturity in maturities] == list(expected)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from brownie import web3
+
+from utils.async_client import AsyncRpcClient
+
+
+class AccrualKeeper:
+    """
+    @dev
+        Keeps the stored state of the markets fresh with Controller.accrueAll, so off-chain liquidity checks
+        can read `exchangeRateStored` and `borrowBalanceStored` instead of the `*Current` views.
+
+        A market is due once its last accrual is `max_age` seconds old, and no sooner than its
+        `minAccrualInterval`, below which accrueAll would skip it anyway. Due markets are accrued while the
+        gas price is at most `max_gas_price`. Once a market is `force_age` seconds old they are accrued whatever
+        the gas price, so cheap blocks are preferred while the staleness stays bounded.
+    """
+
+    def __init__(self, controller, markets, keeper, max_age=3600, force_age=4 * 3600, max_gas_price=None, url=None):
+        """
+        @param controller Controller contract
+        @param markets MToken contracts to keep fresh
+        @param keeper Brownie account sending the accrueAll transactions
+        @param max_age Age in seconds of the last accrual from which a market is due
+        @param force_age Age in seconds of the last accrual from which due markets are accrued at any gas price
+        @param max_gas_price Highest gas price in wei to accrue at before force_age, None for no limit
+        @param url Node endpoint of the batched reads, the endpoint of the active brownie network by default
+        """
+        if force_age < max_age:
+            raise ValueError("force_age must not be lower than max_age")
+        self.controller = controller
+        self.markets = list(markets)
+        self.keeper = keeper
+        self.max_age = max_age
+        self.force_age = force_age
+        self.max_gas_price = max_gas_price
+        self.url = url
+
+    def ages(self, block="latest"):
+        """
+        @dev
+            Reads the age of the last accrual and the minimum accrual interval of every market
+            in one batch of eth_calls, run at the block the age is measured at
+        @return Mapping of market address to (age in seconds, minAccrualInterval) at `block`
+        """
+        block = web3.eth.get_block(block)
+
+        async def fetch():
+            async with AsyncRpcClient(self.url) as client:
+                calls = [
+                    call
+                    for market in self.markets
+                    for call in ((market.accrualBlockTimestamp, ()), (market.minAccrualInterval, ()))
+                ]
+                return await client.call_many(calls, block.number)
+
+        results = asyncio.run(fetch())
+        return {
+            market.address: (block.timestamp - accrued_at, min_accrual_interval)
+            for market, accrued_at, min_accrual_interval in zip(self.markets, results[::2], results[1::2])
+        }
+
+    def due(self, ages, gas_price):
+        """
+        @param ages Mapping of market address to (age of its last accrual, minAccrualInterval), see ages
+        @param gas_price Current gas price in wei
+        @return The markets to accrue now, an empty list when the gas price is too high to accrue yet
+        """
+        due = [
+            market
+            for market in self.markets
+            if ages[market.address][0] >= max(self.max_age, ages[market.address][1])
+        ]
+        if not due:
+            return []
+        if self.max_gas_price is None or gas_price <= self.max_gas_price:
+            return due
+        if max(ages[market.address][0] for market in due) >= self.force_age:
+            return due
+        return []
+
+    def tick(self):
+        """
+        @dev Accrues the due markets if the gas price allows it
+        @return The accrueAll transaction, None if nothing was sent
+        """
+        markets = self.due(self.ages(), web3.eth.gas_price)
+        if not markets:
+            return None
+        # Markets accrued by other transactions in the meantime are skipped on chain
+        return self.controller.accrueAll(markets, self.max_age, {"from": self.keeper})
+
+    def run(self, poll_interval=60, callback=print):
+        """
+        @dev Checks the markets every `poll_interval` seconds and hands the sent transactions to `callback`
+        """
+        while True:
+            tx = self.tick()
+            if tx is not None:
+                callback(tx)
+            time.sleep(poll_interval)
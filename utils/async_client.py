@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import json
+from dataclasses import dataclass, field
+
+import aiohttp
+from brownie import Contract, interface, web3
+
+ERC20_ABI = [
+    {
+        "type": "function",
+        "name": "balanceOf",
+        "stateMutability": "view",
+        "inputs": [{"name": "account", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    }
+]
+MARKET_FIELDS = (
+    "getCash",
+    "totalBorrows",
+    "totalBorrowsFixed",
+    "totalReserves",
+    "totalSupply",
+    "exchangeRateStored",
+    "borrowIndex",
+)
+
+
+class RpcError(Exception):
+    """
+    @dev Error returned by the node for one JSON-RPC request
+    """
+
+    def __init__(self, error):
+        super().__init__(error.get("message"))
+        self.code = error.get("code")
+        self.data = error.get("data")
+
+
+class AsyncRpcClient:
+    """
+    @dev
+        asyncio JSON-RPC client sharing pooled connections to one node.
+
+        Over HTTP, requests go through an aiohttp connection pool, so concurrent coroutines reuse
+        `max_connections` keep-alive connections instead of opening one per call.
+        Over WebSocket, a single connection is shared and responses are routed back to their batch by id.
+        `batch` sends many requests as JSON-RPC batches of at most `batch_size` requests, sent concurrently.
+    """
+
+    def __init__(self, url=None, max_connections=8, batch_size=100, timeout=30):
+        """
+        @param url HTTP or WebSocket endpoint of the node, the endpoint of the active brownie network by default
+        @param max_connections Size of the HTTP connection pool
+        @param batch_size Maximum number of requests in one JSON-RPC batch
+        @param timeout Timeout of one batch in seconds
+        """
+        self.url = url or web3.provider.endpoint_uri
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._session = None
+        self._ws = None
+        self._reader = None
+        self._pending = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        if self.url.startswith(("ws://", "wss://")):
+            self._ws = await self._session.ws_connect(self.url, max_msg_size=0)
+            self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            await self._reader
+        await self._session.close()
+
+    async def request(self, method, params):
+        """
+        @return The result of one JSON-RPC request
+        """
+        return (await self.batch([(method, params)]))[0]
+
+    async def batch(self, requests):
+        """
+        @param requests List of (method, params)
+        @return Results in the order of `requests`
+        """
+        chunks = [requests[i : i + self.batch_size] for i in range(0, len(requests), self.batch_size)]
+        results = await asyncio.gather(*(self._send(chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
+
+    async def call_many(self, calls, block="latest"):
+        """
+        @dev Runs many contract view calls as eth_call requests of one or more batches
+        @param calls List of (brownie contract method, arguments)
+        @param block Block number or tag the calls are run at
+        @return Decoded return values in the order of `calls`
+        """
+        block = hex(block) if isinstance(block, int) else block
+        requests = [
+            ("eth_call", [{"to": method._address, "data": method.encode_input(*args)}, block])
+            for method, args in calls
+        ]
+        results = await self.batch(requests)
+        return [method.decode_output(result) for (method, _), result in zip(calls, results)]
+
+    async def _send(self, requests):
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in requests
+        ]
+        if self._ws is not None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[payload[0]["id"]] = future
+            await self._ws.send_str(json.dumps(payload))
+            responses = await asyncio.wait_for(future, self.timeout)
+        else:
+            async with self._session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                responses = await response.json()
+
+        if isinstance(responses, dict):
+            # The node rejected the whole batch
+            raise RpcError(responses.get("error", {}))
+        by_id = {response["id"]: response for response in responses}
+        results = []
+        for request in payload:
+            response = by_id[request["id"]]
+            if "error" in response:
+                raise RpcError(response["error"])
+            results.append(response["result"])
+        return results
+
+    async def _read(self):
+        async for message in self._ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            responses = json.loads(message.data)
+            for response in responses if isinstance(responses, list) else [responses]:
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None:
+                    future.set_result(responses)
+                    break
+
+
+@dataclass
+class MarketSnapshot:
+    """
+    @dev Market state at the snapshot block, the fields mirror the MToken getters
+    """
+
+    cash: int
+    total_borrows: int
+    total_borrows_fixed: int
+    total_reserves: int
+    total_supply: int
+    exchange_rate: int
+    borrow_index: int
+    price: int
+
+
+@dataclass
+class AccountSnapshot:
+    """
+    @dev Balances of an account in one market at the snapshot block
+    """
+
+    tokens: int
+    borrow_balance: int
+    borrow_balance_fixed: int
+    fixed_borrows_amount: int
+    underlying_balance: int
+
+
+@dataclass
+class ProtocolState:
+    """
+    @dev
+        Snapshot of markets and accounts, all read at the same block.
+        `accounts` maps an account to its AccountSnapshot in every market,
+        `liquidity` maps an account to its (liquidity, shortfall) from Controller.getAccountLiquidity.
+    """
+
+    block: int
+    markets: dict = field(default_factory=dict)
+    accounts: dict = field(default_factory=dict)
+    liquidity: dict = field(default_factory=dict)
+
+
+async def fetch_protocol_state(client, controller, markets, accounts=(), block=None):
+    """
+    @dev Reads a ProtocolState with two rounds of batched eth_calls, whatever the number of accounts
+    @param client Open AsyncRpcClient
+    @param controller Controller contract
+    @param markets MErc20 contracts
+    @param accounts Addresses of the accounts to snapshot
+    @param block Block number to read at, the latest block by default
+    @return ProtocolState
+    """
+    if block is None:
+        block = int(await client.request("eth_blockNumber", []), 16)
+
+    oracle_address, *underlyings = await client.call_many(
+        [(controller.oracle, ())] + [(market.underlying, ()) for market in markets], block
+    )
+    oracle = interface.IPriceOracle(oracle_address)
+    underlying_tokens = [Contract.from_abi("ERC20", underlying, ERC20_ABI) for underlying in underlyings]
+
+    calls = [(oracle.getUnderlyingPrices, ([market.address for market in markets],))]
+    for market in markets:
+        calls += [(getattr(market, name), ()) for name in MARKET_FIELDS]
+    for account in accounts:
+        calls.append((controller.getAccountLiquidity, (account,)))
+        for market, token in zip(markets, underlying_tokens):
+            calls += [
+                (market.getAccountSnapshot, (account,)),
+                (market.fixedBorrowsAmount, (account,)),
+                (token.balanceOf, (account,)),
+            ]
+    results = iter(await client.call_many(calls, block))
+
+    state = ProtocolState(block)
+    prices = next(results)
+    for market, price in zip(markets, prices):
+        state.markets[market.address] = MarketSnapshot(*(next(results) for _ in MARKET_FIELDS), price)
+    for account in accounts:
+        liquidity, shortfall = next(results)
+        state.liquidity[account] = (liquidity, shortfall)
+        state.accounts[account] = {}
+        for market in markets:
+            tokens, borrow_balance, _, borrow_balance_total = next(results)
+            state.accounts[account][market.address] = AccountSnapshot(
+                tokens=tokens,
+                borrow_balance=borrow_balance,
+                borrow_balance_fixed=borrow_balance_total - borrow_balance,
+                fixed_borrows_amount=next(results),
+                underlying_balance=next(results),
+            )
+    return state
+
+
+def protocol_state(controller, markets, accounts=(), block=None, url=None):
+    """
+    @dev Blocking wrapper of fetch_protocol_state for brownie scripts
+    """
+
+    async def fetch():
+        async with AsyncRpcClient(url) as client:
+            return await fetch_protocol_state(client, controller, markets, accounts, block)
+
+    return asyncio.run(fetch())
@@ -1,23 +1,102 @@
 import brownie
-from brownie import Contract, project
+import json
+import os
+from functools import lru_cache
+from brownie import Contract, project, web3
 from brownie.network.contract import ProjectContract
+from eth_utils import keccak
 
-def deploy_proxy(deployer, proxy_admin, ImplContract, *args):
+ZERO_SALT = b"\x00" * 32
+
+
+@lru_cache(maxsize=None)
+def _project():
+    return project.get_loaded_projects()[0]
+
+
+def bytecode_hash(ContractContainer):
+    """
+    @param ContractContainer Brownie Contract container.
+    @return Hex keccak256 hash of the creation code of the contract
+    """
+    return "0x" + keccak(hexstr=ContractContainer.bytecode).hex()
+
+
+class ImplementationRegistry:
     """
     @dev
-        Deploys upgradable contract with proxy from oz-contracts package
+        Maps the creation code hash of a contract to an implementation deployed from it,
+        so every proxy of the same contract reuses one implementation.
+        Entries are keyed by chain id and checked for code before reuse,
+        an entry of a reverted or reset chain deploys the implementation again.
+    """
+
+    def __init__(self, path=None):
+        """
+        @param path JSON file to persist the registry to, None to keep it in memory only.
+        """
+        self.path = path
+        self.implementations = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.implementations = json.load(f)
+
+    def get_or_deploy(self, deployer, ImplContract, create2_deployer=None):
+        """
+        @dev
+            Returns the registered implementation of ImplContract, deploys it when there is none.
+            Through a Create2Deployer the implementation address only depends on the deployer and the bytecode,
+            so it is the same on every chain.
+        @param deployer Brownie account used to deploy a contract.
+        @param ImplContract Brownie Contract container for the implementation.
+        @param create2_deployer Create2Deployer contract, None to deploy with CREATE.
+        @return Contract container for the implementation
+        """
+        code_hash = bytecode_hash(ImplContract)
+        key = f"{web3.eth.chain_id}:{code_hash}"
+        address = self.implementations.get(key)
+        if create2_deployer is not None:
+            address = create2_deployer.computeAddress(deployer, ZERO_SALT, code_hash)
+
+        if address is None or len(web3.eth.get_code(address)) == 0:
+            if create2_deployer is not None:
+                create2_deployer.deploy(ZERO_SALT, "0x" + ImplContract.bytecode, {"from": deployer})
+            else:
+                address = deployer.deploy(ImplContract).address
+            self.implementations[key] = address
+            if self.path:
+                self._save()
+        return ImplContract.at(address)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.implementations, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+
+# Registry used by the helpers unless one is passed explicitly
+implementations = ImplementationRegistry()
+
+
+def deploy_proxy(deployer, proxy_admin, ImplContract, *args, registry=implementations):
+    """
+    @dev
+        Deploys upgradable contract with proxy from oz-contracts package,
+        the implementation is reused when the registry already has one
     @param deployer Brownie account used to deploy a contract.
     @param proxy_admin Admin address (e.g. from the contract deployed deploy_admin() or custom admin).
     @param ImplContract Brownie Contract container for the implementation.
     @param args Initializer arguments.
+    @param registry ImplementationRegistry to look the implementation up in.
     @return Contract container for the proxy wrapped into the implementation interface
             Contract container for the proxy
             Contract container for the implementation
     """
-    cur_project = project.get_loaded_projects()[0]
+    cur_project = _project()
 
     #Deploy implementation first
-    contract_impl = deployer.deploy(ImplContract)
+    contract_impl = registry.get_or_deploy(deployer, ImplContract)
 
     #Deploy proxy next
     initializer_data = contract_impl.initialize.encode_input(*args)
@@ -40,7 +119,7 @@ def deploy_proxy_over_impl(deployer, proxy_admin, implementation_address, ImplCo
     @return Contract container for the proxy wrapped into the implementation interface
             Contract container for the proxy
     """
-    cur_project = project.get_loaded_projects()[0]
+    cur_project = _project()
 
     #Already have the implementation
     # contract_impl = deployer.deploy(ImplContract)
@@ -63,23 +142,25 @@ def deploy_admin(deployer):
     @param deployer Brownie account used to deploy a contract.
     @return Contract container for the admin contract
     """
-    cur_project = project.get_loaded_projects()[0]
+    cur_project = _project()
     return deployer.deploy(cur_project.UtilProxyAdmin)
 
 
-def upgrade_proxy(deployer, proxy_admin, proxy_contract, NewImplContract):
+def upgrade_proxy(deployer, proxy_admin, proxy_contract, NewImplContract, registry=implementations):
     """
     @dev
-        Upgrades the implementation on proxy from oz-contracts package
+        Upgrades the implementation on proxy from oz-contracts package,
+        the new implementation is reused when the registry already has one
     @param deployer Brownie account used to deploy a contract.
     @param proxy_admin Admin address (e.g. from the contract deployed deploy_admin() or custom address).
     @param proxy_contract Brownie Contract container for the Proxy.
     @param NewImplContract Brownie Contract container for the new implementation.
+    @param registry ImplementationRegistry to look the implementation up in.
     @return Contract container for the proxy wrapped into the implementation interface
             Contract container for the implementation
     """
     #Deploy new implementation first
-    new_contract_impl = deployer.deploy(NewImplContract)
+    new_contract_impl = registry.get_or_deploy(deployer, NewImplContract)
 
     # Upgrade imlpementation
     if (isinstance(proxy_admin, ProjectContract) or isinstance(proxy_admin, Contract)):
@@ -93,5 +174,93 @@ def upgrade_proxy(deployer, proxy_admin, proxy_contract, NewImplContract):
     return contract_impl_from_proxy, new_contract_impl
 
 def get_proxy_admin(proxy_admin_address):
-    cur_project = project.get_loaded_projects()[0]
-    return Contract.from_abi(cur_project.UtilProxyAdmin._name, proxy_admin_address, cur_project.UtilProxyAdmin.abi)
\ No newline at end of file
+    cur_project = _project()
+    return Contract.from_abi(cur_project.UtilProxyAdmin._name, proxy_admin_address, cur_project.UtilProxyAdmin.abi)
+
+
+def deploy_proxy_create2(deployer, create2_deployer, proxy_admin, ImplContract, salt, *args, registry=implementations):
+    """
+    @dev
+        Deploys upgradable contract with proxy from oz-contracts package at an address known in advance,
+        see compute_proxy_address. The proxy is initialized in its deployment transaction, so the published
+        address cannot be initialized by anybody else first. The initializer makes the Create2Deployer the admin,
+        it hands the admin rights over to the deployer in the same transaction and the deployer accepts them.
+    @param deployer Brownie account used to deploy a contract, the admin of the initialized contract.
+    @param create2_deployer Create2Deployer contract.
+    @param proxy_admin Admin address (e.g. from the contract deployed deploy_admin() or custom admin).
+    @param ImplContract Brownie Contract container for the implementation, with setPendingAdmin and acceptAdmin.
+    @param salt 32 bytes salt of the proxy, unique per deployer.
+    @param args Initializer arguments.
+    @param registry ImplementationRegistry to look the implementation up in.
+    @return Contract container for the proxy wrapped into the implementation interface
+            Contract container for the proxy
+            Contract container for the implementation
+    """
+    return deploy_proxies_create2(
+        deployer, create2_deployer, proxy_admin, ImplContract, [salt], [args], registry=registry
+    )[0]
+
+
+def deploy_proxies_create2(
+    deployer, create2_deployer, proxy_admin, ImplContract, salts, args_list, registry=implementations
+):
+    """
+    @dev
+        Batch version of deploy_proxy_create2: deploys and initializes every proxy in one transaction,
+        then broadcasts the acceptAdmin transactions with consecutive nonces before waiting for any of them.
+    @param deployer Brownie account used to deploy a contract, the admin of the initialized contracts.
+    @param create2_deployer Create2Deployer contract.
+    @param proxy_admin Admin address (e.g. from the contract deployed deploy_admin() or custom admin).
+    @param ImplContract Brownie Contract container for the implementation, with setPendingAdmin and acceptAdmin.
+    @param salts 32 bytes salt of each proxy, unique per deployer.
+    @param args_list Initializer arguments of each proxy.
+    @param registry ImplementationRegistry to look the implementation up in.
+    @return (proxy wrapped into the implementation interface, proxy, implementation) for each proxy, in order
+    """
+    cur_project = _project()
+
+    #Implementation through CREATE2 as well, so the proxy address does not depend on the chain history
+    contract_impl = registry.get_or_deploy(deployer, ImplContract, create2_deployer)
+
+    bytecode = cur_project.UtilProxy.deploy.encode_input(contract_impl.address, proxy_admin, b"")
+    calls = [
+        [contract_impl.initialize.encode_input(*args), contract_impl.setPendingAdmin.encode_input(deployer)]
+        for args in args_list
+    ]
+    tx = create2_deployer.deployAndCallMany(salts, [bytecode] * len(salts), calls, {"from": deployer})
+    proxy_contracts = [cur_project.UtilProxy.at(event["deployed"]) for event in tx.events["Deployed"]]
+
+    #Route all calls to go through the proxy contracts
+    contracts_impl_from_proxy = [
+        Contract.from_abi(ImplContract._name, proxy_contract.address, ImplContract.abi)
+        for proxy_contract in proxy_contracts
+    ]
+    nonce = deployer.nonce
+    receipts = [
+        contract.acceptAdmin({"from": deployer, "nonce": nonce + i, "required_confs": 0})
+        for i, contract in enumerate(contracts_impl_from_proxy)
+    ]
+    for contract, receipt in zip(contracts_impl_from_proxy, receipts):
+        receipt.wait(1)
+        if receipt.status != 1:
+            raise RuntimeError(f"acceptAdmin of {contract.address} reverted")
+
+    return [
+        (contract, proxy_contract, contract_impl)
+        for contract, proxy_contract in zip(contracts_impl_from_proxy, proxy_contracts)
+    ]
+
+
+def compute_proxy_address(deployer, create2_deployer, proxy_admin, ImplContract, salt):
+    """
+    @param deployer Address that deploys the proxy.
+    @param create2_deployer Create2Deployer contract.
+    @param proxy_admin Admin address of the proxy.
+    @param ImplContract Brownie Contract container for the implementation.
+    @param salt 32 bytes salt of the proxy.
+    @return Address deploy_proxy_create2 deploys the proxy at
+    """
+    implementation = create2_deployer.computeAddress(deployer, ZERO_SALT, bytecode_hash(ImplContract))
+    bytecode = _project().UtilProxy.deploy.encode_input(implementation, proxy_admin, b"")
+    return create2_deployer.computeAddress(deployer, salt, keccak(hexstr=bytecode))
+
@@ -0,0 +1,170 @@
+import json
+import os
+
+from brownie import project, web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+
+class DeploymentPipeline:
+    """
+    @dev
+        Deploys and configures the protocol from a declarative manifest.
+
+        Every manifest step either deploys a contract (`{"deploy": "MErc20", "args": [...]}`) or calls a
+        deployed one (`{"call": "UsdcMarketToken.initialize", "args": [...]}`). Arguments may reference
+        `$deployer`, a deployed contract as `@StepName` or a token of deploy_info.json as `@tokens.SYMBOL`,
+        `after` lists the steps a step must wait for beyond the ones it references.
+
+        Steps form a DAG. Every wave broadcasts all the steps whose dependencies are confirmed at once,
+        with consecutive nonces, then waits for the whole wave, so a deploy takes as many confirmations as
+        the DAG is deep instead of one per transaction. Progress is written to deploy_info.json atomically
+        before and after every wave, so a rerun skips the completed steps and picks up broadcast ones.
+    """
+
+    def __init__(self, manifest, info_path, deployer, timeout=600):
+        """
+        @param manifest Parsed manifest, a dict with the `steps` mapping
+        @param info_path Path to deploy_info.json, created if missing
+        @param deployer Brownie account sending every transaction
+        @param timeout Seconds to wait for a transaction broadcast by a previous run
+        """
+        self.steps = manifest["steps"]
+        self.info_path = info_path
+        self.deployer = deployer
+        self.timeout = timeout
+        self.project = project.get_loaded_projects()[0]
+
+        self.info = {"tokens": {}, "deployedContracts": {}}
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                self.info.update(json.load(f))
+        self.info.setdefault("completedSteps", [])
+        self.info.setdefault("pendingSteps", {})
+
+        self.dependencies = {name: self._dependencies_of(name, step) for name, step in self.steps.items()}
+        self._check_acyclic()
+
+    def _dependencies_of(self, name, step):
+        dependencies = set(step.get("after", []))
+        references = list(step.get("args", []))
+        if "call" in step:
+            target = step["call"].split(".")[0]
+            if "deploy" not in self.steps.get(target, {}):
+                raise ValueError(f"Step {name} calls {target}, which is not deployed by the manifest")
+            references.append("@" + target)
+        for arg in references:
+            if isinstance(arg, str) and arg.startswith("@") and arg[1:] in self.steps:
+                dependencies.add(arg[1:])
+        unknown = dependencies - self.steps.keys()
+        if unknown:
+            raise ValueError(f"Step {name} depends on unknown steps {sorted(unknown)}")
+        return dependencies
+
+    def _check_acyclic(self):
+        ordered = set()
+        while len(ordered) < len(self.steps):
+            ready = {name for name in self.steps if name not in ordered and self.dependencies[name] <= ordered}
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps {sorted(self.steps.keys() - ordered)}")
+            ordered |= ready
+
+    def is_done(self, name):
+        if "deploy" in self.steps[name]:
+            return name in self.info["deployedContracts"]
+        return name in self.info["completedSteps"]
+
+    def run(self):
+        """
+        @dev Broadcasts every step that is not completed yet, wave by wave
+        @return Number of transactions sent
+        """
+        self._resume_pending()
+        sent = 0
+        while True:
+            wave = [
+                name
+                for name in self.steps
+                if not self.is_done(name) and all(self.is_done(dependency) for dependency in self.dependencies[name])
+            ]
+            if not wave:
+                return sent
+
+            nonce = self.deployer.nonce
+            receipts, failure = {}, None
+            for i, name in enumerate(wave):
+                try:
+                    receipts[name] = self._broadcast(name, nonce + i)
+                except Exception as e:
+                    # Any broadcast error stops the wave (a revert, a failed gas estimation on a live network...),
+                    # later nonces would leave a gap. The steps broadcast so far are still recorded and awaited
+                    failure = (name, e)
+                    break
+            self.info["pendingSteps"] = {name: receipt.txid for name, receipt in receipts.items()}
+            self._save()
+
+            for name, receipt in receipts.items():
+                receipt.wait(1)
+                self._complete(name, receipt.status, receipt.contract_address)
+            self._save()
+            sent += len(receipts)
+
+            if failure:
+                name, e = failure
+                raise RuntimeError(f"Step {name} failed to broadcast: {e}") from e
+
+    def _resume_pending(self):
+        for name, txid in list(self.info["pendingSteps"].items()):
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(txid, timeout=self.timeout)
+            except TimeExhausted:
+                try:
+                    web3.eth.get_transaction(txid)
+                except TransactionNotFound:
+                    # Dropped from the mempool, the step is broadcast again
+                    del self.info["pendingSteps"][name]
+                    continue
+                raise RuntimeError(f"Step {name} transaction {txid} is still pending, rerun once it is mined")
+            self._complete(name, receipt["status"], receipt["contractAddress"])
+        self._save()
+
+    def _broadcast(self, name, nonce):
+        step = self.steps[name]
+        args = [self._resolve(arg) for arg in step.get("args", [])]
+        if "deploy" in step:
+            container = getattr(self.project, step["deploy"])
+            return self.deployer.deploy(container, *args, nonce=nonce, required_confs=0)
+
+        target, method = step["call"].split(".")
+        container = getattr(self.project, self.steps[target]["deploy"])
+        contract = container.at(self.info["deployedContracts"][target])
+        return getattr(contract, method)(*args, {"from": self.deployer, "nonce": nonce, "required_confs": 0})
+
+    def _resolve(self, arg):
+        if arg == "$deployer":
+            return self.deployer.address
+        if isinstance(arg, str) and arg.startswith("@tokens."):
+            return self.info["tokens"][arg[len("@tokens.") :]]
+        if isinstance(arg, str) and arg.startswith("@"):
+            return self.info["deployedContracts"][arg[1:]]
+        return arg
+
+    def _complete(self, name, status, contract_address):
+        self.info["pendingSteps"].pop(name, None)
+        if status != 1:
+            self._save()
+            raise RuntimeError(f"Step {name} reverted")
+        if "deploy" in self.steps[name]:
+            self.info["deployedContracts"][name] = contract_address
+            print(f"{name} deployed at {contract_address}")
+        else:
+            self.info["completedSteps"].append(name)
+            print(f"{name} done")
+
+    def _save(self):
+        """
+        @dev Writes deploy_info.json atomically, an interrupted write never leaves a truncated file behind
+        """
+        tmp_path = f"{self.info_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.info, f, indent=4)
+        os.replace(tmp_path, self.info_path)
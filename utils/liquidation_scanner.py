@@ -0,0 +1,168 @@
+import time
+
+from brownie import interface, web3
+from eth_utils import event_abi_to_log_topic
+
+from utils.position_book import PositionBook
+
+MARKET_EVENTS = {
+    "AccrueInterest": (),
+    "Mint": ("minter",),
+    "Redeem": ("redeemer",),
+    "Borrow": ("borrower",),
+    "RepayBorrow": ("borrower",),
+    "LiquidateBorrow": ("borrower",),
+    "BorrowFixedRate": ("borrower",),
+    "RepayBorrowFixedRate": ("borrower",),
+    "LiquidateBorrowFixedRate": ("borrower",),
+    "Transfer": ("from", "to"),
+}
+FIXED_RATE_EVENTS = {"BorrowFixedRate", "RepayBorrowFixedRate", "LiquidateBorrowFixedRate"}
+CONTROLLER_EVENTS = ("MarketEntered", "MarketExited", "NewCollateralFactor", "NewPriceOracle")
+DECIMALS_ABI = [
+    {
+        "type": "function",
+        "name": "decimals",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "uint8"}],
+    }
+]
+
+
+class LiquidationScanner:
+    """
+    @dev
+        Keeps a PositionBook in sync with the chain and reports the liquidatable accounts.
+
+        Every scan reads the MToken and Controller events emitted since the last processed block,
+        then only re-reads the accounts these events touched: one `getAccountSnapshots` call per market
+        for all the touched accounts, plus the fixed rate borrows of the accounts that opened or closed one.
+        Market state (price, rest period, exchange rate, borrow index) costs a constant number of calls per market.
+        The book is checkpointed after every scan, so a restarted scanner resumes where it stopped.
+    """
+
+    def __init__(self, controller, markets, checkpoint_path=None, start_block=0, max_block_range=2000):
+        """
+        @param controller Controller contract
+        @param markets MToken contracts to index
+        @param checkpoint_path JSON file to persist the book to, None to keep it in memory only
+        @param start_block First block to index when there is no checkpoint, e.g. the deployment block
+        @param max_block_range Maximum number of blocks requested in one eth_getLogs call
+        """
+        self.controller = controller
+        self.markets = {market.address: market for market in markets}
+        self.oracle = interface.IPriceOracle(controller.oracle())
+        self.checkpoint_path = checkpoint_path
+        self.max_block_range = max_block_range
+
+        book = PositionBook.load(checkpoint_path) if checkpoint_path else None
+        self.book = book or PositionBook(start_block - 1)
+
+        self._topics = {}
+        for market in self.markets.values():
+            self._register(market, MARKET_EVENTS)
+        self._register(controller, CONTROLLER_EVENTS)
+
+        for address, market in self.markets.items():
+            _, collateral_factor, _, underlying_scale = controller.markets(address)
+            if underlying_scale == 0:
+                # Markets listed before the scale was cached, see Controller._getUnderlyingScale
+                underlying = web3.eth.contract(address=market.underlying(), abi=DECIMALS_ABI)
+                underlying_scale = 10 ** underlying.functions.decimals().call()
+            self.book.update_market(address, collateral_factor=collateral_factor, underlying_scale=underlying_scale)
+
+    def _register(self, contract, event_names):
+        events = web3.eth.contract(address=contract.address, abi=contract.abi).events
+        for abi in contract.abi:
+            if abi["type"] == "event" and abi["name"] in event_names:
+                self._topics[event_abi_to_log_topic(abi)] = getattr(events, abi["name"])()
+
+    def _get_logs(self, from_block, to_block):
+        logs = web3.eth.get_logs(
+            {
+                "address": list(self.markets) + [self.controller.address],
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [list(self._topics)],
+            }
+        )
+        return [self._topics[bytes(log["topics"][0])].processLog(log) for log in logs]
+
+    def scan(self, to_block=None):
+        """
+        @dev Processes the blocks up to `to_block` and checkpoints the book
+        @param to_block Last block to process, the latest block by default
+        @return Ranked list of liquidatable accounts at `to_block`
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number
+        dirty = {address: set() for address in self.markets}
+        dirty_fixed = {address: set() for address in self.markets}
+        touched = set()
+
+        for from_block in range(self.book.block + 1, to_block + 1, self.max_block_range):
+            for event in self._get_logs(from_block, min(from_block + self.max_block_range - 1, to_block)):
+                self._apply(event, dirty, dirty_fixed, touched)
+
+        self._refresh(to_block, dirty, dirty_fixed, touched)
+        self.book.block = to_block
+        self.book.recompute()
+        if self.checkpoint_path:
+            self.book.save(self.checkpoint_path)
+        return self.book.liquidatable(web3.eth.get_block(to_block).timestamp)
+
+    def _apply(self, event, dirty, dirty_fixed, touched):
+        address, name, args = event.address, event.event, event.args
+        if address in self.markets:
+            touched.add(address)
+            if name == "AccrueInterest":
+                self.book.update_market(address, borrow_index=args.borrowIndex)
+            for arg in MARKET_EVENTS[name]:
+                dirty[address].add(args[arg])
+                if name in FIXED_RATE_EVENTS:
+                    dirty_fixed[address].add(args[arg])
+        elif name == "MarketEntered" and args.mToken in self.markets:
+            self.book.enter_market(args.account, args.mToken)
+        elif name == "MarketExited" and args.mToken in self.markets:
+            self.book.exit_market(args.account, args.mToken)
+        elif name == "NewCollateralFactor" and args.mToken in self.markets:
+            self.book.update_market(args.mToken, collateral_factor=args.newCollateralFactorMantissa)
+        elif name == "NewPriceOracle":
+            self.oracle = interface.IPriceOracle(args.newPriceOracle)
+
+    def _refresh(self, block, dirty, dirty_fixed, touched):
+        call = {"block_identifier": block}
+        prices = self.oracle.getUnderlyingPrices(list(self.markets), **call)
+        for price, (address, market) in zip(prices, self.markets.items()):
+            accounts = sorted(dirty[address])
+            self.book.update_market(address, price=price, rest_period=market.restPeriod(**call))
+            if address not in touched and self.book.markets[address].exchange_rate:
+                continue
+
+            if accounts:
+                tokens, borrows, exchange_rate, _ = market.getAccountSnapshots(accounts, **call)
+            else:
+                exchange_rate = market.exchangeRateStored(**call)
+            self.book.update_market(
+                address,
+                exchange_rate=exchange_rate,
+                borrow_index=market.borrowIndex(**call),
+            )
+            for i, account in enumerate(accounts):
+                fixed_maturities = None
+                if account in dirty_fixed[address]:
+                    fixed_maturities = {}
+                    for borrow_id in market.fixedBorrowIds(account, **call):
+                        _, _, opened_at, duration = market.accountFixedRateBorrows(account, borrow_id, **call)
+                        fixed_maturities[borrow_id] = opened_at + duration
+                self.book.update_position(account, address, tokens[i], borrows[i], fixed_maturities)
+
+    def run(self, poll_interval=5, callback=print):
+        """
+        @dev Scans every new block and hands the ranked liquidatable accounts to `callback`
+        """
+        while True:
+            if web3.eth.block_number > self.book.block:
+                callback(self.scan())
+            time.sleep(poll_interval)
@@ -0,0 +1,269 @@
+import bisect
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+EXP_SCALE = 10 ** 18
+
+
+@dataclass
+class MarketInfo:
+    """
+    @dev
+        Market state the account liquidity depends on, mirrors what
+        Controller.getHypotheticalAccountLiquidityInternal reads for every asset.
+    """
+
+    exchange_rate: int = 0
+    borrow_index: int = EXP_SCALE
+    price: int = 0
+    collateral_factor: int = 0
+    underlying_scale: int = 1
+    rest_period: int = 0
+
+
+@dataclass
+class Position:
+    """
+    @dev
+        Balances of an account in one market, as returned by MToken.getAccountSnapshots.
+        `borrow_index` is the market borrow index the borrow balance was read at, so the balance can be
+        rolled forward with later AccrueInterest events without reading it again.
+        `fixed_maturities` maps the IDs of the open fixed rate borrows to their maturity timestamps.
+    """
+
+    tokens: int = 0
+    borrow_balance: int = 0
+    borrow_index: int = EXP_SCALE
+    fixed_maturities: dict = field(default_factory=dict)
+
+
+@dataclass
+class Liquidatable:
+    """
+    @dev
+        An account that can be liquidated.
+        `shortfall` is non zero when the variable rate borrows can be liquidated (MToken.liquidateBorrow),
+        `expired_borrows` maps markets to IDs of fixed rate borrows past their rest period
+        (MToken.liquidateBorrowFixedRate).
+    """
+
+    account: str
+    health: int
+    shortfall: int
+    expired_borrows: dict
+
+
+class PositionBook:
+    """
+    @dev
+        In-memory book of every account position of the protocol, updated incrementally from events.
+
+        Accounts are kept in two sorted indexes:
+        - by health factor (collateral / borrows, scaled by 1e18), only accounts with variable rate borrows
+        - by the earliest time one of their fixed rate borrows becomes liquidatable
+
+        Updating a market or an account only marks the affected accounts as stale, `recompute` then
+        re-evaluates the stale accounts alone, so the cost of a block scales with the accounts it changed.
+    """
+
+    def __init__(self, block=0):
+        self.block = block
+        self.markets = {}
+        self.positions = {}
+        self.entered = {}
+        self.members = {}
+        self._stale = set()
+        self._health = {}
+        self._health_index = []
+        self._deadline = {}
+        self._deadline_index = []
+
+    def update_market(self, market, **fields):
+        """
+        @dev Updates fields of a MarketInfo, stales the market members if anything changed
+        @return Whether the market changed
+        """
+        info = self.markets.setdefault(market, MarketInfo())
+        changed = False
+        for name, value in fields.items():
+            if getattr(info, name) != value:
+                setattr(info, name, value)
+                changed = True
+        if changed:
+            self._stale.update(self.members.get(market, ()))
+        return changed
+
+    def update_position(self, account, market, tokens, borrow_balance, fixed_maturities=None):
+        """
+        @dev
+            Stores a fresh snapshot of the account in the market. The borrow balance is taken at the
+            current borrow index of the market, so market updates of the same block must come first.
+        @param fixed_maturities Maturity timestamps of the fixed rate borrows by ID, None keeps the known ones
+        """
+        positions = self.positions.setdefault(account, {})
+        position = positions.setdefault(market, Position())
+        position.tokens = tokens
+        position.borrow_balance = borrow_balance
+        position.borrow_index = self.markets.setdefault(market, MarketInfo()).borrow_index
+        if fixed_maturities is not None:
+            position.fixed_maturities = dict(fixed_maturities)
+
+        if position.tokens == 0 and position.borrow_balance == 0 and not position.fixed_maturities:
+            del positions[market]
+            self.members.get(market, set()).discard(account)
+        else:
+            self.members.setdefault(market, set()).add(account)
+        self._stale.add(account)
+
+    def enter_market(self, account, market):
+        self.entered.setdefault(account, set()).add(market)
+        self._stale.add(account)
+
+    def exit_market(self, account, market):
+        self.entered.get(account, set()).discard(market)
+        self._stale.add(account)
+
+    def account_liquidity(self, account):
+        """
+        @dev
+            Mirrors Controller.getAccountLiquidityInternalLiquidation, fixed rate borrows are not counted.
+            The borrow balance is rolled to the current borrow index like MToken.borrowBalanceStoredInternal,
+            rounding may differ by a few wei from a fresh on-chain read.
+        @return (collateral value, borrow value) in the oracle denomination
+        """
+        sum_collateral = 0
+        sum_borrows = 0
+        positions = self.positions.get(account, {})
+        for market in self.entered.get(account, ()):
+            position = positions.get(market)
+            if position is None:
+                continue
+            info = self.markets[market]
+            borrow_balance = 0
+            if position.borrow_balance:
+                borrow_balance = position.borrow_balance * info.borrow_index // position.borrow_index
+            tokens_to_denom = info.collateral_factor * info.exchange_rate // EXP_SCALE * info.price // EXP_SCALE
+            sum_collateral += tokens_to_denom * position.tokens // info.underlying_scale
+            sum_borrows += info.price * borrow_balance // info.underlying_scale
+        return sum_collateral, sum_borrows
+
+    def health(self, account):
+        """
+        @return Collateral over variable rate borrows scaled by 1e18, None for an account without borrows
+        """
+        collateral, borrows = self.account_liquidity(account)
+        if borrows == 0:
+            return None
+        return collateral * EXP_SCALE // borrows
+
+    def liquidation_deadline(self, account):
+        """
+        @return Earliest timestamp after which a fixed rate borrow of the account is liquidatable, or None
+        """
+        deadlines = [
+            maturity + self.markets[market].rest_period
+            for market, position in self.positions.get(account, {}).items()
+            for maturity in position.fixed_maturities.values()
+        ]
+        return min(deadlines, default=None)
+
+    def recompute(self):
+        """
+        @dev Re-evaluates the stale accounts and moves them in the sorted indexes
+        @return Number of re-evaluated accounts
+        """
+        stale, self._stale = self._stale, set()
+        for account in stale:
+            self._reindex(self._health, self._health_index, account, self.health(account))
+            self._reindex(self._deadline, self._deadline_index, account, self.liquidation_deadline(account))
+        return len(stale)
+
+    @staticmethod
+    def _reindex(keys, index, account, key):
+        old_key = keys.pop(account, None)
+        if old_key is not None:
+            del index[bisect.bisect_left(index, (old_key, account))]
+        if key is not None:
+            keys[account] = key
+            bisect.insort(index, (key, account))
+
+    def liquidatable(self, timestamp):
+        """
+        @dev
+            Ranks the liquidatable accounts: accounts in shortfall first, lowest health factor first,
+            then accounts with expired fixed rate borrows only, longest expired first.
+            Only reads the prefixes of the sorted indexes, which hold the liquidatable accounts.
+        @param timestamp Timestamp of the latest block
+        @return List of Liquidatable
+        """
+        ranked = {}
+        for health, account in self._health_index[: bisect.bisect_left(self._health_index, (EXP_SCALE, ""))]:
+            collateral, borrows = self.account_liquidity(account)
+            ranked[account] = Liquidatable(account, health, borrows - collateral, {})
+
+        for _, account in self._deadline_index[: bisect.bisect_left(self._deadline_index, (timestamp, ""))]:
+            expired_borrows = {}
+            for market, position in self.positions[account].items():
+                rest_period = self.markets[market].rest_period
+                borrow_ids = [
+                    borrow_id
+                    for borrow_id, maturity in position.fixed_maturities.items()
+                    if timestamp > maturity + rest_period
+                ]
+                if borrow_ids:
+                    expired_borrows[market] = borrow_ids
+            if account not in ranked:
+                ranked[account] = Liquidatable(account, self._health.get(account), 0, {})
+            ranked[account].expired_borrows = expired_borrows
+        return list(ranked.values())
+
+    def to_dict(self):
+        return {
+            "block": self.block,
+            "markets": {market: asdict(info) for market, info in self.markets.items()},
+            "positions": {
+                account: {market: asdict(position) for market, position in positions.items()}
+                for account, positions in self.positions.items()
+            },
+            "entered": {account: sorted(markets) for account, markets in self.entered.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        book = cls(data["block"])
+        for market, info in data["markets"].items():
+            book.markets[market] = MarketInfo(**info)
+        for account, positions in data["positions"].items():
+            for market, position in positions.items():
+                # JSON object keys are strings
+                position["fixed_maturities"] = {
+                    int(borrow_id): maturity for borrow_id, maturity in position["fixed_maturities"].items()
+                }
+                book.positions.setdefault(account, {})[market] = Position(**position)
+                book.members.setdefault(market, set()).add(account)
+            book._stale.add(account)
+        for account, markets in data["entered"].items():
+            book.entered[account] = set(markets)
+            book._stale.add(account)
+        book.recompute()
+        return book
+
+    def save(self, path):
+        """
+        @dev Writes the checkpoint atomically, an interrupted write never leaves a truncated file behind
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        @return The book saved at `path`, or None if there is no checkpoint yet
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,120 @@
+import bisect
+import json
+import os
+
+from brownie import web3
+from eth_utils import event_abi_to_log_topic
+
+
+class VoteCheckpointCache:
+    """
+    @dev
+        Local mirror of the Neb vote checkpoints, built from DelegateVotesChanged events.
+
+        Every delegate keeps two parallel sorted arrays, the blocks its votes changed at and the votes from
+        that block on, exactly like Neb.checkpoints. Current votes are the last entry and prior votes a
+        bisection in memory, so tallying thousands of delegates at a proposal block costs no eth_call.
+        The cache is checkpointed after every sync, so a restarted process only fetches the new events.
+    """
+
+    def __init__(self, neb, checkpoint_path=None, start_block=0, max_block_range=2000):
+        """
+        @param neb Neb contract
+        @param checkpoint_path JSON file to persist the cache to, None to keep it in memory only
+        @param start_block First block to index when there is no checkpoint, e.g. the deployment block
+        @param max_block_range Maximum number of blocks requested in one eth_getLogs call
+        """
+        self.neb = neb
+        self.checkpoint_path = checkpoint_path
+        self.max_block_range = max_block_range
+        self.block = start_block - 1
+        self.blocks = {}
+        self.votes = {}
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                self._from_dict(json.load(f))
+
+        abi = next(abi for abi in neb.abi if abi["type"] == "event" and abi["name"] == "DelegateVotesChanged")
+        self._topic = event_abi_to_log_topic(abi)
+        self._event = web3.eth.contract(address=neb.address, abi=neb.abi).events.DelegateVotesChanged()
+
+    def sync(self, to_block=None):
+        """
+        @dev Applies the DelegateVotesChanged events up to `to_block` and checkpoints the cache
+        @param to_block Last block to process, the latest block by default
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number
+        for from_block in range(self.block + 1, to_block + 1, self.max_block_range):
+            logs = web3.eth.get_logs(
+                {
+                    "address": self.neb.address,
+                    "fromBlock": from_block,
+                    "toBlock": min(from_block + self.max_block_range - 1, to_block),
+                    "topics": [self._topic],
+                }
+            )
+            for log in logs:
+                event = self._event.processLog(log)
+                self.apply(event.args.delegate, event.blockNumber, event.args.newBalance)
+
+        self.block = max(self.block, to_block)
+        if self.checkpoint_path:
+            self.save(self.checkpoint_path)
+
+    def apply(self, delegate, block, votes):
+        """
+        @dev Records a vote change, events must be applied in chain order
+        """
+        blocks = self.blocks.setdefault(delegate, [])
+        history = self.votes.setdefault(delegate, [])
+        # Several changes in one block overwrite the same checkpoint, see Neb._writeCheckpoint
+        if blocks and blocks[-1] == block:
+            history[-1] = votes
+        else:
+            blocks.append(block)
+            history.append(votes)
+
+    def current_votes(self, delegate):
+        """
+        @return The votes of `delegate` as of the last synced block, like Neb.getCurrentVotes
+        """
+        history = self.votes.get(delegate)
+        return history[-1] if history else 0
+
+    def prior_votes(self, delegate, block):
+        """
+        @return The votes of `delegate` as of `block`, like Neb.getPriorVotes
+        """
+        if block > self.block:
+            raise ValueError(f"block {block} is not synced yet, the cache is at block {self.block}")
+        i = bisect.bisect_right(self.blocks.get(delegate, []), block)
+        return self.votes[delegate][i - 1] if i else 0
+
+    def tally(self, delegates, block):
+        """
+        @return Mapping of every delegate to its votes as of `block`, like Neb.getPriorVotesMany
+        """
+        return {delegate: self.prior_votes(delegate, block) for delegate in delegates}
+
+    def to_dict(self):
+        return {
+            "block": self.block,
+            "checkpoints": {delegate: [self.blocks[delegate], self.votes[delegate]] for delegate in self.blocks},
+        }
+
+    def _from_dict(self, data):
+        self.block = data["block"]
+        for delegate, (blocks, votes) in data["checkpoints"].items():
+            self.blocks[delegate] = blocks
+            self.votes[delegate] = votes
+
+    def save(self, path):
+        """
+        @dev Writes the checkpoint atomically, an interrupted write never leaves a truncated file behind
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)